@@ -0,0 +1,200 @@
+"""
+Batch analysis of a list of tickers.
+
+Tickers run concurrently in one process, so they share the browser pool, the
+PDF/OCR/statement caches and the per-provider LLM limits instead of each paying
+for its own. Every finished ticker is checkpointed to disk as soon as it is
+done; running the same batch again skips the tickers already analyzed, so a
+crashed nightly run resumes where it stopped.
+
+Usage:
+    python batch.py                          # the NGX watch list below
+    python batch.py DANGCEM UACN --parallel 2
+    python batch.py --file tickers.txt --run nightly --restart
+    python batch.py --screen "pe_ratio < 10 and eps_growth_consistent = 1"
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from orchestrator import MAX_PARALLEL_CRITERIA, analyze_ticker
+from tools.pdf_cache import CACHE_DIR
+from tools.screener import screener
+
+# Tickers analyzed at once, their criteria agents still share the LLM provider limits
+BATCH_PARALLEL_TICKERS = int(os.getenv("BATCH_PARALLEL_TICKERS") or 3)
+
+NGX_WATCHLIST = [
+    "NAHCO", "MBENEFIT", "MULTIVERSE", "HMCALL", "WAPCO", "EKOCORP", "DUNLOP", "LIVESTOCK", "HONYFLOUR",
+    "FTNCOCOA", "ROYALEX", "FIDSON", "BUAFOODS", "CADBURY", "CHAMPION", "DANGCEM", "PRESCO", "ABCTRANS", "UACN",
+]
+
+
+class BatchCheckpoints:
+    def __init__(self, run_id: str, root: Optional[Path] = None):
+        """
+        Args:
+            run_id (str): Name of the batch run, runs with the same name resume each other
+            root (Path): Checkpoint directory, defaults to <cache dir>/batch
+        """
+        self.run_id = run_id
+        self.root = (Path(root) if root else CACHE_DIR / "batch") / run_id
+        self._lock = threading.Lock()
+
+    def _path(self, ticker: str) -> Path:
+        return self.root / f"{ticker}.json"
+
+    def load(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Return the checkpointed result of a ticker, None if it has not finished"""
+        try:
+            with open(self._path(ticker), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Checkpoint of {ticker} unreadable, running it again: {e}")
+            return None
+
+    def save(self, ticker: str, result: Dict[str, Any]):
+        """Write a ticker's result, atomically so a crash never leaves half a checkpoint"""
+        with self._lock:
+            path = self._path(ticker)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2, default=str)
+            os.replace(tmp_path, path)
+
+    def clear(self):
+        for path in self.root.glob("*.json"):
+            path.unlink()
+
+
+def result_status(result: Dict[str, Any]) -> str:
+    """
+    "ok" when every criterion was evaluated, "partial" when some failed or timed out
+    and "error" when none was (rate limits, scrape failures). Only "ok" results are
+    final, the others are analyzed again when the run resumes.
+    """
+    statuses = [finding.get("status") for finding in result.get("criteria", {}).values()]
+    failed = sum(status != "ok" for status in statuses)
+    if not statuses or failed == len(statuses):
+        return "error"
+    if failed or str(result.get("company_info", "")).startswith("Error:"):
+        return "partial"
+    return "ok"
+
+
+def analyze_checkpointed(ticker: str, checkpoints: BatchCheckpoints, max_parallel_criteria: int) -> Dict[str, Any]:
+    """Analyze one ticker and checkpoint the outcome with its status (see result_status)"""
+    try:
+        result = analyze_ticker(ticker, max_parallel=max_parallel_criteria)
+        result = dict(result, status=result_status(result))
+    except Exception as e:
+        print(f"[{ticker}] analysis failed: {e}")
+        result = {"ticker": ticker, "status": "error", "error": str(e)}
+
+    checkpoints.save(ticker, result)
+    return result
+
+
+def run_batch(tickers: List[str], run_id: Optional[str] = None,
+              max_parallel_tickers: int = BATCH_PARALLEL_TICKERS,
+              max_parallel_criteria: int = MAX_PARALLEL_CRITERIA,
+              resume: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Analyze a list of tickers with bounded parallelism, checkpointing each one.
+
+    Args:
+        tickers (List[str]): Tickers to analyze, duplicates are analyzed once
+        run_id (str): Name of the run, defaults to today's date. Checkpoints of a run
+                      with the same name are reused when resume is set.
+        max_parallel_tickers (int): Tickers analyzed at once
+        max_parallel_criteria (int): Criterion agents running at once per ticker
+        resume (bool): Skip tickers that already have an "ok" checkpoint. Tickers
+                       that failed or had failed criteria are always retried.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Result per ticker in input order (see
+        orchestrator.analyze_ticker) with a "status" of "ok", "partial" or "error"
+    """
+    started = time.monotonic()
+    tickers = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers if ticker.strip()))
+    checkpoints = BatchCheckpoints(run_id or date.today().isoformat())
+    if not resume:
+        checkpoints.clear()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    pending = []
+    for ticker in tickers:
+        checkpoint = checkpoints.load(ticker) if resume else None
+        # Statuses are derived again, checkpoints written before criteria failures counted were all "ok"
+        if checkpoint and checkpoint.get("status") == "ok" and result_status(checkpoint) == "ok":
+            results[ticker] = checkpoint
+        else:
+            pending.append(ticker)
+
+    print(f"Batch {checkpoints.run_id}: {len(tickers)} tickers, {len(results)} already done, "
+          f"{len(pending)} to analyze {max_parallel_tickers} at a time")
+
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel_tickers), thread_name_prefix="batch") as pool:
+        futures = {
+            pool.submit(analyze_checkpointed, ticker, checkpoints, max_parallel_criteria): ticker
+            for ticker in pending
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            ticker = futures[future]
+            results[ticker] = future.result()
+            print(f"Batch {checkpoints.run_id}: {ticker} {results[ticker]['status']} ({done}/{len(pending)})")
+
+    seconds = round(time.monotonic() - started, 1)
+    failed = [ticker for ticker in tickers if results[ticker].get("status") != "ok"]
+    print(f"Batch {checkpoints.run_id} done in {seconds}s, {len(failed)} failed: {failed}")
+    return {ticker: results[ticker] for ticker in tickers}
+
+
+def read_ticker_file(path: str) -> List[str]:
+    """Tickers from a text file, one per line or comma separated, # starts a comment"""
+    tickers = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            tickers.extend(ticker for ticker in line.replace(",", " ").split())
+    return tickers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a list of NGX tickers, resuming from checkpoints")
+    parser.add_argument("tickers", nargs="*", help="Tickers to analyze, defaults to the NGX watch list")
+    parser.add_argument("--file", help="Text file of tickers, one per line")
+    parser.add_argument("--screen", help="Add the tickers matching a screener filter (see tools.screener)")
+    parser.add_argument("--run", dest="run_id", help="Run name, defaults to today's date")
+    parser.add_argument("--parallel", type=int, default=BATCH_PARALLEL_TICKERS, help="Tickers analyzed at once")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoints of the run")
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.file:
+        tickers.extend(read_ticker_file(args.file))
+    if args.screen:
+        tickers.extend(row["ticker"] for row in screener.query(args.screen, limit=1000))
+        if not tickers:
+            print(f"No ticker matches the screen '{args.screen}'")
+            return
+
+    results = run_batch(tickers or NGX_WATCHLIST, run_id=args.run_id,
+                        max_parallel_tickers=args.parallel, resume=not args.restart)
+    for ticker, result in results.items():
+        print(f"\n===== {ticker} ({result['status']}) =====")
+        print(result.get("story") or result.get("error"))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,81 +1,127 @@
 from smolagents import LiteLLMModel,InferenceClientModel
+from contextlib import contextmanager
 import os
+import threading
 from dotenv import load_dotenv
 import litellm
 
 load_dotenv()
 
-gemini_pro = LiteLLMModel(
+# Concurrent LLM calls allowed per provider (the prefix of the litellm model id),
+# shared by every agent so parallel agents never exceed a provider's limits.
+# Override with LLM_CONCURRENCY_<PROVIDER>, e.g. LLM_CONCURRENCY_GEMINI=8
+DEFAULT_PROVIDER_CONCURRENCY = {
+    "gemini": 4,
+    "openrouter": 4,
+    "ollama_chat": 1,
+}
+
+_provider_slots = {}
+_provider_slots_lock = threading.Lock()
+
+
+def provider_of(model_id: str) -> str:
+    return model_id.split("/", 1)[0] if "/" in model_id else model_id
+
+
+def provider_semaphore(provider: str) -> threading.BoundedSemaphore:
+    with _provider_slots_lock:
+        if provider not in _provider_slots:
+            limit = int(os.getenv(f"LLM_CONCURRENCY_{provider.upper()}") or DEFAULT_PROVIDER_CONCURRENCY.get(provider, 4))
+            _provider_slots[provider] = threading.BoundedSemaphore(limit)
+        return _provider_slots[provider]
+
+
+@contextmanager
+def provider_slot(model_id: str):
+    """Hold one of the provider's concurrent call slots for the duration of a call"""
+    semaphore = provider_semaphore(provider_of(model_id))
+    with semaphore:
+        yield
+
+
+class LimitedLiteLLMModel(LiteLLMModel):
+    """LiteLLMModel whose calls wait for a free slot of their provider"""
+
+    def generate(self, *args, **kwargs):
+        with provider_slot(self.model_id):
+            return super().generate(*args, **kwargs)
+
+    def generate_stream(self, *args, **kwargs):
+        with provider_slot(self.model_id):
+            yield from super().generate_stream(*args, **kwargs)
+
+gemini_pro = LimitedLiteLLMModel(
     model_id="gemini/gemini-2.5-pro",
     api_key=os.getenv("GEMINI_KEY", ""),
     temperature=0.1,
     max_tokens=2048,
 )
 
-gemma_en4b = LiteLLMModel(
+gemma_en4b = LimitedLiteLLMModel(
     model_id="gemini/gemma-3n-e4b-it",
     api_key=os.getenv("GEMINI_KEY", ""),
     temperature=0.1,
     max_tokens=2048,
 )
 
-gemma_27b = LiteLLMModel(
+gemma_27b = LimitedLiteLLMModel(
     model_id="gemini/gemma-3-27b-it",
     api_key=os.getenv("GEMINI_KEY", ""),
     temperature=0.1,
     max_tokens=2048,
 )
 
-gemini_25flash = LiteLLMModel(
+gemini_25flash = LimitedLiteLLMModel(
     model_id="gemini/gemini-2.5-flash",
     api_key=os.getenv("GEMINI_KEY", ""),
     temperature=0.1,
     max_tokens=2048,
 )
 
-gemini_25flash_lite = LiteLLMModel(
+gemini_25flash_lite = LimitedLiteLLMModel(
     model_id="gemini/gemini-2.5-flash-lite",
     api_key=os.getenv("GEMINI_KEY", ""),
     temperature=0.1,
     max_tokens=2048,
 )
 
-gemini_flash = LiteLLMModel(
+gemini_flash = LimitedLiteLLMModel(
     model_id="gemini/gemini-2.0-flash",
     api_key=os.getenv("GEMINI_KEY", ""),
     temperature=0.1,
     max_tokens=2048,
 )
 
-gemini_flash_lite = LiteLLMModel(
+gemini_flash_lite = LimitedLiteLLMModel(
     model_id="gemini/gemini-2.0-flash-lite",
     api_key=os.getenv("GEMINI_KEY", ""),
     temperature=0.1,
     max_tokens=2048,
 )
 
-op_llama4_model = LiteLLMModel(
+op_llama4_model = LimitedLiteLLMModel(
     model_id="openrouter/meta-llama/llama-4-maverick",
     api_base="https://openrouter.ai/api/v1",
     api_key=os.getenv("OPENROUTER_KEY", ""),
     temperature=0.1,
 )
 
-op_qwen_3_model = LiteLLMModel(
+op_qwen_3_model = LimitedLiteLLMModel(
     model_id="openrouter/qwen/qwen3-235b-a22b",
     api_base="https://openrouter.ai/api/v1",
     api_key=os.getenv("OPENROUTER_KEY", ""),
     temperature=0.1,
 )
 
-op_gemma3_model = LiteLLMModel( 
+op_gemma3_model = LimitedLiteLLMModel( 
     model_id="openrouter/google/gemma-3-27b-it",
     api_base="https://openrouter.ai/api/v1",
     api_key=os.getenv("OPENROUTER_KEY", ""),
     temperature=0.1,
 )
 
-qwen25_model = LiteLLMModel(
+qwen25_model = LimitedLiteLLMModel(
     model_id="ollama_chat/qwen2.5-coder:3b",  # Example
     api_base="http://localhost:11434",
     # api_key="ollama",
@@ -84,7 +130,7 @@ qwen25_model = LiteLLMModel(
     # temperature=0.1,   
 )
 
-gemma_model = LiteLLMModel(
+gemma_model = LimitedLiteLLMModel(
     model_id="ollama_chat/gemma3:4b",  # Example
     api_base="http://localhost:11434",
     # api_key="ollama",
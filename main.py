@@ -8,6 +8,8 @@ from sub_agents import (name_agent,disagreeable_agent,
     stock_category_agent,pe_ratio_agent,earnings_growth_agent,
     balance_sheet_agent,cash_position_agent)
 from tools.get_company_info import get_company_info
+from orchestrator import analyze_stock
+from tools.screener import screen_stocks
 
 extra = """
 
@@ -43,13 +45,21 @@ instructions = """
     18 Determine what category/type of stock whether it is a slow grower,stalwart,fast grower,
     cyclical,turnaround,asset play or a new issue
 
-    You are to distribute this to the managed agents in the order of the criteria above,and then give the story based on this and
+    Use the analyze_stock tool for this: it runs the specialized agent of every criterion above in parallel
+    and returns their findings together with the story,then give the story based on this and
     decide if the stock should be bought or not
 
+    When asked to find or shortlist stocks rather than analyze a given one,use the screen_stocks tool
+    to filter every NGX listed company on p/e,debt to equity,net cash,earnings growth,buybacks and
+    insider buying first,and only analyze the shortlisted stocks
+
+    Only call the managed agents directly to dig deeper into a criterion whose finding is missing,
+    an error or unclear
+
     You must go through only all the criteria above and then give a final summary of the stock
     and whether it should be bought or not
 
-    You must use the specialized agents for every criteria
+    You must use the specialized agents for every criteria,through analyze_stock
     
     You must always go through the steps and after completion go through the'
     requirements
@@ -65,9 +75,9 @@ managed_agents = [name_agent,pe_ratio_agent,disagreeable_agent,
 master_agent = CodeAgent(
     managed_agents=managed_agents,
     model=model,
-    planning_interval=8,  # Activate planning
+    # No planning steps: analyze_stock schedules the criteria from their declared inputs
     max_steps=25,
-    tools=[get_company_info],
+    tools=[get_company_info, analyze_stock, screen_stocks],
     name="stock_ai_agent",
     provide_run_summary =True,
     instructions=instructions,
@@ -84,6 +94,7 @@ if __name__ == "__main__":
     main()
 
 # kindly get the story of
+# (python batch.py runs this list unattended, with checkpoints)
 # 1. NIGERIAN AVIATION HANDLING COMPANY PLC ( NAHCO )
 # 2. MUTUAL BENEFITS ASSURANCE PLC. ( MBENEFIT )
 # 3. MULTIVERSE MINING AND EXPLORATION PLC ( MULTIVERSE )
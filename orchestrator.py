@@ -0,0 +1,445 @@
+"""
+Fan-out orchestrator for the stock story criteria.
+
+Instead of the master agent walking the 18 managed agents one after another,
+the work for a ticker is a dependency graph: shared inputs (company info, the
+NGX profile PDFs and their text, statement figures, P/E) are fetched once, and
+every criterion agent is dispatched in its own thread as soon as the inputs it
+declares are ready. The collected answers go to a single synthesis call that
+writes the story and the buy decision. LLM calls are capped per provider by the
+models themselves (see llms.provider_slot), so the end-to-end time approaches
+the slowest chain rather than the sum.
+"""
+
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from smolagents import CodeAgent, MultiStepAgent, ToolCallingAgent, tool
+from smolagents.models import ChatMessage, MessageRole
+
+from llms import gemini_25flash_lite as synthesis_model
+from sub_agents import (name_agent,disagreeable_agent,
+    spinoff_agent,institutions_agent,rumours_agent,depressing_agent,
+    no_growth_agent,niche_agent,recurring_agent,technology_user_agent,
+    insider_buying_agent,share_buyback_agent,
+    stock_category_agent,pe_ratio_agent,earnings_growth_agent,
+    balance_sheet_agent,cash_position_agent)
+from tools.director_disclosure import insider_summary
+from tools.financial_records import load_financial_table
+from tools.get_company_info import get_company_info
+from tools.ngx_profile import (CORPORATE_DISCLOSURES, DIRECTOR_DEALINGS, FINANCIAL_STATEMENTS, SECTIONS,
+                               fetch_profile_sections, get_section_text)
+from tools.pe_ratio_tool import get_pe_ratio
+
+# Criterion agents running at once, LLM calls are further capped per provider
+MAX_PARALLEL_CRITERIA = int(os.getenv("MAX_PARALLEL_CRITERIA") or 18)
+# Seconds the orchestrator waits for all criteria before synthesizing without the stragglers
+CRITERIA_TIMEOUT = float(os.getenv("CRITERIA_TIMEOUT") or 900)
+
+
+@dataclass(frozen=True)
+class Task:
+    """
+    A node of the work graph: run() receives the results of its deps keyed by name.
+    Tasks of a group share the group's concurrency limit (see run_dag).
+    """
+    key: str
+    run: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+    group: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class SharedInput:
+    """
+    Data fetched once per ticker before the agents that need it start.
+
+    fetch(ticker, inputs) gets the results of deps. in_task inputs are small and
+    written into the agent's task, the others only warm the caches behind the
+    agents' own tools (memoized section text, PDF cache, statement store).
+    """
+    key: str
+    fetch: Callable[[str, Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+    in_task: bool = False
+
+
+def section_text(section):
+    """Fetch for a profile section's text, reusing the PDFs downloaded by ngx_pdfs"""
+    def fetch(ticker, inputs):
+        pdfs = inputs.get("ngx_pdfs")
+        pdf_paths = pdfs.get(section.name) if isinstance(pdfs, dict) else None
+        pages = get_section_text(ticker, section, pdf_paths=pdf_paths)
+        return f"{len(pages)} pages of {section.tab_label}"
+    return fetch
+
+
+def insider_table(ticker, inputs):
+    pdfs = inputs.get("ngx_pdfs")
+    pdf_paths = pdfs.get(DIRECTOR_DEALINGS.name) if isinstance(pdfs, dict) else None
+    return insider_summary(ticker, pdf_paths=pdf_paths)
+
+
+def financial_columns(ticker, inputs):
+    table = load_financial_table(ticker)
+    return table["columns"] if table else "No figures could be extracted from the financial statements"
+
+
+SHARED_INPUTS: List[SharedInput] = [
+    SharedInput("company_info", lambda ticker, inputs: get_company_info(ticker), in_task=True),
+    # Every profile section in one page load, the section texts below start from these PDFs
+    SharedInput("ngx_pdfs", lambda ticker, inputs: fetch_profile_sections(ticker, list(SECTIONS.values()))),
+    SharedInput("financial_statements", section_text(FINANCIAL_STATEMENTS), deps=("ngx_pdfs",)),
+    SharedInput("director_dealings", section_text(DIRECTOR_DEALINGS), deps=("ngx_pdfs",)),
+    SharedInput("insider_transactions", insider_table, deps=("ngx_pdfs",), in_task=True),
+    SharedInput("corporate_disclosures", section_text(CORPORATE_DISCLOSURES), deps=("ngx_pdfs",)),
+    SharedInput("financial_records", financial_columns, deps=("financial_statements",), in_task=True),
+    SharedInput("pe_ratio", lambda ticker, inputs: get_pe_ratio(ticker), in_task=True),
+]
+
+
+@dataclass(frozen=True)
+class Criterion:
+    key: str
+    question: str
+    agent: MultiStepAgent
+    # Shared inputs (or other criteria) that must be ready before the agent starts
+    inputs: Tuple[str, ...] = ("company_info",)
+
+
+CRITERIA: List[Criterion] = [
+    Criterion("insider_buying", "The insiders are buyers", insider_buying_agent,
+              inputs=("company_info", "insider_transactions")),
+    Criterion("share_buyback", "The company is buying back shares", share_buyback_agent,
+              inputs=("company_info", "corporate_disclosures")),
+    # The name agent judges both the name and the business behind it
+    Criterion("name", "Determine if the name of the stock sounds dull - or even better,ridiculous, "
+                      "and whether the company attached to the stock does something dull", name_agent),
+    Criterion("disagreeable", "Determine whether the company does something disagreeable", disagreeable_agent),
+    Criterion("spinoff", "Determine if the stock is a spinoff", spinoff_agent),
+    Criterion("institutions", "Determine if the institutions own it and if analysts follow it", institutions_agent),
+    Criterion("rumours", "The rumours around,its involved with toxic waste and/or the mafia", rumours_agent),
+    Criterion("depressing", "There is something depressing about it", depressing_agent),
+    Criterion("no_growth", "It's a no-growth industry", no_growth_agent),
+    Criterion("niche", "It's got a niche", niche_agent),
+    Criterion("recurring", "If people have to keep buying the products the company makes", recurring_agent),
+    Criterion("technology_user", "Its a user of technology", technology_user_agent),
+    Criterion("pe_ratio", "The p/e ratio,is it high or low for this particular company and "
+                          "for similar companies in the same industry", pe_ratio_agent,
+              inputs=("company_info", "pe_ratio")),
+    Criterion("earnings_growth", "The record of earnings growth to date and whether the earnings are "
+                                 "sporadic or consistent", earnings_growth_agent,
+              inputs=("company_info", "financial_records")),
+    Criterion("balance_sheet", "Whether the company has a strong balance sheet or a weak balance "
+                               "sheet(debt to equity ratio)", balance_sheet_agent,
+              inputs=("company_info", "financial_records")),
+    Criterion("cash_position", "The cash position of the company", cash_position_agent,
+              inputs=("company_info", "financial_records", "pe_ratio")),
+    # financial_metrics_agent is left out: the p/e, earnings growth, balance sheet and
+    # cash position criteria already cover its metrics with dedicated agents
+    Criterion("stock_category", "Determine what category/type of stock whether it is a slow grower,stalwart,"
+                                "fast grower,cyclical,turnaround,asset play or a new issue", stock_category_agent,
+              inputs=("company_info", "financial_records", "pe_ratio")),
+]
+
+SYNTHESIS_PROMPT = """
+You are a helpful stock analysis agent with the goal of providing the story of a stock or asset
+and determine if it should be bought.
+
+Specialized agents have already gone through every criterion for {ticker}. Their findings are below.
+
+COMPANY INFO:
+{company_info}
+
+CRITERIA FINDINGS:
+{findings}
+
+Using only these findings, give the story of the stock going through every criterion,
+then a final summary of the stock and whether it should be bought or not.
+Mention any criterion that could not be evaluated.
+"""
+
+
+def fresh_agent(agent: MultiStepAgent) -> MultiStepAgent:
+    """
+    Build a new agent with the same tools, model and settings as a managed agent.
+
+    Agents keep their memory on the instance, so concurrent runs (several tickers
+    at once, or several UI sessions) each need their own copy. Settings only one
+    agent class accepts (code execution for CodeAgent, tool threads for
+    ToolCallingAgent) are copied for that class only.
+    """
+    kwargs = dict(
+        tools=[tool_ for name, tool_ in agent.tools.items() if name != "final_answer"],
+        model=agent.model,
+        prompt_templates=agent.prompt_templates,
+        instructions=agent.instructions,
+        max_steps=agent.max_steps,
+        planning_interval=agent.planning_interval,
+        name=agent.name,
+        description=agent.description,
+        provide_run_summary=agent.provide_run_summary,
+        final_answer_checks=agent.final_answer_checks,
+        stream_outputs=agent.stream_outputs,
+        verbosity_level=0,
+    )
+    if isinstance(agent, CodeAgent):
+        kwargs.update(
+            additional_authorized_imports=agent.additional_authorized_imports,
+            executor_type=agent.executor_type,
+            executor_kwargs=agent.executor_kwargs,
+            max_print_outputs_length=agent.max_print_outputs_length,
+            code_block_tags=agent.code_block_tags,
+        )
+    elif isinstance(agent, ToolCallingAgent):
+        kwargs.update(max_tool_threads=agent.max_tool_threads)
+    return type(agent)(**kwargs)
+
+
+def criterion_task(criterion: Criterion, ticker: str, inputs: Dict[str, Any]) -> str:
+    shared = {shared_input.key: shared_input for shared_input in SHARED_INPUTS}
+    context = "\n\n".join(
+        f"{key} (already fetched, no need to fetch it again):\n{value}"
+        for key, value in inputs.items()
+        if key in shared and shared[key].in_task
+    )
+    return (
+        f"Stock: {ticker}\n"
+        f"Criterion: {criterion.question}\n\n"
+        f"{context}\n\n"
+        f"Evaluate this criterion for the stock."
+    )
+
+
+def run_criterion(criterion: Criterion, ticker: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one criterion agent and return its answer with timing, errors included"""
+    started = time.monotonic()
+    try:
+        answer = fresh_agent(criterion.agent).run(criterion_task(criterion, ticker, inputs))
+        status = "ok"
+    except Exception as e:
+        print(f"[{ticker}] criterion {criterion.key} failed: {e}")
+        answer = f"Error: {str(e)}"
+        status = "error"
+
+    seconds = round(time.monotonic() - started, 1)
+    print(f"[{ticker}] criterion {criterion.key} {status} in {seconds}s")
+    return {"question": criterion.question, "answer": str(answer), "status": status, "seconds": seconds}
+
+
+def fetch_shared_input(shared_input: SharedInput, ticker: str, inputs: Dict[str, Any]) -> Any:
+    """Fetch a shared input, a failure becomes an error text its dependents can still run with"""
+    started = time.monotonic()
+    try:
+        value = shared_input.fetch(ticker, inputs)
+    except Exception as e:
+        print(f"[{ticker}] could not fetch {shared_input.key}: {e}")
+        value = f"Error: {str(e)}"
+    print(f"[{ticker}] {shared_input.key} ready in {round(time.monotonic() - started, 1)}s")
+    return value
+
+
+def check_graph(tasks: List[Task]):
+    """Raise ValueError on unknown dependencies or cycles"""
+    keys = {task.key for task in tasks}
+    for task in tasks:
+        unknown = set(task.deps) - keys
+        if unknown:
+            raise ValueError(f"Task {task.key} depends on unknown tasks {sorted(unknown)}")
+
+    remaining = {task.key: set(task.deps) for task in tasks}
+    while remaining:
+        ready = [key for key, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle between {sorted(remaining)}")
+        for key in ready:
+            del remaining[key]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def run_dag(tasks: List[Task], max_parallel: int, timeout: float, name: str = "dag",
+            limits: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    Run tasks on a thread pool, each one as soon as all of its deps have finished.
+
+    A task whose dependency failed still runs, with whatever that dependency
+    returned. Tasks not finished after `timeout` seconds are left running in the
+    background and missing from the result.
+
+    Args:
+        limits (Dict[str, int]): Tasks of a group running at once, on top of max_parallel.
+                                 A ready task over its group's limit waits for one to finish.
+
+    Returns:
+        Dict[str, Any]: Result of every finished task keyed by task key
+    """
+    check_graph(tasks)
+    by_key = {task.key: task for task in tasks}
+    waiting = {task.key: set(task.deps) for task in tasks}
+    dependents = defaultdict(list)
+    for task in tasks:
+        for dep in task.deps:
+            dependents[dep].append(task.key)
+
+    results: Dict[str, Any] = {}
+    running = {}
+    limits = limits or {}
+    group_running = defaultdict(int)
+    deadline = time.monotonic() + timeout
+    pool = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix=name)
+
+    def submit_ready():
+        for key in [key for key, deps in waiting.items() if not deps]:
+            group = by_key[key].group
+            if group in limits and group_running[group] >= limits[group]:
+                continue
+            del waiting[key]
+            group_running[group] += 1
+            inputs = {dep: results.get(dep) for dep in by_key[key].deps}
+            running[pool.submit(by_key[key].run, inputs)] = key
+
+    try:
+        submit_ready()
+        while running:
+            done, _ = wait(running, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                print(f"[{name}] timed out waiting for {sorted(running.values())}")
+                break
+
+            for future in done:
+                key = running.pop(future)
+                group_running[by_key[key].group] -= 1
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    results[key] = f"Error: {str(e)}"
+                for dependent in dependents[key]:
+                    waiting[dependent].discard(key)
+
+            submit_ready()
+    finally:
+        # Do not block on stragglers, they finish in the background
+        pool.shutdown(wait=False)
+
+    return results
+
+
+def ticker_tasks(ticker: str, criteria: Optional[List[Criterion]] = None) -> List[Task]:
+    """The work graph of one ticker: the shared inputs its criteria need, then the criteria"""
+    criteria = criteria or CRITERIA
+    shared = {shared_input.key: shared_input for shared_input in SHARED_INPUTS}
+
+    # Only fetch the shared inputs (and their own deps) some criterion needs
+    needed = set()
+    stack = [key for criterion in criteria for key in criterion.inputs if key in shared]
+    while stack:
+        key = stack.pop()
+        if key not in needed:
+            needed.add(key)
+            stack.extend(shared[key].deps)
+
+    tasks = [
+        Task(shared_input.key,
+             lambda inputs, shared_input=shared_input: fetch_shared_input(shared_input, ticker, inputs),
+             deps=shared_input.deps)
+        for shared_input in SHARED_INPUTS
+        if shared_input.key in needed
+    ]
+    tasks += [
+        Task(criterion.key,
+             lambda inputs, criterion=criterion: run_criterion(criterion, ticker, inputs),
+             deps=criterion.inputs, group="criteria")
+        for criterion in criteria
+    ]
+    return tasks
+
+
+def run_criteria(ticker: str, criteria: Optional[List[Criterion]] = None,
+                 max_parallel: int = MAX_PARALLEL_CRITERIA,
+                 timeout: float = CRITERIA_TIMEOUT) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Fetch a ticker's shared inputs and run its criterion agents as a dependency graph.
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]: Shared inputs by key, and the
+        result per criterion key in criteria order. Criteria still running after
+        `timeout` seconds are reported as timed out.
+    """
+    criteria = criteria or CRITERIA
+    tasks = ticker_tasks(ticker, criteria)
+    # Shared inputs get their own threads, criterion agents are capped at max_parallel
+    results = run_dag(tasks, max_parallel=max_parallel + len(SHARED_INPUTS), timeout=timeout,
+                      name=f"criteria-{ticker}", limits={"criteria": max_parallel})
+
+    criteria_keys = {criterion.key for criterion in criteria}
+    shared = {key: value for key, value in results.items() if key not in criteria_keys}
+    findings = {
+        criterion.key: results.get(criterion.key) or {
+            "question": criterion.question, "answer": "Timed out", "status": "timeout", "seconds": timeout,
+        }
+        for criterion in criteria
+    }
+    return shared, findings
+
+
+def synthesize(ticker: str, company_info: Any, results: Dict[str, Dict[str, Any]]) -> str:
+    """Write the stock story and buy decision from the criteria findings in one LLM call"""
+    findings = "\n\n".join(
+        f"{number}. {result['question']}\n{result['answer']}"
+        for number, result in enumerate(results.values(), start=1)
+    )
+    prompt = SYNTHESIS_PROMPT.format(ticker=ticker, company_info=company_info, findings=findings)
+    message = synthesis_model.generate([
+        ChatMessage(role=MessageRole.USER, content=[{"type": "text", "text": prompt}])
+    ])
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def analyze_ticker(ticker: str, max_parallel: int = MAX_PARALLEL_CRITERIA) -> Dict[str, Any]:
+    """
+    Get the story of a stock: shared inputs and criteria as a dependency graph, then synthesis.
+
+    Args:
+        ticker (str): Stock ticker/symbol
+        max_parallel (int): Criterion agents running at once
+
+    Returns:
+        Dict[str, Any]: ticker, company_info, criteria (result per criterion), story and seconds
+    """
+    started = time.monotonic()
+    ticker = ticker.strip().upper()
+
+    shared, results = run_criteria(ticker, max_parallel=max_parallel)
+    company_info = shared.get("company_info", "Not available")
+    story = synthesize(ticker, company_info, results)
+
+    seconds = round(time.monotonic() - started, 1)
+    print(f"[{ticker}] analysis done in {seconds}s")
+    return {"ticker": ticker, "company_info": company_info, "criteria": results, "story": story, "seconds": seconds}
+
+
+@tool
+def analyze_stock(ticker:str) -> Dict[str, Any]:
+    """
+    Get the full story of a stock. Runs the specialized agent of every criterion in parallel
+    (insiders, buybacks, name, business, spinoff, institutions, rumours, growth, niche, p/e,
+    earnings growth, balance sheet, cash position, stock category, ...) and writes the story
+    of the stock with a buy decision from their findings.
+
+    Args:
+        ticker (str): The stock ticker/symbol of the company (e.g., "ABCTRANS")
+
+    Returns:
+        dict: "story" with the stock story and buy decision, and "criteria" with the finding
+              of every criterion agent
+    """
+    result = analyze_ticker(ticker)
+    return {
+        "story": result["story"],
+        "criteria": {key: value["answer"] for key, value in result["criteria"].items()},
+    }
@@ -6,7 +6,39 @@
 import scrapy
 
 
-class StockCrawlerItem(scrapy.Item):
-    # define the fields for your item here like:
-    # name = scrapy.Field()
-    pass
+class CompanyProfileItem(scrapy.Item):
+    ticker = scrapy.Field()
+    name = scrapy.Field()
+    sector = scrapy.Field()
+    sub_sector = scrapy.Field()
+    # Naira per share
+    price = scrapy.Field()
+    # Millions, as published on the profile
+    market_cap = scrapy.Field()
+    shares_outstanding = scrapy.Field()
+    source_url = scrapy.Field()
+    crawled_at = scrapy.Field()
+
+
+class DisclosureItem(scrapy.Item):
+    """One PDF listed in a tab of a company profile, keyed by its url"""
+    # Profile tab the document is listed under, same names as tools.ngx_profile.SECTIONS
+    section = "corporate_disclosures"
+
+    ticker = scrapy.Field()
+    title = scrapy.Field()
+    url = scrapy.Field()
+    published = scrapy.Field()
+    source_url = scrapy.Field()
+    crawled_at = scrapy.Field()
+    # Set by DisclosurePdfPipeline once the PDF is in the PDF cache
+    path = scrapy.Field()
+    sha256 = scrapy.Field()
+
+
+class DirectorDealingItem(DisclosureItem):
+    section = "director_dealings"
+
+
+class FinancialStatementItem(DisclosureItem):
+    section = "financial_statements"
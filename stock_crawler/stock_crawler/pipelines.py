@@ -3,11 +3,159 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from scrapy import Request
+from scrapy.exceptions import DropItem
+from scrapy.pipelines.files import FilesPipeline
+from twisted.internet.threads import deferToThread
 
+from stock_crawler.items import CompanyProfileItem, DisclosureItem
+
+# The crawl feeds the agent tools' caches, which live in the repository's tools package
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tools.crawl_store import CrawlStore  # noqa: E402
+from tools.pdf_cache import pdf_cache  # noqa: E402
+from tools.pdf_downloader import is_pdf_file  # noqa: E402
+
+
+class IncrementalStorePipeline:
+    """
+    Write crawled items to the local crawl store (CRAWL_STORE).
+
+    Profiles are upserted by ticker. Documents are keyed by url and only the ones
+    whose PDF has not been downloaded by an earlier crawl are passed on to later
+    pipelines, known ones are dropped, so a nightly crawl only hands over what is new.
+    """
+
+    def __init__(self, path: str):
+        self.store = CrawlStore(path)
+        self.listed = set()
+        self.stored = 0
+        self.known = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.settings["CRAWL_STORE"])
+
+    def close_spider(self, spider):
+        spider.logger.info(f"Store {self.store.path}: {self.stored} new or updated items, {self.known} already known")
 
-class StockCrawlerPipeline:
     def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+
+        if isinstance(item, CompanyProfileItem):
+            self.store.upsert_profile(adapter.asdict())
+            self.stored += 1
+            return item
+
+        if isinstance(item, DisclosureItem):
+            listing = (adapter["ticker"], item.section)
+            if listing not in self.listed:
+                self.store.mark_listed(*listing)
+                self.listed.add(listing)
+
+            if not self.store.add_document(dict(adapter.asdict(), section=item.section)):
+                self.known += 1
+                raise DropItem(f"Already stored: {adapter['url']}")
+            self.stored += 1
+            return item
+
+        return item
+
+
+def extract_document(pdf_path: str, ticker: str, section: str) -> int:
+    """
+    Run a downloaded PDF through the agent tools' extraction pipeline.
+
+    The page results land in the OCR cache, and financial statements are also turned
+    into records in the statement store, so the agents find both ready.
+
+    Returns:
+        int: Number of pages extracted
+    """
+    from tools.ngx_profile import SECTIONS
+    from tools.pdf_pipeline import extract_pdf_text
+    from tools.statement_extractor import extract_statement_records
+    from tools.statement_store import statement_store
+
+    pages = extract_pdf_text([pdf_path], top_pages=SECTIONS[section].top_pages)
+    if section == "financial_statements":
+        records = extract_statement_records(pages)
+        if records:
+            statement_store.save(ticker, records)
+    return len(pages)
+
+
+class DisclosurePdfPipeline(FilesPipeline):
+    """
+    Download the PDFs of new documents concurrently through Scrapy's downloader,
+    move them into the content-addressed PDF cache (a PDF published under several
+    urls is kept and extracted once) and hand them to a worker pool for text-layer
+    extraction/OCR. Items are passed on as soon as their PDF is cached, the
+    extraction results are recorded in the crawl store as they complete.
+    """
+
+    def __init__(self, store_uri, *args, crawler=None, **kwargs):
+        super().__init__(store_uri, *args, crawler=crawler, **kwargs)
+        settings = crawler.settings
+        self.staging = Path(store_uri)
+        self.store = CrawlStore(settings["CRAWL_STORE"])
+        self.workers = ThreadPoolExecutor(max_workers=settings.getint("EXTRACTION_WORKERS", 2),
+                                          thread_name_prefix="extraction")
+        self.extracting = set()
+
+    def get_media_requests(self, item, info):
+        if isinstance(item, DisclosureItem) and not pdf_cache.get(item["url"]):
+            yield Request(item["url"])
+
+    def item_completed(self, results, item, info):
+        if not isinstance(item, DisclosureItem):
+            return item
+
+        cached_path = pdf_cache.get(item["url"])
+        for ok, result in results:
+            if not ok:
+                info.spider.logger.warning(f"Could not download {item['url']}: {result}")
+                continue
+            staged_path = self.staging / result["path"]
+            if not is_pdf_file(str(staged_path)):
+                # An HTML error or bot-check page, keep it out of the PDF cache so the next crawl retries
+                info.spider.logger.warning(f"Not a PDF, discarded: {item['url']}")
+                staged_path.unlink(missing_ok=True)
+                continue
+            cached_path = pdf_cache.put(item["url"], str(staged_path),
+                                        ticker=item["ticker"], section=item.section)
+        if not cached_path:
+            return item
+
+        sha256 = Path(cached_path).stem
+        item["path"] = cached_path
+        item["sha256"] = sha256
+        self.store.mark_downloaded(item["url"], sha256)
+
+        if sha256 not in self.extracting:
+            self.extracting.add(sha256)
+            future = self.workers.submit(extract_document, cached_path, item["ticker"], item.section)
+            future.add_done_callback(lambda done, item=item: self.extraction_done(done, item, info.spider))
         return item
+
+    def extraction_done(self, future, item, spider):
+        try:
+            pages = future.result()
+        except Exception as e:
+            spider.logger.error(f"Extraction of {item['url']} failed: {e}")
+            return
+        self.store.mark_extracted(item["url"], pages)
+        spider.logger.info(f"Extracted {pages} pages of {item['ticker']} {item.section}: {item['title']}")
+
+    def close_spider(self, spider):
+        # Let the queued extractions finish without blocking the reactor
+        return deferToThread(self.workers.shutdown, wait=True)
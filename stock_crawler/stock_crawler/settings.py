@@ -7,6 +7,9 @@
 #     https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import os
+from pathlib import Path
+
 BOT_NAME = "stock_crawler"
 
 SPIDER_MODULES = ["stock_crawler.spiders"]
@@ -22,9 +25,11 @@ ADDONS = {}
 ROBOTSTXT_OBEY = True
 
 # Concurrency and throttling settings
-#CONCURRENT_REQUESTS = 16
-CONCURRENT_REQUESTS_PER_DOMAIN = 1
-DOWNLOAD_DELAY = 1
+# AutoThrottle (below) adapts the delay to the server's latency, these are the ceilings
+CONCURRENT_REQUESTS = 32
+CONCURRENT_REQUESTS_PER_DOMAIN = 8
+DOWNLOAD_DELAY = 0.25
+RETRY_TIMES = 3
 
 # Disable cookies (enabled by default)
 #COOKIES_ENABLED = False
@@ -58,30 +63,66 @@ DOWNLOAD_DELAY = 1
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "stock_crawler.pipelines.StockCrawlerPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "stock_crawler.pipelines.IncrementalStorePipeline": 300,
+    "stock_crawler.pipelines.DisclosurePdfPipeline": 400,
+}
+# Documents already in the store are dropped on every crawl, do not warn about each one
+DEFAULT_DROPITEM_LOG_LEVEL = "DEBUG"
+
+# Local store shared with the agent tools' cache directory
+CACHE_DIR = Path(os.getenv("STOCKAGENT_CACHE_DIR") or Path(__file__).resolve().parents[2] / "cache")
+CRAWL_STORE = os.getenv("CRAWL_STORE") or str(CACHE_DIR / "crawler.sqlite")
+
+# PDFs are staged here by the files pipeline, then moved into the PDF cache
+FILES_STORE = str(CACHE_DIR / "crawl_downloads")
+MEDIA_ALLOW_REDIRECTS = True
+# Threads feeding downloaded PDFs to the extraction pipeline, OCR itself runs on the OCR process pool
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS") or 2)
+
+# Without -a tickers, the crawl covers the tickers the agent tools already know:
+# the screener table, the disclosure watermarks and earlier crawls
+SCREENER_DB = os.getenv("SCREENER_DB") or str(CACHE_DIR / "screener.sqlite")
+
+# Pages the crawl starts from, {ticker} is replaced per company. NGX documents no
+# JSON API, so the defaults are the public HTML pages the browser tools scrape:
+# PDFs are read from the anchors of each section's table on the profile page.
+# Spiders handle JSON responses too, so an endpoint behind these pages can be set
+# here or with -s once confirmed.
+NGX_PROFILE_PAGE = "https://ngxgroup.com/exchange/data/company-profile/?symbol={ticker}&directory=companydirectory"
+# Only read when no ticker is known locally. The price list is a JavaScript table,
+# over plain HTTP it lists no ticker and the crawl stops with an error.
+NGX_TICKERS_URL = "https://ngxgroup.com/exchange/data/equities-price-list/"
+# JSON endpoint of the profile fields (name, sector, price, ...). The HTML profile
+# page renders them with JavaScript, so ngx_profiles refuses to start without it.
+NGX_PROFILE_URL = os.getenv("NGX_PROFILE_URL")
+NGX_SECTION_URLS = {
+    "corporate_disclosures": NGX_PROFILE_PAGE,
+    "director_dealings": NGX_PROFILE_PAGE,
+    "financial_statements": NGX_PROFILE_PAGE,
+}
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
-#AUTOTHROTTLE_ENABLED = True
+AUTOTHROTTLE_ENABLED = True
 # The initial download delay
-#AUTOTHROTTLE_START_DELAY = 5
+AUTOTHROTTLE_START_DELAY = 0.5
 # The maximum download delay to be set in case of high latencies
-#AUTOTHROTTLE_MAX_DELAY = 60
+AUTOTHROTTLE_MAX_DELAY = 30
 # The average number of requests Scrapy should be sending in parallel to
 # each remote server
-#AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+AUTOTHROTTLE_TARGET_CONCURRENCY = 4.0
 # Enable showing throttling stats for every response received:
 #AUTOTHROTTLE_DEBUG = False
 
 # Enable and configure HTTP caching (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-#HTTPCACHE_ENABLED = True
-#HTTPCACHE_EXPIRATION_SECS = 0
-#HTTPCACHE_DIR = "httpcache"
-#HTTPCACHE_IGNORE_HTTP_CODES = []
-#HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+# Listings change at most a few times a day, repeated crawls within 6 hours are served locally
+HTTPCACHE_ENABLED = True
+HTTPCACHE_EXPIRATION_SECS = int(os.getenv("CRAWL_HTTPCACHE_SECS") or 6 * 3600)
+HTTPCACHE_DIR = "httpcache"
+HTTPCACHE_IGNORE_HTTP_CODES = [403, 429, 500, 502, 503, 504]
+HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
 
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
@@ -0,0 +1,325 @@
+"""
+Spiders for the NGX company profiles and their disclosure listings.
+
+The spiders fetch the public NGX pages over plain HTTP instead of driving a
+browser: PDF links come from the anchors of each section's table on the
+company profile page, with the publication date read from the link's table
+row. The price list that names every ticker is a JavaScript table, so by
+default the tickers are the ones the agent tools already know (the screener
+table, the disclosure watermarks and earlier crawls). Every url is a setting
+(see settings.py) and can be overridden with -s; JSON responses are handled
+too, so an endpoint behind the pages can be used instead once confirmed.
+
+    scrapy crawl ngx_profiles -a tickers=DANGCEM,UACN -s NGX_PROFILE_URL=<json endpoint>
+    scrapy crawl ngx_disclosures              # every known company
+    scrapy crawl ngx_director_dealings
+    scrapy crawl ngx_financial_statements
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import unquote, urlparse
+
+import scrapy
+from scrapy.exceptions import CloseSpider, NotConfigured
+
+from stock_crawler.items import CompanyProfileItem, DirectorDealingItem, DisclosureItem, FinancialStatementItem
+
+# Known tickers come from the agent tools' stores, which live in the repository's tools package
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tools.crawl_store import CrawlStore  # noqa: E402
+from tools.disclosure_watermarks import disclosure_watermarks  # noqa: E402
+
+PDF_RE = re.compile(r"""[^"'\\\s<>]+\.pdf""", re.IGNORECASE)
+
+
+def now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def load_json(response) -> Optional[Any]:
+    """Body of a JSON response, None for HTML or malformed bodies"""
+    try:
+        return json.loads(response.text)
+    except (ValueError, AttributeError):
+        return None
+
+
+def iter_records(payload: Any) -> List[Dict[str, Any]]:
+    """
+    Rows of a JSON payload: the payload itself if it is a list, else the first list
+    of objects found under the usual envelope keys (value, data, results, d, ...)
+    """
+    if isinstance(payload, list):
+        return [record for record in payload if isinstance(record, dict)]
+    if isinstance(payload, dict):
+        for key in ("value", "data", "Data", "results", "Results", "d", "items", "Items"):
+            if key in payload:
+                records = iter_records(payload[key])
+                if records:
+                    return records
+        return [payload]
+    return []
+
+
+def pick(record: Dict[str, Any], *names: str) -> Optional[Any]:
+    """Value of the first of `names` present in a record, keys compared case-insensitively"""
+    lowered = {str(key).lower().replace("_", ""): value for key, value in record.items()}
+    for name in names:
+        value = lowered.get(name.lower().replace("_", ""))
+        if value not in (None, ""):
+            return value
+    return None
+
+
+_ISO_DATE_RE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})(?!\d)")
+_NUMERIC_DATE_RE = re.compile(r"\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})\b")
+_DAY_MONTH_RE = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?\s+([A-Za-z]{3,9})\.?,?\s+(\d{4})\b")
+_MONTH_DAY_RE = re.compile(r"\b([A-Za-z]{3,9})\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})\b")
+_EPOCH_RE = re.compile(r"/Date\((-?\d+)")
+
+
+def month_number(name: str) -> Optional[int]:
+    try:
+        return datetime.strptime(name[:3].title(), "%b").month
+    except ValueError:
+        return None
+
+
+def parse_published(value: Any) -> Optional[str]:
+    """
+    First date found in a table row or JSON value, as YYYY-MM-DD so the store can
+    sort on it. Numeric dates are read day first (as published in Nigeria) unless
+    the day first reading is impossible. None if no date is found.
+    """
+    text = str(value or "")
+    match = _EPOCH_RE.search(text)
+    if match:
+        return datetime.fromtimestamp(int(match.group(1)) / 1000, tz=timezone.utc).date().isoformat()
+
+    # (position, year, month, day) of every date-like match, tried in text order
+    candidates = []
+    for match in _ISO_DATE_RE.finditer(text):
+        candidates.append((match.start(), int(match.group(1)), int(match.group(2)), int(match.group(3))))
+    for match in _NUMERIC_DATE_RE.finditer(text):
+        first, second, year = (int(group) for group in match.groups())
+        month, day = (second, first) if second <= 12 else (first, second)
+        candidates.append((match.start(), year, month, day))
+    for match in _DAY_MONTH_RE.finditer(text):
+        candidates.append((match.start(), int(match.group(3)), month_number(match.group(2)), int(match.group(1))))
+    for match in _MONTH_DAY_RE.finditer(text):
+        candidates.append((match.start(), int(match.group(3)), month_number(match.group(1)), int(match.group(2))))
+
+    for _, year, month, day in sorted(candidates, key=lambda candidate: candidate[0]):
+        try:
+            return date(year, month, day).isoformat()
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def row_text(link) -> str:
+    """Text of every cell of the table row holding a link"""
+    return " ".join(link.xpath("ancestor::tr[1]//text()").getall())
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """Parse figures such as "₦6.25" or "62,500,000.00", None if not a number"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r"-?[\d,]*\.?\d+", str(value or ""))
+    if not match:
+        return None
+    try:
+        return float(match.group().replace(",", ""))
+    except ValueError:
+        return None
+
+
+class NgxSpider(scrapy.Spider, ABC):
+    """
+    Base spider: crawls the tickers given with -a tickers=A,B or, by default, every
+    ticker known locally (see known_tickers). Subclasses build the requests of a
+    ticker list in ticker_requests.
+    """
+
+    def __init__(self, tickers: Optional[str] = None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tickers = [ticker.strip().upper() for ticker in (tickers or "").split(",") if ticker.strip()]
+
+    async def start(self):
+        tickers = self.tickers or self.known_tickers()
+        if tickers:
+            for request in self.ticker_requests(tickers):
+                yield request
+        else:
+            self.logger.warning("No known tickers, reading them from NGX_TICKERS_URL")
+            yield scrapy.Request(self.settings["NGX_TICKERS_URL"], callback=self.parse_listing)
+
+    def known_tickers(self) -> List[str]:
+        """
+        Tickers the agent tools already know: rows of the screener table, sections
+        scraped by the browser tools (disclosure watermarks) and earlier crawls.
+        The price list that names them all is a JavaScript table, which comes back
+        empty over plain HTTP.
+        """
+        tickers = set(disclosure_watermarks.tickers()) | set(CrawlStore(self.settings["CRAWL_STORE"]).tickers())
+
+        screener_db = self.settings.get("SCREENER_DB")
+        if screener_db and os.path.exists(screener_db):
+            connection = sqlite3.connect(screener_db)
+            try:
+                tickers.update(row[0] for row in connection.execute("SELECT ticker FROM screen"))
+            except sqlite3.Error as e:
+                self.logger.warning(f"Could not read tickers from {screener_db}: {e}")
+            finally:
+                connection.close()
+
+        tickers = sorted(ticker.strip().upper() for ticker in tickers if ticker)
+        self.logger.info(f"{len(tickers)} known NGX tickers")
+        return tickers
+
+    def parse_listing(self, response):
+        payload = load_json(response)
+        if payload is not None:
+            symbols = [pick(record, "Symbol", "Ticker", "SecuritySymbol") for record in iter_records(payload)]
+        else:
+            symbols = re.findall(r"[?&]symbol=([^&#\"']+)", response.text)
+
+        tickers = sorted({str(symbol).strip().upper() for symbol in symbols if symbol})
+        if not tickers:
+            self.logger.error(
+                f"No tickers found at {response.url}, the price list is filled in with JavaScript. "
+                f"Pass -a tickers=A,B, run `python -m tools.screener --refresh` once or point "
+                f"NGX_TICKERS_URL at a JSON endpoint of the listing"
+            )
+            raise CloseSpider("no_tickers")
+        self.logger.info(f"Found {len(tickers)} NGX tickers")
+        yield from self.ticker_requests(tickers)
+
+    @abstractmethod
+    def ticker_requests(self, tickers: List[str]) -> Iterable[scrapy.Request]:
+        """Requests crawling the given tickers"""
+
+
+class NgxProfileSpider(NgxSpider):
+    name = "ngx_profiles"
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        if not crawler.settings.get("NGX_PROFILE_URL"):
+            raise NotConfigured("Set NGX_PROFILE_URL to a JSON endpoint of the profile fields, "
+                                "the profile page renders them with JavaScript")
+        return super().from_crawler(crawler, *args, **kwargs)
+
+    def ticker_requests(self, tickers):
+        for ticker in tickers:
+            yield scrapy.Request(
+                self.settings["NGX_PROFILE_URL"].format(ticker=ticker),
+                callback=self.parse_profile,
+                cb_kwargs={"ticker": ticker},
+            )
+
+    def parse_profile(self, response, ticker):
+        records = iter_records(load_json(response))
+        if not records:
+            self.logger.warning(f"No profile data for {ticker} at {response.url}")
+            return
+        record = records[0]
+
+        yield CompanyProfileItem(
+            ticker=ticker,
+            name=pick(record, "CompanyName", "Name", "IssuerName"),
+            sector=pick(record, "Sector"),
+            sub_sector=pick(record, "SubSector", "Sub_Sector"),
+            price=parse_number(pick(record, "ClosePrice", "Price", "SharePrice", "LastPrice")),
+            market_cap=parse_number(pick(record, "MarketCap", "MarketCapitalization")),
+            shares_outstanding=parse_number(pick(record, "SharesOutstanding", "OutstandingShares")),
+            source_url=response.url,
+            crawled_at=now(),
+        )
+
+
+class NgxDisclosureSpider(NgxSpider):
+    """Corporate disclosures tab, the section spiders below only change the endpoint and item"""
+    name = "ngx_disclosures"
+    item_class = DisclosureItem
+    # Only keep PDFs whose url contains this, like DisclosureSection.href_filter
+    href_filter: Optional[str] = None
+    # Anchors of the section's table on the HTML profile page, the row and fallback
+    # selectors of the matching tools.ngx_profile.DisclosureSection
+    link_selectors = ("div#latestdisclosures table tbody tr td a", "tbody#corpDisclose a")
+
+    def ticker_requests(self, tickers):
+        url_template = self.settings.getdict("NGX_SECTION_URLS")[self.item_class.section]
+        for ticker in tickers:
+            yield scrapy.Request(
+                url_template.format(ticker=ticker),
+                callback=self.parse_section,
+                cb_kwargs={"ticker": ticker},
+            )
+
+    def accepts(self, url: Optional[str]) -> bool:
+        if not url or not url.lower().endswith(".pdf"):
+            return False
+        return self.href_filter is None or self.href_filter in url
+
+    def parse_section(self, response, ticker):
+        payload = load_json(response)
+        if payload is not None:
+            documents = self.json_documents(payload)
+        else:
+            links = response.css(", ".join(self.link_selectors))
+            # The row's date cell gives the publication date
+            documents = [
+                (link.css("::text").get(), link.attrib.get("href"), row_text(link))
+                for link in links
+            ]
+
+        seen = set()
+        for title, href, published in documents:
+            url = response.urljoin(href) if href else None
+            if not self.accepts(url) or url in seen:
+                continue
+            seen.add(url)
+            yield self.item_class(
+                ticker=ticker,
+                title=str(title or unquote(urlparse(url).path.split("/")[-1])).strip(),
+                url=url,
+                published=parse_published(published),
+                source_url=response.url,
+                crawled_at=now(),
+            )
+
+    def json_documents(self, payload) -> List[tuple]:
+        """(title, href, published) of every PDF referenced by a JSON listing, published as listed"""
+        documents = []
+        for record in iter_records(payload):
+            title = pick(record, "Title", "DisclosureTitle", "Description", "Name")
+            published = pick(record, "Modified", "Date", "DatePublished", "PublishedDate", "Created")
+            for href in PDF_RE.findall(json.dumps(record)):
+                documents.append((title, href, published))
+        return documents
+
+
+class NgxDirectorDealingSpider(NgxDisclosureSpider):
+    name = "ngx_director_dealings"
+    item_class = DirectorDealingItem
+    link_selectors = ("div#latestdiclosuresDir_wrapper table tbody tr td a", "tbody#ngx_dirDealings a")
+
+
+class NgxFinancialStatementSpider(NgxDisclosureSpider):
+    name = "ngx_financial_statements"
+    item_class = FinancialStatementItem
+    href_filter = "FINANCIAL_STATEMENT"
+    link_selectors = ("div#financialstatement_wrapper table tbody tr td a", "tbody#ngx_finStatement a")
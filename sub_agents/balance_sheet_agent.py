@@ -1,6 +1,8 @@
 from smolagents import WebSearchTool, CodeAgent
 from llms import gemini_flash as model
 from tools.earnings_growth import get_financial_statements
+from tools.financial_records import get_financial_records
+from tools.financial_ratios import compute_financial_ratios
 import os
 import requests
 import json
@@ -48,8 +50,10 @@ WHAT TO LOOK FOR:
 
 SEARCH STRATEGY:
 1. Get the ticker/symbol through search if not provided
-2. Use the get_financial_statements tool to retrieve financial data
-3. Analyze the financial statements data and extract the most relevant information
+2. Use the get_financial_records tool first, it returns the total debt, total equity, cash, current assets and current liabilities of every period
+   already extracted from the financial statements
+3. Only use the get_financial_statements tool for figures get_financial_records does not have (null values),
+   analyze the financial statements data and extract the most relevant information
 4. Focus on the following balance sheet metrics:
    - Total debt (short-term and long-term)
    - Total equity (shareholders' equity)
@@ -58,7 +62,8 @@ SEARCH STRATEGY:
    - Cash and cash equivalents
    - Working capital position
 
-5. Calculate and analyze:
+5. Get these from the compute_financial_ratios tool instead of calculating them yourself,
+   and only calculate what it does not return, then analyze:
    - Debt-to-equity ratio (Total Debt / Total Equity)
    - Current ratio (Current Assets / Current Liabilities)
    - Quick ratio (Liquid Assets / Current Liabilities)
@@ -81,6 +86,8 @@ You must use the search strategy in the instructions to carry out the task
 """
 
 tools = [
+  get_financial_records,
+  compute_financial_ratios,
   get_financial_statements,
   google_search_tool,
 ]
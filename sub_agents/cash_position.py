@@ -1,6 +1,8 @@
 from smolagents import WebSearchTool, CodeAgent
 from llms import gemini_flash as model
 from tools.earnings_growth import get_financial_statements
+from tools.financial_records import get_financial_records
+from tools.financial_ratios import compute_financial_ratios
 import os
 import requests
 import json
@@ -48,8 +50,10 @@ WHAT TO LOOK FOR:
 
 SEARCH STRATEGY:
 1. Get the ticker/symbol through search if not provided
-2. Use the get_financial_statements tool to retrieve financial data
-3. Analyze the financial statements data and extract the most relevant information
+2. Use the get_financial_records tool first, it returns the cash, total debt and shares outstanding of every period
+   already extracted from the financial statements
+3. Only use the get_financial_statements tool for figures get_financial_records does not have (null values),
+   analyze the financial statements data and extract the most relevant information
 4. Focus on the following cash position metrics:
    - Cash and cash equivalents
    - Short-term investments
@@ -58,7 +62,8 @@ SEARCH STRATEGY:
    - Current stock price
    - Working capital position
 
-5. Calculate and analyze:
+5. Get these from the compute_financial_ratios tool (pass the current stock price as price) instead of calculating them yourself,
+   and only calculate what it does not return, then analyze:
    - Net cash position (Cash + Short-term investments - Total Debt)
    - Net cash per share (Net Cash / Shares Outstanding)
    - Cash floor price (Net cash per share as minimum theoretical price)
@@ -82,6 +87,8 @@ You must use the search strategy in the instructions to carry out the task
 """
 
 tools = [
+  get_financial_records,
+  compute_financial_ratios,
   get_financial_statements,
   google_search_tool,
 ]
@@ -1,6 +1,8 @@
 from smolagents import WebSearchTool, CodeAgent, GoogleSearchTool
 from llms import gemini_flash as model
 from tools.earnings_growth import get_financial_statements
+from tools.financial_records import get_financial_records
+from tools.financial_ratios import compute_financial_ratios
 import os
 import requests
 import json
@@ -46,8 +48,10 @@ WHAT TO LOOK FOR:
 
 SEARCH STRATEGY:
 1. Get the ticker/symbol through search if not provided
-2. Use the get_financial_statements tool to retrieve financial data
-3. Analyze the financial statements data and extract the most relevant information
+2. Use the get_financial_records tool first, it returns the revenue, net income and basic EPS of every period
+   already extracted from the financial statements
+3. Only use the get_financial_statements tool for figures get_financial_records does not have (null values),
+   analyze the financial statements data and extract the most relevant information
 4. Focus on the following financial metrics:
    - Basic earnings per share (EPS) over multiple periods
    - Earnings per share growth rates
@@ -55,7 +59,8 @@ SEARCH STRATEGY:
    - Net income trends
    - Quarterly and annual earnings consistency
 
-5. Calculate and analyze:
+5. Get these from the compute_financial_ratios tool instead of calculating them yourself,
+   and only calculate what it does not return, then analyze:
    - Year-over-year earnings growth rates
    - Consistency of growth (standard deviation of growth rates)
    - Trend analysis of Basic EPS
@@ -78,6 +83,8 @@ You must use the search strategy in the instructions to carry out the task
 """
 
 tools = [
+  get_financial_records,
+  compute_financial_ratios,
   get_financial_statements,
   google_search_tool,
 ]
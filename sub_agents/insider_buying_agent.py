@@ -4,7 +4,7 @@ import os
 import requests
 import json
 # import tempfile
-from tools.director_disclosure import extract_director_disclosures
+from tools.director_disclosure import extract_director_disclosures, get_insider_transactions
 
 search_tool = WebSearchTool()
 
@@ -48,9 +48,10 @@ WHAT TO LOOK FOR:
 
 SEARCH STRATEGY:
 1. Get the ticker/symbol through search if not provided
-2. Search for recent insider trading activity using the extract_director_disclosures tool
-3 Parse the data gotten from the tool pick the most suitable data from each dict
- and use it to answer the question
+2. Get the insider transactions and the net insider buying per period using the get_insider_transactions tool,
+ the transactions are already parsed so do not re-read the disclosures for them
+3 Only if fields you need are null or the tool returns an error, read the disclosures with the
+ extract_director_disclosures tool and pick the most suitable data from each dict
 After that then:
 - Analyze the data for:
 1. Insider buying vs. selling patterns
@@ -74,7 +75,7 @@ You must use the search strategy in the instructions to carry out the task
 """
 
 insider_buying_agent = CodeAgent(
-    tools=[extract_director_disclosures],
+    tools=[get_insider_transactions, extract_director_disclosures],
     model=model,
     planning_interval=4,
     max_steps=6,
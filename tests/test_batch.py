@@ -0,0 +1,61 @@
+import pytest
+
+batch = pytest.importorskip("batch")
+
+
+def finding(status):
+    return {"question": "q", "answer": "Error: rate limited" if status != "ok" else "Yes", "status": status}
+
+
+def analysis(ticker, *statuses):
+    return {"ticker": ticker, "company_info": "Info", "story": "Story",
+            "criteria": {f"c{number}": finding(status) for number, status in enumerate(statuses)}}
+
+
+@pytest.mark.parametrize("statuses, status", [
+    (("ok", "ok"), "ok"),
+    (("ok", "timeout"), "partial"),
+    (("ok", "error"), "partial"),
+    (("error", "timeout"), "error"),
+    ((), "error"),
+])
+def test_result_status(statuses, status):
+    assert batch.result_status(analysis("UACN", *statuses)) == status
+
+
+def test_failed_company_info_makes_a_partial_result():
+    result = dict(analysis("UACN", "ok"), company_info="Error: profile page timed out")
+    assert batch.result_status(result) == "partial"
+
+
+def test_resume_retries_tickers_with_failed_criteria(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "CACHE_DIR", tmp_path)
+    outcomes = {"UACN": ("ok", "ok"), "WAPCO": ("ok", "error"), "PRESCO": ("timeout", "error")}
+    calls = []
+
+    def analyze_ticker(ticker, max_parallel):
+        calls.append(ticker)
+        return analysis(ticker, *outcomes[ticker])
+
+    monkeypatch.setattr(batch, "analyze_ticker", analyze_ticker)
+    results = batch.run_batch(list(outcomes), run_id="nightly")
+    assert {ticker: result["status"] for ticker, result in results.items()} == {
+        "UACN": "ok", "WAPCO": "partial", "PRESCO": "error",
+    }
+
+    calls.clear()
+    outcomes.update(WAPCO=("ok", "ok"))
+    results = batch.run_batch(list(outcomes), run_id="nightly")
+    assert sorted(calls) == ["PRESCO", "WAPCO"]
+    assert results["WAPCO"]["status"] == "ok"
+
+
+def test_resume_rechecks_checkpoints_saved_as_ok(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "CACHE_DIR", tmp_path)
+    batch.BatchCheckpoints("nightly").save("UACN", dict(analysis("UACN", "error"), status="ok"))
+    calls = []
+    monkeypatch.setattr(batch, "analyze_ticker",
+                        lambda ticker, max_parallel: calls.append(ticker) or analysis(ticker, "ok"))
+
+    assert batch.run_batch(["UACN"], run_id="nightly")["UACN"]["status"] == "ok"
+    assert calls == ["UACN"]
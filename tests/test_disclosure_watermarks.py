@@ -0,0 +1,102 @@
+import time
+
+import tools.disclosure_watermarks as watermarks
+from tools.disclosure_watermarks import SectionWatermark, WatermarkStore
+
+
+def test_new_watermark_forces_a_full_walk():
+    watermark = SectionWatermark(ticker="UACN", section="director_dealings")
+
+    assert watermark.newest is None
+    assert watermark.known_urls() is None
+
+
+def test_complete_full_walk_enables_incremental_scrapes():
+    watermark = SectionWatermark(ticker="UACN", section="director_dealings")
+    new = watermark.advance(["c.pdf", "b.pdf", "a.pdf", "b.pdf"], complete=True, full_walk=True)
+
+    assert new == ["c.pdf", "b.pdf", "a.pdf"]
+    assert watermark.complete
+    assert watermark.full_sync_at > 0
+    assert watermark.known_urls() == {"a.pdf", "b.pdf", "c.pdf"}
+
+
+def test_incremental_scrape_prepends_only_new_urls():
+    watermark = SectionWatermark(ticker="UACN", section="director_dealings",
+                                 urls=["b.pdf", "a.pdf"], complete=True, full_sync_at=time.time())
+    full_sync_at = watermark.full_sync_at
+
+    new = watermark.advance(["d.pdf", "c.pdf", "b.pdf"], complete=True, full_walk=False)
+
+    assert new == ["d.pdf", "c.pdf"]
+    assert watermark.urls == ["d.pdf", "c.pdf", "b.pdf", "a.pdf"]
+    assert watermark.newest == "d.pdf"
+    # Only a full walk moves the full sync time
+    assert watermark.full_sync_at == full_sync_at
+
+
+def test_incomplete_walk_forces_the_next_scrape_to_walk_everything():
+    watermark = SectionWatermark(ticker="UACN", section="director_dealings")
+    watermark.advance(["b.pdf", "a.pdf"], complete=False, full_walk=True)
+
+    assert watermark.urls == ["b.pdf", "a.pdf"]
+    assert not watermark.complete
+    assert watermark.full_sync_at == 0.0
+    assert watermark.known_urls() is None
+
+
+def test_incomplete_incremental_walk_drops_the_complete_flag():
+    watermark = SectionWatermark(ticker="UACN", section="director_dealings",
+                                 urls=["a.pdf"], complete=True, full_sync_at=time.time())
+    watermark.advance(["b.pdf"], complete=False, full_walk=False)
+
+    assert watermark.known_urls() is None
+
+
+def test_full_sync_is_forced_after_the_interval(monkeypatch):
+    monkeypatch.setattr(watermarks, "WATERMARK_FULL_SYNC_DAYS", 7)
+    stale = time.time() - 8 * 24 * 3600
+    watermark = SectionWatermark(ticker="UACN", section="director_dealings",
+                                 urls=["a.pdf"], complete=True, full_sync_at=stale)
+
+    assert watermark.known_urls() is None
+
+
+def test_incremental_sync_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(watermarks, "INCREMENTAL_SYNC", False)
+    watermark = SectionWatermark(ticker="UACN", section="director_dealings",
+                                 urls=["a.pdf"], complete=True, full_sync_at=time.time())
+
+    assert watermark.known_urls() is None
+
+
+def test_store_round_trip(tmp_path):
+    path = tmp_path / "watermarks.json"
+    store = WatermarkStore(path)
+    watermark = store.get(" uacn ", "director_dealings")
+    assert watermark.ticker == "UACN"
+    assert watermark.urls == []
+
+    watermark.advance(["b.pdf", "a.pdf"], complete=True, full_walk=True)
+    store.save(watermark)
+
+    reloaded = WatermarkStore(path).get("UACN", "director_dealings")
+    assert reloaded == watermark
+    assert WatermarkStore(path).get("UACN", "financial_statements").urls == []
+
+
+def test_stores_of_other_processes_keep_each_others_sections(tmp_path):
+    path = tmp_path / "watermarks.json"
+    crawler, agent = WatermarkStore(path), WatermarkStore(path)
+    assert agent.get("UACN", "director_dealings").urls == []
+
+    dealings = SectionWatermark(ticker="UACN", section="director_dealings", urls=["a.pdf"])
+    crawler.save(dealings)
+    statements = SectionWatermark(ticker="DANGCEM", section="financial_statements", urls=["b.pdf"])
+    agent.save(statements)
+
+    # The agent's earlier read is stale, it sees the crawler's save and kept it
+    assert agent.get("UACN", "director_dealings") == dealings
+    assert crawler.get("DANGCEM", "financial_statements") == statements
+    assert WatermarkStore(path).tickers() == ["DANGCEM", "UACN"]
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
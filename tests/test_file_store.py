@@ -0,0 +1,48 @@
+import json
+import multiprocessing
+
+from tools.file_store import file_lock, write_json
+
+
+def increment(path, times):
+    for _ in range(times):
+        with file_lock(path):
+            with open(path, "r", encoding="utf-8") as f:
+                count = json.load(f)["count"]
+            write_json(path, {"count": count + 1})
+
+
+def test_write_json_replaces_the_file_and_leaves_no_temporary_file(tmp_path):
+    path = tmp_path / "store" / "data.json"
+    write_json(path, {"a": 1})
+    write_json(path, {"a": 2}, separators=(",", ":"))
+
+    assert path.read_text(encoding="utf-8") == '{"a":2}'
+    assert sorted(p.name for p in path.parent.iterdir()) == ["data.json"]
+
+
+def test_failed_write_keeps_the_previous_file(tmp_path):
+    path = tmp_path / "data.json"
+    write_json(path, {"a": 1})
+
+    try:
+        write_json(path, {"a": object()})
+    except TypeError:
+        pass
+    assert json.loads(path.read_text(encoding="utf-8")) == {"a": 1}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.json"]
+
+
+def test_lock_serializes_read_modify_write_across_processes(tmp_path):
+    path = tmp_path / "counter.json"
+    write_json(path, {"count": 0})
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=increment, args=(path, 25)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+
+    assert [process.exitcode for process in processes] == [0, 0, 0, 0]
+    assert json.loads(path.read_text(encoding="utf-8")) == {"count": 100}
@@ -0,0 +1,87 @@
+import pytest
+
+ratios = pytest.importorskip("tools.financial_ratios")
+
+
+def columns(**overrides):
+    base = {
+        "period": ["2021", "2022", "2023"],
+        "period_type": ["FY", "FY", "FY"],
+        "revenue": [100.0, 120.0, 150.0],
+        "net_income": [-10.0, 12.0, 15.0],
+        "basic_eps": [-0.5, 0.5, 1.0],
+        "total_debt": [20.0, None, 10.0],
+        "total_equity": [100.0, 0.0, 80.0],
+        "cash": [50.0, 40.0, None],
+        "current_assets": [60.0, 70.0, 80.0],
+        "current_liabilities": [30.0, 35.0, 0.0],
+        "inventories": [None, 10.0, 20.0],
+        "shares_outstanding": [10.0, 10.0, 10.0],
+    }
+    base.update(overrides)
+    return base
+
+
+def test_zero_or_missing_denominators_give_nulls():
+    per_period = ratios.compute_ratios(columns())["per_period"]
+
+    assert per_period["debt_to_equity"] == [0.2, None, 0.125]
+    assert per_period["current_ratio"] == [2.0, 2.0, None]
+
+
+def test_missing_inventories_count_as_zero_in_the_quick_ratio():
+    per_period = ratios.compute_ratios(columns())["per_period"]
+
+    assert per_period["quick_ratio"] == [2.0, 1.7143, None]
+
+
+def test_net_cash_needs_cash_but_not_debt():
+    per_period = ratios.compute_ratios(columns())["per_period"]
+
+    # No debt line in 2022 counts as no debt, no cash line in 2023 leaves net cash unknown
+    assert per_period["net_cash"] == [30.0, 40.0, None]
+    assert per_period["net_cash_per_share"] == [3.0, 4.0, None]
+
+
+def test_price_ratios_only_with_a_price():
+    assert "pe_ratio" not in ratios.compute_ratios(columns())["per_period"]
+
+    per_period = ratios.compute_ratios(columns(basic_eps=[0.0, 0.5, None]), price=10.0)["per_period"]
+    assert per_period["pe_ratio"] == [None, 20.0, None]
+    assert per_period["net_cash_to_price"] == [0.3, 0.4, None]
+
+
+def test_growth_against_the_absolute_previous_value():
+    result = ratios.compute_ratios(columns())
+
+    # -0.5 -> 0.5 is a loss turned into a profit, +200%
+    assert result["yoy"]["basic_eps_growth"] == [None, 2.0, 1.0]
+    summary = result["growth"]["basic_eps_growth"]
+    assert summary["mean"] == pytest.approx(1.5)
+    assert summary["periods"] == 2
+    assert summary["positive_periods"] == 2
+
+
+def test_growth_skips_gaps_and_interim_periods():
+    result = ratios.compute_ratios(columns(period=["2019", "2022", "2023"], period_type=["FY", "interim", "FY"]))
+
+    assert result["full_year_periods"] == ["2019", "2023"]
+    # 2019 -> 2023 are not consecutive years
+    assert result["yoy"]["revenue_growth"] == [None, None]
+    assert result["growth"]["revenue_growth"] == {"mean": None, "std": None, "periods": 0, "positive_periods": 0}
+
+
+def test_single_growth_rate_has_no_deviation():
+    result = ratios.compute_ratios(columns(period=["2022", "2023"], period_type=["FY", "FY"],
+                                           **{name: values[1:] for name, values in columns().items()
+                                              if name not in ("period", "period_type")}))
+
+    assert result["growth"]["revenue_growth"]["std"] is None
+    assert result["growth"]["revenue_growth"]["mean"] == pytest.approx(0.25)
+
+
+def test_missing_columns_give_nulls_not_errors():
+    result = ratios.compute_ratios({"period": ["2023"], "period_type": ["FY"], "revenue": [100.0]})
+
+    assert result["per_period"]["debt_to_equity"] == [None]
+    assert result["per_period"]["net_margin"] == [None]
@@ -0,0 +1,182 @@
+from datetime import date, timedelta
+
+import pytest
+
+insider = pytest.importorskip("tools.insider_transactions")
+InsiderTransaction = insider.InsiderTransaction
+
+NOTICE = """NOTIFICATION OF TRANSACTIONS BY PERSONS DISCHARGING MANAGERIAL RESPONSIBILITIES
+1 a) Name: John Doe
+2 a) Position/status: Executive Director
+4 a) Description of the financial instrument: Ordinary shares
+b) Nature of the transaction: Purchase of shares
+c) Price(s) and volume(s)
+Price Volume
+N5.20 100,000
+N5.25 50,000
+d) Aggregated information
+Volume: 150,000 Price: N5.22
+e) Date of the transaction: 12/03/2024
+f) Place of the transaction: Nigerian Exchange
+"""
+
+SECOND_NOTICE = """1 a) Name: Jane Roe
+2 a) Position/status: Non-Executive Director
+b) Nature of the transaction: Sale of shares acquired under the ESOP
+c) Price(s) and volume(s): N6.00 20,000
+e) Date of the transaction: 14th March, 2024
+"""
+
+
+def test_split_fields_reads_the_form_labels():
+    values = insider.split_fields(NOTICE)
+
+    assert values["name"] == "John Doe"
+    assert values["position"] == "Executive Director"
+    assert values["nature"] == "Purchase of shares"
+    assert values["date"] == "12/03/2024"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Price: N5.20 Volume: 100,000", (5.2, 100000.0)),
+    ("N5.20 100,000", (5.2, 100000.0)),
+    ("100,000 units at ₦12.50", (12.5, 100000.0)),
+    (None, (None, None)),
+])
+def test_parse_price_volume(text, expected):
+    assert insider.parse_price_volume(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("12/03/2024", "2024-03-12"),
+    ("2024-03-12", "2024-03-12"),
+    ("12th March, 2024", "2024-03-12"),
+    ("March 12, 2024", "2024-03-12"),
+    ("31/02/2024", None),
+    ("soon", None),
+])
+def test_parse_date(text, expected):
+    assert insider.parse_date(text) == expected
+
+
+@pytest.mark.parametrize("text, nature", [
+    ("Purchase of shares", "buy"),
+    ("Allotment of bonus shares", "buy"),
+    ("Sale of shares", "sell"),
+    ("Disposal", "sell"),
+    ("Sale of shares acquired under the employee share scheme", "sell"),
+    ("Sale and purchase of shares", "other"),
+    ("Transfer by gift", "other"),
+    (None, "other"),
+])
+def test_classify_nature(text, nature):
+    assert insider.classify_nature(text) == nature
+
+
+def test_every_price_volume_line_is_a_transaction():
+    transactions = insider.parse_notice(NOTICE)
+
+    assert [(t.price, t.volume) for t in transactions] == [(5.2, 100000.0), (5.25, 50000.0)]
+    assert {t.insider_name for t in transactions} == {"John Doe"}
+    assert {t.nature for t in transactions} == {"buy"}
+    assert transactions[0].value == 520000.0
+    assert transactions[0].date == "2024-03-12"
+
+
+def test_single_line_notice_falls_back_to_the_aggregated_volume():
+    text = NOTICE.replace("Price Volume\nN5.20 100,000\nN5.25 50,000\n", "N5.20\n")
+    transactions = insider.parse_notice(text)
+
+    assert [(t.price, t.volume) for t in transactions] == [(5.2, 150000.0)]
+
+
+def test_every_notice_of_a_pdf_is_parsed():
+    transactions = insider.parse_notices(NOTICE + SECOND_NOTICE, source="ocr", document="abc")
+
+    assert [t.insider_name for t in transactions] == ["John Doe", "John Doe", "Jane Roe"]
+    assert transactions[-1].nature == "sell"
+    assert transactions[-1].date == "2024-03-14"
+    assert {t.source for t in transactions} == {"ocr"}
+
+
+def test_text_without_a_dealing_yields_nothing():
+    assert insider.parse_notices("Board meeting notice\nThe board will meet on Friday.") == []
+
+
+@pytest.fixture
+def pdf(tmp_path, monkeypatch):
+    monkeypatch.setattr(insider, "TRANSACTION_CACHE_DIR", tmp_path / "insider")
+    path = tmp_path / "notice.pdf"
+    path.write_bytes(b"%PDF-1.4 notice")
+    return str(path)
+
+
+def test_transactions_are_cached_once_parsed(pdf, monkeypatch):
+    calls = []
+    monkeypatch.setattr(insider, "table_text", lambda path: calls.append(path) or NOTICE + SECOND_NOTICE)
+    monkeypatch.setattr(insider, "page_text", lambda path: pytest.fail("tables were enough"))
+
+    assert len(insider.extract_transactions(pdf)) == 3
+    assert len(insider.extract_transactions(pdf)) == 3
+    assert len(calls) == 1
+
+
+def test_failed_parses_are_not_cached(pdf, monkeypatch):
+    def broken(path):
+        raise RuntimeError("ghostscript crashed")
+
+    monkeypatch.setattr(insider, "table_text", broken)
+    monkeypatch.setattr(insider, "page_text", broken)
+    assert insider.extract_transactions(pdf) == []
+
+    monkeypatch.setattr(insider, "page_text", lambda path: SECOND_NOTICE)
+    transactions = insider.extract_transactions(pdf)
+    assert [t.insider_name for t in transactions] == ["Jane Roe"]
+    assert transactions[0].source == "ocr"
+
+
+def test_ocr_error_pages_are_not_cached(pdf, monkeypatch):
+    from tools.ocr_engine import error_result
+
+    pages = [
+        {"text": "NOTIFICATION OF DEALINGS", "source": "text_layer"},
+        error_result(TimeoutError("tesseract timed out")),
+    ]
+    monkeypatch.setattr(insider, "table_text", lambda path: "")
+    monkeypatch.setattr(insider, "extract_pdf_text", lambda paths: pages)
+    assert insider.extract_transactions(pdf) == []
+    assert not list(insider.TRANSACTION_CACHE_DIR.glob("*.json"))
+
+    pages[1] = {"text": SECOND_NOTICE, "source": "ocr", "confidence": 90.0}
+    assert [t.insider_name for t in insider.extract_transactions(pdf)] == ["Jane Roe"]
+    assert len(list(insider.TRANSACTION_CACHE_DIR.glob("*.json"))) == 1
+
+
+def test_net_insider_buying_per_quarter():
+    transactions = [
+        InsiderTransaction(insider_name="A", nature="buy", volume=100.0, value=500.0, date="2024-01-10"),
+        InsiderTransaction(insider_name="B", nature="sell", volume=40.0, value=240.0, date="2024-02-10"),
+        InsiderTransaction(insider_name="C", nature="buy", volume=10.0, value=60.0, date="2024-04-01"),
+        InsiderTransaction(insider_name="D", nature="other", volume=999.0, date="2024-04-01"),
+        InsiderTransaction(insider_name="E", nature="buy", volume=999.0),
+    ]
+    rows = insider.net_insider_buying(transactions)
+
+    assert [row["period"] for row in rows] == ["2024-Q2", "2024-Q1"]
+    assert rows[1]["net_volume"] == 60.0
+    assert rows[1]["net_value"] == 260.0
+    assert rows[1]["insiders_buying"] == ["A"]
+    assert rows[0]["buys"] == 1 and rows[0]["sells"] == 0
+
+
+def test_recent_net_volume_ignores_old_and_other_transactions():
+    recent = (date.today() - timedelta(days=30)).isoformat()
+    old = (date.today() - timedelta(days=400)).isoformat()
+    transactions = [
+        InsiderTransaction(nature="buy", volume=100.0, date=recent),
+        InsiderTransaction(nature="sell", volume=30.0, date=recent),
+        InsiderTransaction(nature="buy", volume=1000.0, date=old),
+        InsiderTransaction(nature="other", volume=1000.0, date=recent),
+    ]
+
+    assert insider.recent_net_volume(transactions) == 70.0
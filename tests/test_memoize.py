@@ -0,0 +1,121 @@
+import threading
+
+import pytest
+
+import tools.memoize as memoize_module
+from tools.memoize import memoize
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(memoize_module.time, "monotonic", clock)
+    return clock
+
+
+def test_results_expire_after_ttl(clock):
+    calls = []
+
+    @memoize(ttl=60)
+    def load(ticker):
+        calls.append(ticker)
+        return len(calls)
+
+    assert load("DANGCEM") == 1
+    clock.now += 59
+    assert load("DANGCEM") == 1
+    clock.now += 2
+    assert load("DANGCEM") == 2
+    assert calls == ["DANGCEM", "DANGCEM"]
+
+
+def test_least_recently_used_key_is_evicted():
+    calls = []
+
+    @memoize(maxsize=2)
+    def load(ticker):
+        calls.append(ticker)
+        return ticker
+
+    load("A")
+    load("B")
+    load("A")
+    load("C")  # evicts B, A was used more recently
+    load("A")
+    load("B")
+
+    assert calls == ["A", "B", "C", "B"]
+    assert load.cache_info()["size"] == 2
+
+
+def test_key_function_and_cache_if():
+    calls = []
+
+    @memoize(key=lambda ticker: ticker.strip().upper(), cache_if=bool)
+    def load(ticker):
+        calls.append(ticker)
+        return [] if ticker == "EMPTY" else [ticker]
+
+    load("uacn")
+    load(" UACN ")
+    load("EMPTY")
+    load("EMPTY")
+
+    assert calls == ["uacn", "EMPTY", "EMPTY"]
+
+
+def test_exceptions_are_not_cached():
+    calls = []
+
+    @memoize()
+    def load(ticker):
+        calls.append(ticker)
+        if len(calls) == 1:
+            raise RuntimeError("scrape failed")
+        return ticker
+
+    with pytest.raises(RuntimeError):
+        load("UACN")
+    assert load("UACN") == "UACN"
+    assert len(calls) == 2
+
+
+def test_concurrent_calls_share_a_single_flight():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    @memoize()
+    def load(ticker):
+        calls.append(ticker)
+        started.set()
+        release.wait(5)
+        return object()
+
+    results = []
+    owner = threading.Thread(target=lambda: results.append(load("DANGCEM")))
+    owner.start()
+    assert started.wait(5)
+
+    waiters = [threading.Thread(target=lambda: results.append(load("DANGCEM"))) for _ in range(4)]
+    for waiter in waiters:
+        waiter.start()
+    # Every waiter has joined the in-flight call before it is released
+    while load.cache_info()["shared"] < len(waiters):
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in [owner] + waiters:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 5
+    assert all(result is results[0] for result in results)
+    assert load.cache_info()["misses"] == 1
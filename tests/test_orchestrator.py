@@ -0,0 +1,55 @@
+import pytest
+
+orchestrator = pytest.importorskip("orchestrator")
+from smolagents import CodeAgent, ToolCallingAgent, tool
+from smolagents.models import Model
+
+
+class StubModel(Model):
+    def generate(self, messages, **kwargs):
+        raise AssertionError("the clone is never run")
+
+    def generate_stream(self, messages, **kwargs):
+        raise AssertionError("the clone is never run")
+
+
+@tool
+def company_name(ticker: str) -> str:
+    """
+    Name of a company.
+
+    Args:
+        ticker: Stock ticker
+    """
+    return ticker
+
+
+def test_fresh_agent_clones_a_tool_calling_agent():
+    agent = ToolCallingAgent(
+        tools=[company_name], model=StubModel(), instructions="Judge the name.", max_steps=6,
+        planning_interval=4, name="name_agent", description="Judges names", stream_outputs=True,
+        max_tool_threads=2,
+    )
+    clone = orchestrator.fresh_agent(agent)
+
+    assert type(clone) is ToolCallingAgent and clone is not agent
+    assert clone.memory is not agent.memory
+    assert set(clone.tools) == set(agent.tools)
+    assert (clone.name, clone.description, clone.instructions) == ("name_agent", "Judges names", "Judge the name.")
+    assert (clone.max_steps, clone.planning_interval) == (6, 4)
+    assert clone.stream_outputs is True
+    assert clone.max_tool_threads == 2
+
+
+def test_fresh_agent_clones_a_code_agent():
+    agent = CodeAgent(
+        tools=[company_name], model=StubModel(), max_steps=5, name="pe_ratio_agent",
+        description="Reads the P/E", additional_authorized_imports=["json"],
+    )
+    clone = orchestrator.fresh_agent(agent)
+
+    assert type(clone) is CodeAgent and clone is not agent
+    assert clone.additional_authorized_imports == ["json"]
+    assert clone.executor_type == agent.executor_type
+    assert clone.code_block_tags == agent.code_block_tags
+    assert set(clone.tools) == set(agent.tools)
@@ -0,0 +1,70 @@
+import sqlite3
+import time
+from pathlib import Path
+
+import tools.pdf_cache as pdf_cache_module
+from tools.pdf_cache import PdfCache
+
+
+def download(tmp_path, name, content):
+    path = tmp_path / "downloads" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_put_then_get(tmp_path):
+    cache = PdfCache(tmp_path / "pdfs")
+    cached = cache.put("https://ngx/a.pdf", download(tmp_path, "a.pdf", b"%PDF-1.4 a"), ticker="UACN")
+
+    assert cache.get("https://ngx/a.pdf") == cached
+    assert PdfCache(tmp_path / "pdfs").get("https://ngx/a.pdf") == cached
+    assert cache.get("https://ngx/unknown.pdf") is None
+    assert cache.entries(ticker="UACN")["https://ngx/a.pdf"]["filename"] == "a.pdf"
+
+
+def test_same_content_is_stored_once(tmp_path):
+    cache = PdfCache(tmp_path / "pdfs")
+    first = cache.put("https://ngx/a.pdf", download(tmp_path, "a.pdf", b"%PDF-1.4 same"))
+    second = cache.put("https://ngx/b.pdf", download(tmp_path, "b.pdf", b"%PDF-1.4 same"))
+
+    assert first == second
+    assert cache.total_bytes() == len(b"%PDF-1.4 same")
+
+
+def test_lookup_does_not_wait_for_another_writer(tmp_path):
+    cache = PdfCache(tmp_path / "pdfs")
+    cached = cache.put("https://ngx/a.pdf", download(tmp_path, "a.pdf", b"%PDF-1.4 a"))
+
+    writer = sqlite3.connect(cache.index_path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.monotonic()
+        assert cache.get("https://ngx/a.pdf") == cached
+        assert time.monotonic() - started < 5
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+
+def test_removed_blob_is_forgotten(tmp_path):
+    cache = PdfCache(tmp_path / "pdfs")
+    cached = cache.put("https://ngx/a.pdf", download(tmp_path, "a.pdf", b"%PDF-1.4 a"))
+    Path(cached).unlink()
+
+    assert cache.get("https://ngx/a.pdf") is None
+    assert cache.entries() == {}
+
+
+def test_eviction_skips_recently_used_blobs(tmp_path, monkeypatch):
+    cache = PdfCache(tmp_path / "pdfs", max_bytes=15)
+    old = cache.put("https://ngx/old.pdf", download(tmp_path, "old.pdf", b"%PDF-1.4 old"))
+
+    # Another process registered or read "old" just now, it survives the overflow
+    cache.put("https://ngx/new.pdf", download(tmp_path, "new.pdf", b"%PDF-1.4 new"))
+    assert cache.get("https://ngx/old.pdf") == old
+
+    monkeypatch.setattr(pdf_cache_module, "EVICTION_GRACE", 0)
+    time.sleep(0.01)
+    cache.put("https://ngx/newest.pdf", download(tmp_path, "newest.pdf", b"%PDF-1.4 newest"))
+    assert cache.get("https://ngx/old.pdf") is None
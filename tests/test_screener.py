@@ -0,0 +1,113 @@
+import time
+
+import pytest
+
+screener_module = pytest.importorskip("tools.screener")
+parse_where = screener_module.parse_where
+
+
+def test_conditions_are_parameterized():
+    conditions, params = parse_where("pe_ratio < 10 AND net_cash_to_price >= 0.3 and sector = 'Industrial Goods'")
+
+    assert conditions == ["pe_ratio < ?", "net_cash_to_price >= ?", "sector = ?"]
+    assert params == [10.0, 0.3, "Industrial Goods"]
+
+
+def test_empty_filter_has_no_conditions():
+    assert parse_where("  ") == ([], [])
+
+
+@pytest.mark.parametrize("where", [
+    "price_to_book < 1",
+    "pe_ratio < 10 and 1 = 1",
+    "updated_at > 0 and sqlite_master = 1",
+])
+def test_unknown_columns_are_rejected(where):
+    with pytest.raises(ValueError, match="Unknown column"):
+        parse_where(where)
+
+
+@pytest.mark.parametrize("where", [
+    "pe_ratio",
+    "pe_ratio LIKE 10",
+    "(pe_ratio) < 10",
+])
+def test_malformed_conditions_are_rejected(where):
+    with pytest.raises(ValueError):
+        parse_where(where)
+
+
+def test_values_never_reach_the_sql():
+    conditions, params = parse_where("sector = x' OR '1'='1")
+
+    assert conditions == ["sector = ?"]
+    assert params == ["x' OR '1'='1"]
+
+
+def test_query_filters_and_orders(tmp_path):
+    screener = screener_module.Screener(tmp_path / "screen.sqlite")
+    screener.upsert({"ticker": "CHEAP", "pe_ratio": 4.0, "buyback": 1})
+    screener.upsert({"ticker": "FAIR", "pe_ratio": 9.0, "buyback": 0})
+    screener.upsert({"ticker": "DEAR", "pe_ratio": 30.0, "buyback": 1})
+    screener.upsert({"ticker": "UNKNOWN", "pe_ratio": None, "buyback": 1})
+    screener.upsert({"ticker": "FAILED", "pe_ratio": 1.0, "error": "no statements"})
+
+    rows = screener.query("pe_ratio < 10", order_by="-pe_ratio")
+    assert [row["ticker"] for row in rows] == ["FAIR", "CHEAP"]
+
+    rows = screener.query("buyback = 1", order_by="pe_ratio")
+    # Missing values sort last, failed refreshes are never returned
+    assert [row["ticker"] for row in rows] == ["CHEAP", "DEAR", "UNKNOWN"]
+
+
+def test_query_rejects_unknown_order_column(tmp_path):
+    screener = screener_module.Screener(tmp_path / "screen.sqlite")
+
+    with pytest.raises(ValueError, match="Unknown column"):
+        screener.query("", order_by="pe_ratio; DROP TABLE screen")
+
+
+def test_numeric_columns_need_numbers():
+    # SQLite would compare the number with the text "10 or buyback = 1" and match every row
+    with pytest.raises(ValueError, match="expects a number"):
+        parse_where("pe_ratio < 10 or buyback = 1")
+
+
+def test_failed_refresh_keeps_the_last_good_row(tmp_path, monkeypatch):
+    screener = screener_module.Screener(tmp_path / "screen.sqlite")
+    outcomes = {"UACN": {"ticker": "UACN", "pe_ratio": 6.0}}
+
+    def screen_row(ticker):
+        outcome = outcomes[ticker]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return dict(outcome, updated_at=time.time())
+
+    monkeypatch.setattr(screener_module, "screen_row", screen_row)
+    assert screener.refresh(["UACN"], ttl=0) == {"UACN": "ok"}
+
+    outcomes["UACN"] = TimeoutError("profile page timed out")
+    assert screener.refresh(["UACN"], ttl=0) == {"UACN": "profile page timed out"}
+    assert [row["pe_ratio"] for row in screener.query("pe_ratio < 10")] == [6.0]
+    assert screener.failures()["UACN"]["error"] == "profile page timed out"
+
+    outcomes["UACN"] = {"ticker": "UACN", "error": "No figures could be extracted from the financial statements"}
+    screener.refresh(["UACN"], ttl=0)
+    assert [row["ticker"] for row in screener.query("pe_ratio < 10")] == ["UACN"]
+
+    outcomes["UACN"] = {"ticker": "UACN", "pe_ratio": 7.0}
+    screener.refresh(["UACN"], ttl=0)
+    assert [row["pe_ratio"] for row in screener.query("pe_ratio < 10")] == [7.0]
+    assert screener.failures() == {}
+
+
+def test_failed_first_refresh_is_not_screened(tmp_path, monkeypatch):
+    screener = screener_module.Screener(tmp_path / "screen.sqlite")
+
+    def screen_row(ticker):
+        raise TimeoutError("profile page timed out")
+
+    monkeypatch.setattr(screener_module, "screen_row", screen_row)
+    screener.refresh(["NEWCO"], ttl=0)
+    assert screener.query("") == []
+    assert "NEWCO" in screener.failures()
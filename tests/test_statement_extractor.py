@@ -0,0 +1,140 @@
+import pytest
+
+from tools.statement_extractor import (extract_page_figures, extract_statement_records, header_years, page_unit,
+                                       parse_figure)
+
+FINANCIAL_POSITION = """CONSOLIDATED STATEMENT OF FINANCIAL POSITION AS AT 31 DECEMBER 2023
+In thousands of Naira Note 2023 2022
+Inventories 14 2,500 2,000
+Loans to related parties 15 1,000 900
+Loans receivable 200 100
+Cash and cash equivalents 17 4,000 3,000
+Total current assets 9,000 7,500
+Total assets 50,000 40,000
+Interest-bearing loans and borrowings 21 5,000 4,000
+Bank overdraft 300 200
+Lease liabilities 100 -
+Total current liabilities 6,000 5,000
+Total equity 30,000 25,000
+"""
+
+PROFIT_OR_LOSS = """STATEMENT OF PROFIT OR LOSS FOR THE YEAR ENDED 31 DECEMBER 2023
+N'million 2023 2022
+Revenue 5 12,000 10,000
+Profit for the year 1,500 (300)
+Basic earnings per share (kobo) 12 150 (30)
+"""
+
+CASH_FLOWS = """STATEMENT OF CASH FLOWS
+N'000 2023 2022
+Proceeds from borrowings 900 800
+Borrowings repaid (700) (600)
+Loans repaid (100) (100)
+"""
+
+
+@pytest.mark.parametrize("token, value", [
+    ("1,234", 1234.0), ("(1,234)", -1234.0), ("-56.5", -56.5), ("-", 0.0), ("—", 0.0), ("n/a", None),
+])
+def test_parse_figure(token, value):
+    assert parse_figure(token) == value
+
+
+@pytest.mark.parametrize("text, unit", [
+    ("In thousands of Naira", 1e3), ("N'000", 1e3), ("N'million", 1e6), ("₦'bn", 1e9), ("Naira", 1.0),
+])
+def test_page_unit(text, unit):
+    assert page_unit(text) == unit
+
+
+def test_page_unit_ignores_unit_words_in_narrative_text():
+    text = "STATEMENT OF PROFIT OR LOSS\nNote 2023 2022\nN'000 N'000\nRevenue 12,000 10,000\n" \
+           "Revenue grew by N2 million on higher volumes, in millions of litres sold.\n"
+    assert page_unit(text) == 1e3
+    assert page_unit("Revenue rose to N5 billion in the year\n2023 2022\nRevenue 5 4") == 1.0
+
+
+def test_page_unit_is_read_near_the_year_header():
+    notes = "\n".join(f"Note {number}: amounts in thousands of Naira" for number in range(3))
+    assert page_unit(f"Naira 2023 2022\nRevenue 1 2\nCost of sales 1 2\nGross profit 1 2\n{notes}") == 1.0
+
+
+def test_header_years_keep_repeated_columns():
+    lines = ["Group and Company", "Note 2023 2022 2023 2022", "Revenue 1 2 3 4"]
+    assert header_years(lines) == ["2023", "2022", "2023", "2022"]
+
+
+def test_financial_position_labels_and_units():
+    figures = extract_page_figures(FINANCIAL_POSITION)
+
+    assert figures["inventories"] == {"2023": 2_500_000.0, "2022": 2_000_000.0}
+    assert figures["cash"] == {"2023": 4_000_000.0, "2022": 3_000_000.0}
+    assert figures["current_assets"]["2023"] == 9_000_000.0
+    assert figures["current_liabilities"]["2022"] == 5_000_000.0
+    assert figures["total_equity"]["2023"] == 30_000_000.0
+
+
+def test_revenue_reserve_is_not_revenue():
+    text = FINANCIAL_POSITION + "Share capital 1,000 1,000\nRevenue reserve 8,000 6,000\nRevenue reserves 8,000 6,000\n"
+    figures = extract_page_figures(text)
+
+    assert "revenue" not in figures
+    assert figures["total_equity"]["2023"] == 30_000_000.0
+
+
+def test_opening_cash_of_a_cash_flow_statement_is_not_the_balance():
+    text = "STATEMENT OF CASH FLOWS\nN'000 2023 2022\n" \
+           "Cash and cash equivalents at beginning of year 3,000 2,500\n" \
+           "Cash and cash equivalents at the start of the period 3,000 2,500\n" \
+           "Opening cash and cash equivalents 3,000 2,500\n" \
+           "Cash and cash equivalents at end of year 4,000 3,000\n"
+    assert extract_page_figures(text)["cash"] == {"2023": 4_000_000.0, "2022": 3_000_000.0}
+
+
+def test_debt_sums_liability_lines_only():
+    figures = extract_page_figures(FINANCIAL_POSITION)
+
+    # Borrowings + overdraft + leases; loans to related parties and loans receivable are assets
+    assert figures["total_debt"] == {"2023": 5_400_000.0, "2022": 4_200_000.0}
+
+
+def test_debt_is_not_read_from_cash_flow_pages():
+    assert "total_debt" not in extract_page_figures(CASH_FLOWS)
+
+
+def test_total_debt_line_wins_over_the_sum():
+    text = FINANCIAL_POSITION + "Total borrowings 6,000 5,000\n"
+    assert extract_page_figures(text)["total_debt"] == {"2023": 6_000_000.0, "2022": 5_000_000.0}
+
+
+def test_profit_or_loss_per_share_figures_are_not_scaled_by_the_page_unit():
+    figures = extract_page_figures(PROFIT_OR_LOSS)
+
+    assert figures["revenue"]["2023"] == 12_000_000_000.0
+    assert figures["net_income"]["2022"] == -300_000_000.0
+    # Reported in kobo, converted to Naira
+    assert figures["basic_eps"] == {"2023": 1.5, "2022": -0.3}
+
+
+def test_page_without_year_header_yields_nothing():
+    assert extract_page_figures("Revenue 12,000 10,000") == {}
+
+
+def test_records_merge_pages_per_period():
+    pages = [{"text": PROFIT_OR_LOSS}, {"text": FINANCIAL_POSITION, "source": "ocr"}, {"text": "Error: OCR failed"}]
+    records = extract_statement_records(pages)
+
+    assert [record.period for record in records] == ["2022", "2023"]
+    latest = records[-1]
+    assert latest.period_type == "FY"
+    assert latest.revenue == 12_000_000_000.0
+    assert latest.total_equity == 30_000_000.0
+    assert latest.total_debt == 5_400_000.0
+
+
+def test_interim_pages_get_their_own_records():
+    text = "UNAUDITED RESULTS FOR THE NINE MONTHS ENDED 30 SEPTEMBER\nN'000 2023 2022\n" \
+           "Revenue 900 800\nProfit for the period 90 80\n"
+    records = extract_statement_records([{"text": text}])
+
+    assert {record.period_type for record in records} == {"interim"}
@@ -0,0 +1,177 @@
+"""
+Process-wide pool of warm Chromium browsers shared by all Playwright-based tools.
+
+Playwright's sync API is bound to the thread that started it, so every browser in
+the pool is owned by a dedicated worker thread. Callers submit a task (a callable
+that receives a fresh page in an isolated browser context) and block on its result,
+which makes the pool safe to use from Gradio handlers and agent threads alike.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from playwright.sync_api import sync_playwright
+
+
+class BrowserPool:
+    def __init__(self, size: Optional[int] = None, max_pages_per_browser: Optional[int] = None,
+                 max_idle_seconds: float = 600, headless: bool = True,
+                 context_options: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            size (int): Maximum number of browsers alive at once (one per worker thread).
+                        Defaults to the BROWSER_POOL_SIZE environment variable or 2.
+            max_pages_per_browser (int): Number of leases served before a browser is
+                        recycled to keep its memory in check. Defaults to the
+                        BROWSER_POOL_MAX_PAGES environment variable or 25.
+            max_idle_seconds (float): Browsers idle for longer than this are relaunched
+                        on their next lease instead of being reused.
+            headless (bool): Launch Chromium headless
+            context_options (dict): Extra keyword arguments for browser.new_context()
+        """
+        self.size = size or int(os.getenv("BROWSER_POOL_SIZE") or 2)
+        self.max_pages_per_browser = max_pages_per_browser or int(os.getenv("BROWSER_POOL_MAX_PAGES") or 25)
+        self.max_idle_seconds = max_idle_seconds
+        self.headless = headless
+        self.context_options = context_options or {"accept_downloads": True}
+
+        self._tasks = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"launches": 0, "recycles": 0, "leases": 0, "failures": 0}
+
+    def run(self, task: Callable, *args, timeout: Optional[float] = None):
+        """
+        Lease a page from the pool, run task(page, *args) on it and return the result.
+
+        The page lives in its own browser context which is closed once the task
+        returns, so cookies, storage and downloads never leak between tasks.
+
+        Args:
+            task (Callable): Function receiving a Playwright Page as its first argument
+            *args: Extra positional arguments passed to the task
+            timeout (float): Seconds to wait for the result (None waits forever)
+
+        Returns:
+            Whatever the task returns. Exceptions raised by the task are re-raised here.
+        """
+        if threading.current_thread() in self._workers:
+            raise RuntimeError("BrowserPool.run() cannot be called from inside a pool task")
+
+        self._ensure_started()
+
+        future = Future()
+        self._tasks.put((task, args, future))
+        return future.result(timeout=timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for launches, recycles, leases and failed tasks"""
+        with self._lock:
+            return dict(self._stats, size=self.size, workers=len(self._workers))
+
+    def shutdown(self, timeout: float = 10):
+        """Close every browser and stop the worker threads"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers)
+
+        for _ in workers:
+            self._tasks.put(None)
+        for worker in workers:
+            worker.join(timeout=timeout)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BrowserPool has been shut down")
+            while len(self._workers) < self.size:
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"browser-pool-{len(self._workers)}",
+                    daemon=True,
+                )
+                self._workers.append(worker)
+                worker.start()
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _worker_loop(self):
+        playwright = None
+        browser = None
+        pages_served = 0
+        last_used = time.monotonic()
+
+        def close_browser():
+            try:
+                if browser is not None:
+                    browser.close()
+            except Exception as e:
+                print(f"Error closing pooled browser: {e}")
+
+        while True:
+            item = self._tasks.get()
+            if item is None:
+                break
+
+            task, args, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                if playwright is None:
+                    playwright = sync_playwright().start()
+
+                # Health check: relaunch browsers that crashed, served too many pages
+                # or sat idle long enough that the remote end may have dropped them
+                idle_for = time.monotonic() - last_used
+                healthy = browser is not None and browser.is_connected()
+                if not healthy or pages_served >= self.max_pages_per_browser or idle_for > self.max_idle_seconds:
+                    if browser is not None:
+                        close_browser()
+                        self._count("recycles")
+                    browser = playwright.chromium.launch(headless=self.headless)
+                    pages_served = 0
+                    self._count("launches")
+
+                context = browser.new_context(**self.context_options)
+                try:
+                    page = context.new_page()
+                    result = task(page, *args)
+                finally:
+                    try:
+                        context.close()
+                    except Exception as e:
+                        print(f"Error closing browser context: {e}")
+
+                pages_served += 1
+                self._count("leases")
+                future.set_result(result)
+
+            except BaseException as e:
+                self._count("failures")
+                future.set_exception(e)
+
+            finally:
+                last_used = time.monotonic()
+
+        close_browser()
+        try:
+            if playwright is not None:
+                playwright.stop()
+        except Exception as e:
+            print(f"Error stopping playwright: {e}")
+
+
+browser_pool = BrowserPool()
+
+atexit.register(browser_pool.shutdown)
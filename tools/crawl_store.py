@@ -0,0 +1,162 @@
+"""
+Local store of the NGX crawl (stock_crawler).
+
+The Scrapy spiders record company profiles, the documents listed in each
+profile tab and when each tab was last crawled. Their PDFs are downloaded into
+the PDF cache and run through the extraction pipeline as they arrive, so the
+agent tools can read a freshly crawled section from disk instead of scraping
+the profile page live.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tools.pdf_cache import CACHE_DIR, pdf_cache
+
+CRAWL_STORE = Path(os.getenv("CRAWL_STORE") or CACHE_DIR / "crawler.sqlite")
+# A crawled section older than this is scraped live again by the agent tools
+CORPUS_MAX_AGE = float(os.getenv("CORPUS_MAX_AGE") or 24 * 3600)
+
+PROFILE_COLUMNS = ("ticker", "name", "sector", "sub_sector", "price", "market_cap", "shares_outstanding",
+                   "source_url", "crawled_at")
+DOCUMENT_COLUMNS = ("url", "ticker", "section", "title", "published", "source_url", "crawled_at")
+# Filled in once the PDF is downloaded and extracted
+DOCUMENT_STATUS_COLUMNS = ("sha256", "pages", "extracted_at")
+
+
+class CrawlStore:
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path (Path): SQLite database file, defaults to CRAWL_STORE
+        """
+        self.path = Path(path) if path else CRAWL_STORE
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS profiles ({', '.join(PROFILE_COLUMNS)}, PRIMARY KEY (ticker))"
+            )
+            columns = ", ".join(DOCUMENT_COLUMNS + DOCUMENT_STATUS_COLUMNS)
+            connection.execute(f"CREATE TABLE IF NOT EXISTS documents ({columns}, PRIMARY KEY (url))")
+            connection.execute("CREATE INDEX IF NOT EXISTS documents_ticker ON documents (ticker, section)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS listings (ticker, section, crawled_at, PRIMARY KEY (ticker, section))"
+            )
+            connection.commit()
+            self._ready = True
+        return connection
+
+    def _execute(self, sql: str, params=()) -> int:
+        with self._lock:
+            connection = self._connect()
+            try:
+                cursor = connection.execute(sql, params)
+                connection.commit()
+                return cursor.rowcount
+            finally:
+                connection.close()
+
+    def _query(self, sql: str, params=()) -> List[tuple]:
+        connection = self._connect()
+        try:
+            return connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+
+    def upsert_profile(self, profile: Dict[str, Any]):
+        self._execute(
+            f"INSERT OR REPLACE INTO profiles ({', '.join(PROFILE_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in PROFILE_COLUMNS)})",
+            [profile.get(name) for name in PROFILE_COLUMNS],
+        )
+
+    def add_document(self, document: Dict[str, Any]) -> bool:
+        """
+        Record a listed document.
+
+        Returns:
+            bool: True if its PDF still has to be downloaded (new, or an earlier download failed)
+        """
+        self._execute(
+            f"INSERT OR IGNORE INTO documents ({', '.join(DOCUMENT_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in DOCUMENT_COLUMNS)})",
+            [document.get(name) for name in DOCUMENT_COLUMNS],
+        )
+        rows = self._query("SELECT sha256 FROM documents WHERE url = ?", (document["url"],))
+        return not (rows and rows[0][0])
+
+    def mark_listed(self, ticker: str, section: str):
+        """Record that a section of a ticker was just crawled"""
+        self._execute("INSERT OR REPLACE INTO listings VALUES (?, ?, ?)", (ticker, section, time.time()))
+
+    def tickers(self) -> List[str]:
+        """Tickers of every profile or listing crawled so far"""
+        return [row[0] for row in self._query("SELECT ticker FROM profiles UNION SELECT ticker FROM listings")]
+
+    def mark_downloaded(self, url: str, sha256: str):
+        self._execute("UPDATE documents SET sha256 = ? WHERE url = ?", (sha256, url))
+
+    def mark_extracted(self, url: str, pages: int):
+        self._execute("UPDATE documents SET pages = ?, extracted_at = ? WHERE url = ?", (pages, time.time(), url))
+
+    def section_urls(self, ticker: str, section: str, max_age: float = CORPUS_MAX_AGE) -> Optional[List[str]]:
+        """
+        Urls of the documents of a crawled section, newest first.
+
+        Returns:
+            List[str]: The urls, or None if the section was not crawled within max_age
+            seconds or some of its PDFs are not downloaded yet
+        """
+        listed = self._query("SELECT crawled_at FROM listings WHERE ticker = ? AND section = ?", (ticker, section))
+        if not listed or time.time() - listed[0][0] > max_age:
+            return None
+
+        rows = self._query(
+            "SELECT url, sha256 FROM documents WHERE ticker = ? AND section = ? ORDER BY published DESC",
+            (ticker, section),
+        )
+        if not rows or any(sha256 is None for _, sha256 in rows):
+            return None
+        return [url for url, _ in rows]
+
+
+crawl_store = CrawlStore()
+
+
+def corpus_pdfs(ticker: str, section: str, max_age: float = CORPUS_MAX_AGE) -> Optional[List[str]]:
+    """
+    Cached PDF paths of a section from the local crawl.
+
+    Args:
+        ticker (str): NGX ticker symbol
+        section (str): Section name (see tools.ngx_profile.SECTIONS)
+        max_age (float): Oldest crawl accepted, in seconds
+
+    Returns:
+        List[str]: PDF paths, or None when the section has to be scraped live
+    """
+    try:
+        urls = crawl_store.section_urls(ticker.strip().upper(), section, max_age)
+    except Exception as e:
+        print(f"Crawl store unreadable, scraping {section} of {ticker} live: {e}")
+        return None
+    if urls is None:
+        return None
+
+    paths = [pdf_cache.get(url) for url in urls]
+    if not all(paths):
+        # Some PDFs were evicted from the cache since the crawl
+        return None
+    print(f"Reading {len(paths)} crawled PDFs of {section} for {ticker}")
+    return paths
@@ -0,0 +1,132 @@
+"""
+Per-ticker, per-section watermarks of the NGX disclosure tables.
+
+Disclosure tables list the newest documents first. Once a section has been
+walked completely, its watermark holds every url seen (newest first), so the
+next scrape can stop paginating at the first page that reaches known rows and
+only the documents above it are new. A full walk is forced again after
+WATERMARK_FULL_SYNC_DAYS to pick up rows edited or inserted out of order.
+
+The browser tools and the Scrapy crawl share the watermark file: it is re-read
+whenever another process has changed it, and saves merge into the file under a
+lock shared by every process (see tools.file_store).
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from tools.file_store import file_lock, write_json
+from tools.pdf_cache import CACHE_DIR
+
+INCREMENTAL_SYNC = (os.getenv("NGX_INCREMENTAL_SYNC") or "1") not in ("0", "false", "no")
+WATERMARK_FULL_SYNC_DAYS = float(os.getenv("WATERMARK_FULL_SYNC_DAYS") or 7)
+
+
+@dataclass
+class SectionWatermark:
+    ticker: str
+    section: str
+    # Every document url seen in the section, newest first
+    urls: List[str] = field(default_factory=list)
+    # Whether urls holds the whole section, only then can a scrape stop at known rows
+    complete: bool = False
+    full_sync_at: float = 0.0
+    updated_at: float = 0.0
+
+    @property
+    def newest(self) -> Optional[str]:
+        return self.urls[0] if self.urls else None
+
+    def known_urls(self) -> Optional[set]:
+        """Urls a scrape may stop at, None when the section has to be walked in full"""
+        if not INCREMENTAL_SYNC or not self.complete:
+            return None
+        if time.time() - self.full_sync_at > WATERMARK_FULL_SYNC_DAYS * 24 * 3600:
+            return None
+        return set(self.urls)
+
+    def advance(self, urls: List[str], complete: bool, full_walk: bool) -> List[str]:
+        """
+        Merge the urls of a scrape into the watermark.
+
+        Args:
+            urls (List[str]): Urls collected by the scrape, newest first
+            complete (bool): Whether the scrape reached the last page or known rows
+            full_walk (bool): Whether the scrape walked the whole section
+
+        Returns:
+            List[str]: The urls that were not known before, newest first
+        """
+        known = set(self.urls)
+        new = [url for url in dict.fromkeys(urls) if url not in known]
+        self.urls = new + self.urls
+        self.complete = complete
+        if full_walk and complete:
+            self.full_sync_at = time.time()
+        self.updated_at = time.time()
+        return new
+
+
+class WatermarkStore:
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path (Path): JSON file of the watermarks, defaults to <cache dir>/watermarks.json
+        """
+        self.path = Path(path) if path else CACHE_DIR / "watermarks.json"
+        self._lock = threading.Lock()
+        self._data = None
+        # Identity of the file when it was read, a file replaced since is read again
+        self._stamp = None
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if self._data is None or stamp != self._stamp:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except FileNotFoundError:
+                self._data = {}
+            except Exception as e:
+                print(f"Watermarks unreadable, starting fresh: {e}")
+                self._data = {}
+            self._stamp = stamp
+        return self._data
+
+    @staticmethod
+    def _key(ticker: str, section: str) -> str:
+        return f"{ticker.strip().upper()}:{section}"
+
+    def get(self, ticker: str, section: str) -> SectionWatermark:
+        """Return the watermark of a section, an empty one if it was never scraped"""
+        with self._lock:
+            stored = self._load().get(self._key(ticker, section))
+        if stored:
+            return SectionWatermark(**stored)
+        return SectionWatermark(ticker=ticker.strip().upper(), section=section)
+
+    def tickers(self) -> List[str]:
+        """Tickers with at least one scraped section"""
+        with self._lock:
+            return sorted({key.split(":", 1)[0] for key in self._load()})
+
+    def save(self, watermark: SectionWatermark):
+        with self._lock, file_lock(self.path):
+            # Read under the file lock so the sections other processes saved are kept
+            self._data = None
+            data = self._load()
+            data[self._key(watermark.ticker, watermark.section)] = asdict(watermark)
+            write_json(self.path, data)
+            self._data = None
+
+
+disclosure_watermarks = WatermarkStore()
@@ -0,0 +1,74 @@
+"""
+Helpers for the JSON stores shared between processes.
+
+The OCR cache, statement store and disclosure watermarks are written by the
+agents, batch runs and the Scrapy crawl at the same time. Each read-modify-write
+runs under an exclusive lock on a "<file>.lock" file, which every process
+honours, and each write goes to its own temporary file that is renamed into
+place, so writers neither collide on a shared temporary file nor drop each
+other's entries.
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive lock on a file across processes until the block exits.
+
+    Args:
+        path (Path): File the lock guards, the lock itself is taken on "<path>.lock"
+    """
+    lock_path = Path(f"{path}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+b") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK gives up after about 10 seconds, keep waiting
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_json(path: Path, data: Any, **dump_kwargs):
+    """
+    Atomically replace a JSON file: the data is written to a temporary file of
+    its own in the same directory and renamed over `path` once complete.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, **dump_kwargs)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,152 @@
+from smolagents import tool
+from typing import Any, Dict, List, Optional
+from tools.financial_records import load_financial_table
+from tools.statement_extractor import FIGURE_FIELDS
+import numpy as np
+
+
+def to_array(values: List[Optional[float]]) -> np.ndarray:
+    """Column of the statement store as floats, missing values as NaN"""
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+def safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise division giving NaN where the denominator is 0 or missing"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = numerator / denominator
+    result[~np.isfinite(result)] = np.nan
+    return result
+
+
+def yoy_growth(values: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """
+    Year-over-year growth of each period against the previous one, NaN for the
+    first period and wherever the previous period is not the year before.
+    Growth is measured against the absolute previous value so a loss shrinking
+    counts as positive growth.
+    """
+    growth = np.full(values.shape, np.nan)
+    if len(values) < 2:
+        return growth
+    consecutive = np.diff(years) == 1
+    change = safe_divide(values[1:] - values[:-1], np.abs(values[:-1]))
+    growth[1:] = np.where(consecutive, change, np.nan)
+    return growth
+
+
+def growth_summary(growth: np.ndarray) -> Dict[str, Optional[float]]:
+    """Mean, standard deviation and count of the available growth rates"""
+    available = growth[~np.isnan(growth)]
+    if not len(available):
+        return {"mean": None, "std": None, "periods": 0, "positive_periods": 0}
+    return {
+        "mean": float(available.mean()),
+        "std": float(available.std(ddof=1)) if len(available) > 1 else None,
+        "periods": int(len(available)),
+        "positive_periods": int((available > 0).sum()),
+    }
+
+
+def to_list(values: np.ndarray, digits: int = 4) -> List[Optional[float]]:
+    return [None if np.isnan(value) else round(float(value), digits) for value in values]
+
+
+def compute_ratios(columns: Dict[str, List], price: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Compute balance sheet, cash and growth ratios for every period at once.
+
+    Args:
+        columns (Dict[str, List]): Statement store columns (see StatementStore.read_columns)
+        price (float): Current share price, enables the price based ratios
+
+    Returns:
+        Dict[str, Any]: "per_period" ratio columns aligned on "period", and
+        "growth" summaries over the full-year periods
+    """
+    periods = columns.get("period", [])
+    # Tables stored before a field existed lack its column, it is missing in every period
+    figures = {name: to_array(columns.get(name) or [None] * len(periods)) for name in FIGURE_FIELDS}
+
+    net_cash = figures["cash"] - np.nan_to_num(figures["total_debt"])
+    # No debt line found counts as no debt only when the cash figure exists
+    net_cash[np.isnan(figures["cash"])] = np.nan
+    net_cash_per_share = safe_divide(net_cash, figures["shares_outstanding"])
+
+    per_period = {
+        "period": list(periods),
+        "period_type": list(columns.get("period_type", [])),
+        "debt_to_equity": to_list(safe_divide(figures["total_debt"], figures["total_equity"])),
+        "current_ratio": to_list(safe_divide(figures["current_assets"], figures["current_liabilities"])),
+        "quick_ratio": to_list(safe_divide(figures["current_assets"] - np.nan_to_num(figures["inventories"]),
+                                           figures["current_liabilities"])),
+        "net_cash": to_list(net_cash, digits=2),
+        "net_cash_per_share": to_list(net_cash_per_share),
+        "net_margin": to_list(safe_divide(figures["net_income"], figures["revenue"])),
+    }
+    if price:
+        per_period["net_cash_to_price"] = to_list(net_cash_per_share / price)
+        per_period["pe_ratio"] = to_list(safe_divide(np.full(len(periods), float(price)), figures["basic_eps"]))
+
+    # Growth only compares full years with full years
+    full_year = np.array([period_type == "FY" for period_type in columns.get("period_type", [])], dtype=bool)
+    years = np.array([int(period) for period in periods], dtype=np.int64)[full_year]
+
+    growth = {}
+    yoy = {}
+    for name in ("basic_eps", "revenue", "net_income"):
+        rates = yoy_growth(figures[name][full_year], years)
+        yoy[f"{name}_growth"] = to_list(rates)
+        growth[f"{name}_growth"] = growth_summary(rates)
+
+    return {
+        "per_period": per_period,
+        "full_year_periods": [str(year) for year in years],
+        "yoy": yoy,
+        "growth": growth,
+    }
+
+
+@tool
+def compute_financial_ratios(ticker:str,stock_exchange:str="NGX",price:Optional[float]=None) -> Dict[str, Any]:
+    """
+    Compute financial ratios of an NGX (Nigerian Stock Exchange) company for every period
+    of its financial statements: debt-to-equity, current ratio, quick ratio, net cash,
+    net cash per share, net margin, year-over-year growth of basic EPS, revenue and net
+    income, and the mean and standard deviation of those growth rates.
+
+    The ratios are computed from the figures returned by get_financial_records, use them
+    as they are instead of recomputing them. A ratio is null when a figure it needs is missing.
+
+    Args:
+        ticker (str): The stock ticker/symbol of the company (e.g., "ABCTRANS")
+        stock_exchange (str): The stock exchange where the stock is listed.
+                             Currently only supports "NGX" (Nigerian Stock Exchange)
+        price (float): Current share price in Naira, optional. Adds net_cash_to_price
+                       and pe_ratio per period.
+
+    Returns:
+        dict: "per_period" ratio columns aligned on "period", "yoy" growth rates aligned on
+              "full_year_periods", and "growth" with the mean, std, number of periods and
+              number of positive periods of each growth rate (0.1 means 10%)
+
+    Example:
+        compute_financial_ratios("ABCTRANS") -> {
+            "per_period": {"period": ["2022", "2023"], "period_type": ["FY", "FY"],
+                           "debt_to_equity": [0.1389, 0.175], "current_ratio": [1.6, 1.6667], ...},
+            "full_year_periods": ["2022", "2023"],
+            "yoy": {"basic_eps_growth": [null, 4.75], ...},
+            "growth": {"basic_eps_growth": {"mean": 4.75, "std": null, "periods": 1, "positive_periods": 1}, ...}
+        }
+    """
+
+    if not stock_exchange == "NGX":
+
+        return "The function can only work for ngx listed stocks"
+
+    ticker = ticker.strip().upper()
+    table = load_financial_table(ticker)
+    if not table:
+        return {"error": f"No figures could be extracted from the financial statements of {ticker}, "
+                         "use get_financial_statements to read them instead"}
+
+    return dict(compute_ratios(table["columns"], price), ticker=ticker)
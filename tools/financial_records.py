@@ -0,0 +1,94 @@
+from smolagents import tool
+from typing import Any, Dict, List, Optional
+from tools.ngx_profile import get_section_text, FINANCIAL_STATEMENTS
+from tools.statement_extractor import StatementRecord, extract_statement_records
+from tools.statement_store import statement_store
+import os
+
+# Stored figures are re-extracted after this many seconds
+STATEMENT_STORE_TTL = float(os.getenv("STATEMENT_STORE_TTL") or 24 * 3600)
+
+
+def refresh_financial_records(ticker: str) -> List[StatementRecord]:
+    """
+    Extract the statement records of a ticker from its financial statement PDFs and store them.
+
+    Args:
+        ticker (str): NGX ticker symbol
+
+    Returns:
+        List[StatementRecord]: Records found in this run, oldest period first
+    """
+    ticker = ticker.strip().upper()
+    records = extract_statement_records(get_section_text(ticker, FINANCIAL_STATEMENTS))
+    if records:
+        statement_store.save(ticker, records)
+    print(f"Extracted {len(records)} statement periods for {ticker}")
+    return records
+
+
+def load_financial_table(ticker: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the stored statement table of a ticker, re-extracting it first when it is
+    missing or older than STATEMENT_STORE_TTL.
+
+    Returns:
+        Dict[str, Any]: See StatementStore.read_columns, None if no figures could be extracted
+    """
+    ticker = ticker.strip().upper()
+    age = statement_store.age(ticker)
+    if age is None or age > STATEMENT_STORE_TTL:
+        refresh_financial_records(ticker)
+    return statement_store.read_columns(ticker)
+
+
+@tool
+def get_financial_records(ticker:str,stock_exchange:str="NGX") -> Dict[str, Any]:
+    """
+    Get the key financial statement figures of an NGX (Nigerian Stock Exchange) company per period.
+
+    The figures are extracted once from the company's financial statement PDFs and stored
+    locally, so this is much smaller and faster than reading the statements themselves.
+    Amounts are in Naira, basic_eps is in Naira per share. A value is null when it could
+    not be found in the statements, use get_financial_statements to look it up.
+
+    Args:
+        ticker (str): The stock ticker/symbol of the company (e.g., "ABCTRANS")
+        stock_exchange (str): The stock exchange where the stock is listed.
+                             Currently only supports "NGX" (Nigerian Stock Exchange)
+
+    Returns:
+        dict: The figures as columns aligned on "period" (the financial year), with
+              "period_type" "FY" for full-year and "interim" for quarterly or half-year figures
+
+    Example:
+        get_financial_records("ABCTRANS") -> {
+            "ticker": "ABCTRANS",
+            "columns": {
+                "period": ["2022", "2023"],
+                "period_type": ["FY", "FY"],
+                "revenue": [40000000.0, 50000000.0],
+                "net_income": [-1000000.0, 4000000.0],
+                "basic_eps": [-0.4, 1.5],
+                "total_debt": [2500000.0, 3500000.0],
+                "total_equity": [18000000.0, 20000000.0],
+                "cash": [4000000.0, 5000000.0],
+                "current_assets": [8000000.0, 10000000.0],
+                "current_liabilities": [5000000.0, 6000000.0],
+                "inventories": [1000000.0, 1200000.0],
+                "shares_outstanding": [null, null]
+            }
+        }
+    """
+
+    if not stock_exchange == "NGX":
+
+        return "The function can only work for ngx listed stocks"
+
+    ticker = ticker.strip().upper()
+    table = load_financial_table(ticker)
+    if not table:
+        return {"error": f"No figures could be extracted from the financial statements of {ticker}, "
+                         "use get_financial_statements to read them instead"}
+
+    return {"ticker": ticker, "columns": table["columns"]}
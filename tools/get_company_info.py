@@ -1,7 +1,7 @@
 from smolagents import tool
-from playwright.sync_api import sync_playwright
+from tools.browser_pool import browser_pool
 from typing import Dict
-import time
+from tools.page_waits import wait_for_text
 
 @tool
 def get_company_info(ticker: str) -> Dict:
@@ -35,46 +35,43 @@ def get_company_info(ticker: str) -> Dict:
     market_cap_id = ".MarketCap"
     shares_outstanding_id = ".SharesOutstanding"
 
-    try:
-        with sync_playwright() as p:
-            # Launch browser
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context()
-            page = context.new_page()
+    def scrape_company_info(page):
+        # Navigate to the URL
+        print(f"Navigating to: {url}")
+        page.goto(url, wait_until="domcontentloaded",timeout=60000)
 
-            # Navigate to the URL
-            print(f"Navigating to: {url}")
-            page.goto(url, wait_until="networkidle",timeout=60000)
+        # Wait for the quote and profile fields to be filled in
+        wait_for_text(page, stock_id, "company_info:price")
+        wait_for_text(page, shares_outstanding_id, "company_info:profile")
 
-            # Wait for page to load completely
-            page.wait_for_load_state("networkidle")
-            time.sleep(3)  # Additional wait to ensure dynamic content loads
+        print("Page loaded successfully.")
 
-            print("Page loaded successfully.")
+        stock_price_el = page.locator(f"{stock_id}")
 
-            stock_price_el = page.locator(f"{stock_id}")
+        stock_price = stock_price_el.text_content()
 
-            stock_price = stock_price_el.text_content()
+        sector_el = page.locator(f"{sector_id}")
+        sector = sector_el.text_content()
 
-            sector_el = page.locator(f"{sector_id}")
-            sector = sector_el.text_content()
+        sub_sector_el = page.locator(f"{sub_sector_id}")
+        sub_sector = sub_sector_el.text_content()
 
-            sub_sector_el = page.locator(f"{sub_sector_id}")
-            sub_sector = sub_sector_el.text_content()
+        market_cap_el = page.locator(f"{market_cap_id}")
+        market_cap = market_cap_el.text_content()
 
-            market_cap_el = page.locator(f"{market_cap_id}")
-            market_cap = market_cap_el.text_content()
+        shares_el = page.locator(f"{shares_outstanding_id}")
+        shares = shares_el.text_content()
 
-            shares_el = page.locator(f"{shares_outstanding_id}")
-            shares = shares_el.text_content()
+        return {
+            "sector": sector,
+            "Sub sector": sub_sector,
+            "Market Cap (Mil.)": market_cap,
+            "Shares Outstanding (Mil.)": shares,
+            "Share price":stock_price,
+        }
 
-            return {
-                "sector": sector,
-                "Sub sector": sub_sector,
-                "Market Cap (Mil.)": market_cap,
-                "Shares Outstanding (Mil.)": shares,
-                "Share price":stock_price,
-            }
+    try:
+        return browser_pool.run(scrape_company_info)
 
     except Exception as e:
 
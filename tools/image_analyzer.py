@@ -14,7 +14,26 @@ from typing import List, Dict, Tuple, Union
 import argparse
 import os
 
+# OCR modes: "adaptive" runs one preprocessed pass and a second raw pass only for
+# low-confidence pages, "dual" always runs both passes and returns both texts,
+# "plain" runs a single raw pass (quick thumbnail reads)
+OCR_MODES = ("adaptive", "dual", "plain")
+
 class ImageAnalyzer:
+    # Bump whenever preprocessing or OCR settings change, cached OCR results
+    # produced by other versions are then ignored
+    VERSION = "3"
+
+    # Mean word confidence (0-100) under which the adaptive mode runs a second pass
+    SECOND_PASS_CONFIDENCE = 75
+    # Words under this confidence are reported back as low confidence
+    LOW_CONFIDENCE_WORD = 60
+
+    # Deskewing (opt-in) needs enough ink to measure and only corrects plausible angles (degrees)
+    DESKEW_MIN_PIXELS = 500
+    DESKEW_MIN_ANGLE = 0.3
+    DESKEW_MAX_ANGLE = 10
+
     def __init__(self):
         """Initialize the image analyzer with OCR engines"""
         # self.reader = easyocr.Reader(['en'])
@@ -52,28 +71,139 @@ class ImageAnalyzer:
         return []
         
     
+    @staticmethod
+    def to_gray(page: Union[Image.Image, np.ndarray]) -> np.ndarray:
+        """
+        Return a page as a 2-D uint8 grayscale array
+
+        Grayscale arrays are used as they are, without a copy. PIL images are
+        converted to grayscale if needed and read into an array once.
+        """
+        if isinstance(page, np.ndarray):
+            if page.ndim == 3:
+                return cv2.cvtColor(page, cv2.COLOR_RGB2GRAY)
+            return page
+        if page.mode != "L":
+            page = page.convert("L")
+        return np.asarray(page)
+
+    @staticmethod
+    def as_image(array: np.ndarray) -> Image.Image:
+        """
+        Wrap a 2-D uint8 array in a PIL image sharing its memory (no Image.fromarray copy)
+        """
+        array = np.ascontiguousarray(array)
+        height, width = array.shape
+        return Image.frombuffer("L", (width, height), array, "raw", "L", 0, 1)
+
+    @staticmethod
+    def otsu_thresholds(stack: np.ndarray) -> np.ndarray:
+        """
+        Otsu threshold of every page of a (pages, height, width) uint8 stack at once
+        """
+        # One bincount over the whole stack: page i's pixel values are offset by 256 * i
+        pages = stack.shape[0]
+        offsets = np.arange(pages, dtype=np.uint16 if pages <= 256 else np.uint32) * 256
+        binned = stack.reshape(pages, -1) + offsets[:, None]
+        histograms = np.bincount(binned.ravel(), minlength=256 * pages).reshape(pages, 256).astype(np.float64)
+        probabilities = histograms / histograms.sum(axis=1, keepdims=True)
+
+        omega = np.cumsum(probabilities, axis=1)
+        mu = np.cumsum(probabilities * np.arange(256), axis=1)
+        mu_total = mu[:, -1:]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            between_variance = (mu_total * omega - mu) ** 2 / (omega * (1.0 - omega))
+        between_variance = np.nan_to_num(between_variance, nan=0.0, posinf=0.0)
+
+        return between_variance.argmax(axis=1).astype(np.uint8)
+
+    @staticmethod
+    def line_sharpness(binary: np.ndarray) -> float:
+        """Variance of the ink per row, highest when text lines are horizontal"""
+        return float(np.var((binary == 0).sum(axis=1)))
+
+    def rotate(self, binary: np.ndarray, angle: float) -> np.ndarray:
+        height, width = binary.shape
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        return cv2.warpAffine(binary, matrix, (width, height), flags=cv2.INTER_NEAREST,
+                              borderMode=cv2.BORDER_CONSTANT, borderValue=255)
+
+    def deskew(self, binary: np.ndarray) -> np.ndarray:
+        """
+        Straighten a thresholded page, left untouched when it is not visibly skewed
+
+        The sign of the minAreaRect angle depends on the OpenCV version, so both
+        rotations are tried and one is only kept if it makes the text lines sharper
+        than the unrotated page.
+        """
+        ink = cv2.findNonZero(255 - binary)
+        if ink is None or len(ink) < self.DESKEW_MIN_PIXELS:
+            return binary
+
+        angle = cv2.minAreaRect(ink)[-1]
+        # minAreaRect reports (0, 90] or [-90, 0) depending on the OpenCV version
+        if angle > 45:
+            angle -= 90
+        elif angle < -45:
+            angle += 90
+
+        # Tiny angles are noise and large ones are usually misdetections
+        if not self.DESKEW_MIN_ANGLE <= abs(angle) <= self.DESKEW_MAX_ANGLE:
+            return binary
+
+        best, best_sharpness = binary, self.line_sharpness(binary)
+        for candidate_angle in (angle, -angle):
+            rotated = self.rotate(binary, candidate_angle)
+            sharpness = self.line_sharpness(rotated)
+            if sharpness > best_sharpness:
+                best, best_sharpness = rotated, sharpness
+        return best
+
+    def preprocess_batch(self, pages: List[Union[Image.Image, np.ndarray]],
+                         deskew: bool = False, denoise: bool = False) -> List[np.ndarray]:
+        """
+        Preprocess a batch of pages for OCR
+
+        Pages are converted straight to grayscale uint8, stacked by size (one copy
+        per page, a page alone at its size is used in place) and Otsu-thresholded
+        together. Denoising (3x3 median) and deskewing are opt-in: rendered PDFs
+        carry little noise and are rarely skewed.
+
+        Returns:
+            List[np.ndarray]: Binary pages in input order, ready for as_image()
+        """
+        grays = [self.to_gray(page) for page in pages]
+        processed: List[np.ndarray] = [None] * len(grays)
+
+        by_shape: Dict[Tuple[int, int], List[int]] = {}
+        for index, gray in enumerate(grays):
+            by_shape.setdefault(gray.shape, []).append(index)
+
+        for indices in by_shape.values():
+            if len(indices) == 1:
+                stack = grays[indices[0]][None]
+            else:
+                stack = np.stack([grays[index] for index in indices])
+            if denoise:
+                stack = np.stack([cv2.medianBlur(page, 3) for page in stack])
+
+            thresholds = self.otsu_thresholds(stack)
+            # Booleans viewed as uint8 are 0/1, scaling in place avoids another stack
+            binary = (stack > thresholds[:, None, None]).view(np.uint8)
+            binary *= 255
+
+            for position, index in enumerate(indices):
+                processed[index] = self.deskew(binary[position]) if deskew else binary[position]
+
+        return processed
+
     def preprocess_image(self, image: Image.Image) -> np.ndarray:
         """
         Preprocess PIL image for better OCR results
         """
         try:
-            # Convert PIL image to numpy array
-            image_array = np.array(image)
-            
-            # Convert to grayscale if it's RGB
-            if len(image_array.shape) == 3:
-                gray = cv2.cvtColor(image_array, cv2.COLOR_RGB2GRAY)
-            else:
-                gray = image_array
-            
-            # Apply thresholding to get binary image
-            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            
-            # Noise removal
-            kernel = np.ones((1, 1), np.uint8)
-            binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
-            
-            return binary
+            return self.preprocess_batch([image])[0]
         except Exception as e:
             print(f"Preprocessing error: {e}")
             return np.array(image)
@@ -86,16 +216,127 @@ class ImageAnalyzer:
             # Preprocess image
             processed = self.preprocess_image(image)
             
-            # Convert numpy array back to PIL Image for Tesseract
-            processed_pil = Image.fromarray(processed)
-            
             # Extract text from processed image
-            text = pytesseract.image_to_string(processed_pil)
+            text = pytesseract.image_to_string(self.as_image(processed))
             return text.strip()
         except Exception as e:
             print(f"Advanced OCR error: {e}")
             return ""
     
+    def extract_words(self, image: Union[Image.Image, np.ndarray]) -> List[Dict]:
+        """
+        Run Tesseract once and return the recognised words with their confidence
+        and bounding box, in reading order
+        """
+        try:
+            data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+        except Exception as e:
+            print(f"Tesseract OCR error: {e}")
+            return []
+
+        words = []
+        for i, text in enumerate(data["text"]):
+            confidence = float(data["conf"][i])
+            # Layout rows (blocks, lines) carry a confidence of -1
+            if confidence < 0 or not text.strip():
+                continue
+            words.append({
+                "text": text.strip(),
+                "conf": confidence,
+                "line": (data["block_num"][i], data["par_num"][i], data["line_num"][i]),
+                "box": (data["left"][i], data["top"][i], data["width"][i], data["height"][i]),
+            })
+        return words
+
+    @staticmethod
+    def mean_confidence(words: List[Dict]) -> float:
+        if not words:
+            return 0.0
+        return sum(word["conf"] for word in words) / len(words)
+
+    @staticmethod
+    def words_to_text(words: List[Dict]) -> str:
+        """Rebuild page text from words, one output line per Tesseract line"""
+        lines = []
+        current_line = None
+        for word in words:
+            if word["line"] != current_line:
+                # A new block starts a new paragraph
+                if current_line is not None and word["line"][0] != current_line[0]:
+                    lines.append("")
+                lines.append(word["text"])
+                current_line = word["line"]
+            else:
+                lines[-1] = f"{lines[-1]} {word['text']}"
+        return "\n".join(lines).strip()
+
+    @staticmethod
+    def merge_words(base: List[Dict], other: List[Dict]) -> List[Dict]:
+        """
+        Replace words of the base pass with the overlapping word of the other pass
+        when the other pass read it with a higher confidence
+        """
+        def overlap(a, b):
+            ax, ay, aw, ah = a
+            bx, by, bw, bh = b
+            width = min(ax + aw, bx + bw) - max(ax, bx)
+            height = min(ay + ah, by + bh) - max(ay, by)
+            if width <= 0 or height <= 0:
+                return 0.0
+            return (width * height) / max(min(aw * ah, bw * bh), 1)
+
+        merged = []
+        for word in base:
+            best = max(other, key=lambda candidate: overlap(word["box"], candidate["box"]), default=None)
+            if best is not None and overlap(word["box"], best["box"]) > 0.5 and best["conf"] > word["conf"]:
+                word = dict(best, line=word["line"])
+            merged.append(word)
+        return merged
+
+    def extract_text_adaptive(self, image: Union[Image.Image, np.ndarray]) -> Dict:
+        """
+        Single-pass OCR with a confidence-driven fallback
+
+        The preprocessed image is OCR'd first. Only when its mean word confidence is
+        low is the raw image OCR'd as well, and the two passes are merged word by
+        word keeping the more confident reading.
+        """
+        gray = self.to_gray(image)
+        words = self.extract_words(self.as_image(self.preprocess_image(gray)))
+        passes = 1
+
+        if self.mean_confidence(words) < self.SECOND_PASS_CONFIDENCE:
+            raw_words = self.extract_words(self.as_image(gray))
+            passes = 2
+            if self.mean_confidence(raw_words) > self.mean_confidence(words):
+                words, raw_words = raw_words, words
+            words = self.merge_words(words, raw_words)
+
+        return {
+            "text": self.words_to_text(words),
+            "source": "ocr",
+            "confidence": round(self.mean_confidence(words), 1),
+            "low_confidence_words": [
+                [word["text"], round(word["conf"])]
+                for word in words
+                if word["conf"] < self.LOW_CONFIDENCE_WORD
+            ],
+            "passes": passes,
+        }
+
+    def extract_text(self, image: Union[Image.Image, np.ndarray], mode: str = "adaptive") -> Dict:
+        """
+        Extract text in one of the OCR_MODES
+        """
+        if mode == "dual":
+            return {
+                "text_ocr": self.extract_text_ocr(image),
+                "text_advanced": self.extract_text_advanced(image),
+            }
+        if mode == "plain":
+            return {"text": self.extract_text_ocr(image), "source": "ocr"}
+        return self.extract_text_adaptive(image)
+
     def analyze_ui_elements(self, image: Image.Image) -> Dict:
         """
         Analyze UI elements in the PIL image
@@ -192,8 +433,7 @@ class ImageAnalyzer:
         """
         try:
             processed = self.preprocess_image(image)
-            processed_pil = Image.fromarray(processed)
-            processed_pil.save(output_path)
+            self.as_image(processed).save(output_path)
             print(f"Processed image saved to: {output_path}")
         except Exception as e:
             print(f"Error saving processed image: {e}")
@@ -0,0 +1,441 @@
+"""
+Typed insider transactions from NGX director dealing notices.
+
+Director dealing notices follow the NGX notification form: the insider's name,
+position/status, the nature of the transaction, price(s) and volume(s),
+aggregated volume and price, and the date. The form's tables are read with
+camelot first (lattice, then stream); scanned notices without a text layer
+fall back to the OCR pipeline. Either way the text is split on the form's
+labels into one InsiderTransaction per notice and price/volume line, cached
+per PDF, and the transactions are summed into net insider buying per period.
+"""
+
+import json
+import re
+from collections import defaultdict
+from dataclasses import asdict, dataclass, fields
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import camelot
+
+from tools.file_store import write_json
+from tools.ocr_engine import is_error
+from tools.pdf_cache import CACHE_DIR, file_sha256
+from tools.pdf_pipeline import extract_pdf_text
+
+# Bump when the parser changes so cached transactions are parsed again
+PARSER_VERSION = "2"
+TRANSACTION_CACHE_DIR = CACHE_DIR / "insider"
+
+
+@dataclass
+class InsiderTransaction:
+    insider_name: Optional[str] = None
+    position: Optional[str] = None
+    # "buy", "sell" or "other" (transfers, gifts, pledges, ...)
+    nature: str = "other"
+    volume: Optional[float] = None
+    # Naira per share
+    price: Optional[float] = None
+    value: Optional[float] = None
+    # ISO date of the transaction
+    date: Optional[str] = None
+    # "table" when read from the PDF's tables, "ocr" when from the page text
+    source: str = "table"
+    document: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+TRANSACTION_FIELDS: Tuple[str, ...] = tuple(field.name for field in fields(InsiderTransaction))
+
+# Form labels, each value runs from its label to the next label
+LABELS: Tuple[Tuple[str, str], ...] = (
+    ("issuer", r"name of (?:the )?(?:issuer|company|entity)"),
+    ("description", r"description of (?:the )?financial instrument"),
+    ("nature", r"nature of (?:the )?transactions?"),
+    ("price_volume", r"prices?\s*\(?s?\)?\s*(?:and|&)\s*volumes?\s*\(?s?\)?"),
+    ("aggregated", r"aggregated? (?:information|volume)"),
+    ("date", r"date of (?:the )?transactions?"),
+    ("place", r"place of (?:the )?transactions?"),
+    ("position", r"position\s*/?\s*status|designation|position"),
+    ("name", r"name(?: of (?:the )?(?:director|insider|person))?"),
+    ("reason", r"reason for (?:the )?notification"),
+)
+_LABEL_RE = re.compile("|".join(f"(?P<{name}>\\b(?:{pattern})(?!\\w))" for name, pattern in LABELS), re.IGNORECASE)
+# Item markers of the form ("a)", "4.", "4") left at the end of a value
+_MARKER_RE = re.compile(r"(?:\s+(?:\(?[a-h]\)|\d{1,2}\.?)|^\(?[a-h]\))+\s*$", re.IGNORECASE)
+
+_BUY_RE = re.compile(r"purchas|\bbuy|\bbought", re.IGNORECASE)
+_SELL_RE = re.compile(r"\bsale\b|\bsell|\bsold\b|dispos", re.IGNORECASE)
+# Weaker buy terms, also used to describe where sold shares came from ("sale of shares acquired under ...")
+_ACQUIRE_RE = re.compile(r"acqui|allot|subscri", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"(?<![\w.])(?:N|₦|NGN)?\s?(\d[\d,]*(?:\.\d+)?)")
+
+_MONTHS = {month: index for index, month in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)}
+
+
+def clean_value(value: str) -> Optional[str]:
+    value = _MARKER_RE.sub("", re.sub(r"\s+", " ", value)).strip(" :-–|")
+    return value or None
+
+
+def label_segments(text: str) -> List[Tuple[str, str]]:
+    """(label, raw text up to the next label) for every form label in the text, in order"""
+    matches = list(_LABEL_RE.finditer(text))
+    return [
+        (match.lastgroup, text[match.end():following.start() if following else len(text)])
+        for match, following in zip(matches, matches[1:] + [None])
+    ]
+
+
+def split_fields(text: str) -> Dict[str, str]:
+    """
+    Split notice text on the form labels.
+
+    A value ends at the next label, or at the end of its line when the label is
+    followed by text on the same line (table rows, one label and value per line).
+
+    Returns:
+        Dict[str, str]: Value per label, the first non-empty occurrence of each label wins
+    """
+    values: Dict[str, str] = {}
+    for label, segment in label_segments(text):
+        first_line = segment.split("\n", 1)[0]
+        value = clean_value(first_line if first_line.strip(" :-–|") else segment)
+        if value and label not in values:
+            values[label] = value
+    return values
+
+
+def split_notices(text: str) -> List[str]:
+    """
+    Split text holding several notices (one PDF filing several dealings) into one
+    text per notice. A notice starts at the insider's name label once the previous
+    one has had its nature of transaction.
+    """
+    starts = [0]
+    has_nature = False
+    for match in _LABEL_RE.finditer(text):
+        if match.lastgroup == "nature":
+            has_nature = True
+        elif match.lastgroup == "name" and has_nature:
+            starts.append(match.start())
+            has_nature = False
+    return [text[start:end] for start, end in zip(starts, starts[1:] + [len(text)])]
+
+
+def parse_price_volume(text: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Read (price, volume) from a "Price(s) and volume(s)" or aggregated value.
+
+    Labelled figures ("Price: N5.20 Volume: 100,000") are used as labelled, otherwise
+    the figure with decimals or a currency sign is the price and the largest other
+    figure is the volume.
+    """
+    if not text:
+        return None, None
+
+    price = volume = None
+    labelled_price = re.search(r"price\s*[:\-]?\s*(?:N|₦|NGN)?\s*(\d[\d,]*(?:\.\d+)?)", text, re.IGNORECASE)
+    labelled_volume = re.search(r"volume\s*[:\-]?\s*(\d[\d,]*(?:\.\d+)?)", text, re.IGNORECASE)
+    if labelled_price:
+        price = float(labelled_price.group(1).replace(",", ""))
+    if labelled_volume:
+        volume = float(labelled_volume.group(1).replace(",", ""))
+    if price is not None and volume is not None:
+        return price, volume
+
+    candidates = []
+    for match in _NUMBER_RE.finditer(text):
+        try:
+            number = float(match.group(1).replace(",", ""))
+        except ValueError:
+            continue
+        is_price = "." in match.group(1) or bool(re.match(r"(?:N|₦|NGN)", match.group(0).strip()))
+        candidates.append((number, is_price))
+
+    if price is None:
+        prices = [number for number, is_price in candidates if is_price and number != volume]
+        price = prices[0] if prices else None
+    if volume is None:
+        volumes = [number for number, is_price in candidates if not is_price and number != price]
+        volume = max(volumes) if volumes else None
+    return price, volume
+
+
+def price_volume_rows(text: str) -> List[Tuple[float, float]]:
+    """
+    (price, volume) of every line of a "Price(s) and volume(s)" segment that holds
+    both, one per dealing at a different price
+    """
+    rows = []
+    for line in text.split("\n"):
+        price, volume = parse_price_volume(line)
+        if price is not None and volume is not None:
+            rows.append((price, volume))
+    return rows
+
+
+def parse_date(text: Optional[str]) -> Optional[str]:
+    """ISO date from "12/03/2024", "2024-03-12", "12th March, 2024" or "March 12, 2024" """
+    if not text:
+        return None
+
+    match = re.search(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b", text)
+    if match:
+        year, month, day = (int(part) for part in match.groups())
+    else:
+        match = re.search(r"\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{2,4})\b", text)
+        if match:
+            # NGX notices write dates day first
+            day, month, year = (int(part) for part in match.groups())
+        else:
+            match = (re.search(r"\b(\d{1,2})(?:st|nd|rd|th)?\s+([a-z]{3})[a-z]*\.?,?\s+(\d{4})\b", text, re.IGNORECASE)
+                     or re.search(r"\b([a-z]{3})[a-z]*\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})\b", text, re.IGNORECASE))
+            if not match:
+                return None
+            first, second, year = match.groups()
+            day, month_name = (first, second) if first.isdigit() else (second, first)
+            month = _MONTHS.get(month_name.lower())
+            if month is None:
+                return None
+            day, year = int(day), int(year)
+
+    if year < 100:
+        year += 2000
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+
+def classify_nature(text: Optional[str]) -> str:
+    """
+    "buy", "sell" or "other". Sale terms win over acquisition terms ("sale of shares
+    acquired under the scheme" is a sale), a nature naming both a purchase and a
+    sale is "other".
+    """
+    if not text:
+        return "other"
+    sells = bool(_SELL_RE.search(text))
+    buys = bool(_BUY_RE.search(text))
+    if sells and buys:
+        return "other"
+    if sells:
+        return "sell"
+    if buys or _ACQUIRE_RE.search(text):
+        return "buy"
+    return "other"
+
+
+def parse_notice(text: str, source: str = "table", document: Optional[str] = None) -> List[InsiderTransaction]:
+    """
+    Parse the text of one director dealing notice.
+
+    Returns:
+        List[InsiderTransaction]: One transaction per price/volume line of the notice,
+        empty when the text has no nature, volume or date
+    """
+    values = split_fields(text)
+    rows = []
+    for label, segment in label_segments(text):
+        if label == "price_volume":
+            rows = price_volume_rows(segment)
+            break
+
+    if len(rows) < 2:
+        # The aggregated volume covers every price/volume line of the notice. Its "price"
+        # is an average on some forms and the total value on others, so the line price wins.
+        aggregated_price, volume = parse_price_volume(values.get("aggregated"))
+        price, line_volume = parse_price_volume(values.get("price_volume"))
+        price = price if price is not None else aggregated_price
+        volume = volume if volume is not None else line_volume
+        rows = [(price, volume)]
+
+    nature = classify_nature(values.get("nature"))
+    transaction_date = parse_date(values.get("date"))
+    transactions = [
+        InsiderTransaction(
+            insider_name=values.get("name"),
+            position=values.get("position"),
+            nature=nature,
+            volume=volume,
+            price=price,
+            value=round(price * volume, 2) if price is not None and volume is not None else None,
+            date=transaction_date,
+            source=source,
+            document=document,
+        )
+        for price, volume in rows
+    ]
+    return [
+        transaction for transaction in transactions
+        if not (transaction.nature == "other" and transaction.volume is None and transaction.date is None)
+    ]
+
+
+def parse_notices(text: str, source: str = "table", document: Optional[str] = None) -> List[InsiderTransaction]:
+    """Parse every notice of a PDF's text, see parse_notice"""
+    transactions = []
+    for notice in split_notices(text):
+        transactions.extend(parse_notice(notice, source=source, document=document))
+    return transactions
+
+
+def with_volume(transactions: List[InsiderTransaction]) -> int:
+    return sum(transaction.volume is not None for transaction in transactions)
+
+
+def table_text(pdf_path: str) -> str:
+    """Text of a PDF's tables read with camelot, one table row per line"""
+    tables = camelot.read_pdf(pdf_path, pages="all", flavor="lattice")
+    if not tables or not tables.n:
+        tables = camelot.read_pdf(pdf_path, pages="all", flavor="stream")
+
+    lines = []
+    for table in tables:
+        for row in table.df.itertuples(index=False):
+            cells = [re.sub(r"\s+", " ", str(cell)).strip() for cell in row]
+            lines.append(" ".join(cell for cell in cells if cell))
+    return "\n".join(lines)
+
+
+def page_text(pdf_path: str) -> str:
+    """
+    Text layer or OCR text of every page of a PDF.
+
+    Raises:
+        RuntimeError: When the PDF produced no pages or a page could not be OCR'd,
+                      the error pages would otherwise parse as a notice without dealings
+    """
+    pages = extract_pdf_text([pdf_path])
+    if not pages:
+        raise RuntimeError(f"No pages extracted from {pdf_path}")
+    failed = [page["error"] for page in pages if is_error(page)]
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(pages)} pages could not be OCR'd: {failed[0]}")
+    return "\n".join(
+        str(page.get("text") or page.get("text_advanced") or page.get("text_ocr") or "") for page in pages
+    )
+
+
+def extract_transactions(pdf_path: str) -> List[InsiderTransaction]:
+    """
+    Read the transactions of a director dealing PDF, tables first and OCR text as fallback.
+    Results are cached per PDF content once a parse has completed, a PDF whose
+    tables or text could not be read is parsed again on the next call.
+    """
+    sha256 = file_sha256(pdf_path)
+    cache_path = TRANSACTION_CACHE_DIR / f"{sha256}.json"
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("version") == PARSER_VERSION:
+            return [InsiderTransaction(**transaction) for transaction in cached["transactions"]]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Insider transaction cache entry {cache_path} unreadable, parsing again: {e}")
+
+    document = sha256[:12]
+    transactions: List[InsiderTransaction] = []
+    # Whether the parse whose result is returned ran to the end
+    completed = False
+    try:
+        transactions = parse_notices(table_text(pdf_path), source="table", document=document)
+        completed = True
+    except Exception as e:
+        print(f"Error reading tables of {pdf_path}: {e}")
+
+    if not transactions or with_volume(transactions) < len(transactions):
+        try:
+            ocr_transactions = parse_notices(page_text(pdf_path), source="ocr", document=document)
+            completed = True
+            if with_volume(ocr_transactions) > with_volume(transactions):
+                transactions = ocr_transactions
+        except Exception as e:
+            print(f"Error reading text of {pdf_path}: {e}")
+            completed = False
+
+    if not completed:
+        return transactions
+
+    write_json(cache_path, {"version": PARSER_VERSION, "transactions": [t.to_dict() for t in transactions]})
+    return transactions
+
+
+def period_of(iso_date: str, period: str) -> str:
+    day = datetime.fromisoformat(iso_date).date()
+    if period == "month":
+        return f"{day.year}-{day.month:02d}"
+    if period == "year":
+        return str(day.year)
+    return f"{day.year}-Q{(day.month - 1) // 3 + 1}"
+
+
+def net_insider_buying(transactions: List[InsiderTransaction], period: str = "quarter") -> List[Dict[str, Any]]:
+    """
+    Sum insider buying and selling per period.
+
+    Args:
+        transactions (List[InsiderTransaction]): Parsed transactions, undated ones are skipped
+        period (str): "month", "quarter" or "year"
+
+    Returns:
+        List[Dict[str, Any]]: One row per period, newest first, with the number of buys and
+        sells, bought, sold and net volume, net value and the insiders who bought
+    """
+    rows: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
+        "buys": 0, "sells": 0, "bought_volume": 0.0, "sold_volume": 0.0, "net_value": 0.0, "buyers": set(),
+    })
+    for transaction in transactions:
+        if not transaction.date or transaction.nature == "other":
+            continue
+        row = rows[period_of(transaction.date, period)]
+        sign = 1 if transaction.nature == "buy" else -1
+        volume = transaction.volume or 0.0
+        if sign > 0:
+            row["buys"] += 1
+            row["bought_volume"] += volume
+            if transaction.insider_name:
+                row["buyers"].add(transaction.insider_name)
+        else:
+            row["sells"] += 1
+            row["sold_volume"] += volume
+        row["net_value"] += sign * (transaction.value or 0.0)
+
+    return [
+        {
+            "period": key,
+            "buys": row["buys"],
+            "sells": row["sells"],
+            "bought_volume": row["bought_volume"],
+            "sold_volume": row["sold_volume"],
+            "net_volume": row["bought_volume"] - row["sold_volume"],
+            "net_value": round(row["net_value"], 2),
+            "insiders_buying": sorted(row["buyers"]),
+        }
+        for key, row in sorted(rows.items(), reverse=True)
+    ]
+
+
+def recent_net_volume(transactions: List[InsiderTransaction], days: int = 365) -> float:
+    """Net volume bought by insiders over the last `days` days"""
+    since = (date.today() - timedelta(days=days)).isoformat()
+    return sum(
+        (transaction.volume or 0.0) * (1 if transaction.nature == "buy" else -1)
+        for transaction in transactions
+        if transaction.date and transaction.date >= since and transaction.nature != "other"
+    )
+
+
+def load_insider_transactions(pdf_paths: List[str]) -> List[InsiderTransaction]:
+    """Transactions of a ticker's director dealing PDFs, newest first"""
+    transactions = []
+    for pdf_path in pdf_paths:
+        transactions.extend(extract_transactions(pdf_path))
+    return sorted(transactions, key=lambda transaction: transaction.date or "", reverse=True)
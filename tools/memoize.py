@@ -0,0 +1,101 @@
+"""
+In-process memoization for the expensive agent tools.
+
+Results are cached per key with a time-to-live and a bounded LRU size, and
+concurrent calls for the same key are collapsed into a single call whose result
+is shared with every waiter (single-flight).
+"""
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+
+def memoize(ttl: float = 3600, maxsize: int = 32, key: Optional[Callable] = None,
+            cache_if: Optional[Callable[[Any], bool]] = None):
+    """
+    Memoize a function with TTL expiry, LRU eviction and single-flight deduplication.
+
+    Args:
+        ttl (float): Seconds a cached result stays valid
+        maxsize (int): Maximum number of cached keys, least recently used are evicted
+        key (Callable): Builds the cache key from the call arguments. Defaults to the
+                        positional arguments plus sorted keyword arguments.
+        cache_if (Callable): Predicate deciding whether a result is worth caching,
+                             e.g. `bool` to never cache empty results
+
+    Returns:
+        Callable: Decorator. The wrapped function gains cache_clear() and cache_info().
+
+    Example:
+        @memoize(ttl=600, key=lambda ticker: ticker.upper())
+        def load(ticker): ...
+    """
+    def decorator(func):
+        cache: "OrderedDict[Any, tuple]" = OrderedDict()
+        inflight: Dict[Any, Future] = {}
+        lock = threading.Lock()
+        stats = {"hits": 0, "misses": 0, "shared": 0}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+
+            with lock:
+                entry = cache.get(cache_key)
+                if entry is not None:
+                    expires_at, value = entry
+                    if expires_at > time.monotonic():
+                        cache.move_to_end(cache_key)
+                        stats["hits"] += 1
+                        return value
+                    del cache[cache_key]
+
+                future = inflight.get(cache_key)
+                owner = future is None
+                if owner:
+                    future = Future()
+                    inflight[cache_key] = future
+                    stats["misses"] += 1
+                else:
+                    stats["shared"] += 1
+
+            # Another thread is already computing this key, wait for its result
+            if not owner:
+                return future.result()
+
+            try:
+                value = func(*args, **kwargs)
+            except BaseException as e:
+                with lock:
+                    inflight.pop(cache_key, None)
+                future.set_exception(e)
+                raise
+
+            with lock:
+                if cache_if is None or cache_if(value):
+                    cache[cache_key] = (time.monotonic() + ttl, value)
+                    cache.move_to_end(cache_key)
+                    while len(cache) > maxsize:
+                        cache.popitem(last=False)
+                inflight.pop(cache_key, None)
+
+            future.set_result(value)
+            return value
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        def cache_info() -> Dict[str, int]:
+            with lock:
+                return dict(stats, size=len(cache), maxsize=maxsize)
+
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_info = cache_info
+        return wrapper
+
+    return decorator
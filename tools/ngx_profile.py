@@ -0,0 +1,622 @@
+"""
+Scraper engine for the NGX company profile page.
+
+The Corporate Disclosures, Director Dealings and Financials Statements tabs of
+`company-profile/?symbol=` share the same DataTables layout and only differ in the
+tab label, table selectors, pagination id and which PDF links are relevant.
+Each tab is described by a DisclosureSection and any number of sections can be
+harvested from a single page load.
+"""
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urljoin, urlparse
+
+from tools.browser_pool import browser_pool
+from tools.crawl_store import corpus_pdfs
+from tools.disclosure_watermarks import SectionWatermark, disclosure_watermarks
+from tools.memoize import memoize
+from tools.page_waits import table_signature, wait_for_response, wait_for_rows_change, wait_for_selector
+from tools.pdf_cache import pdf_cache
+from tools.pdf_downloader import pdf_downloader
+from tools.pdf_pipeline import extract_pdf_text
+
+
+@dataclass(frozen=True)
+class DisclosureSection:
+    name: str
+    tab_label: str
+    row_selector: str
+    fallback_selector: str
+    pagination_id: str
+    href_filter: Optional[str] = None
+    # Keep only this many of the most financially relevant pages of each PDF
+    top_pages: Optional[int] = None
+
+    @property
+    def table_id(self) -> str:
+        """DataTables element id, e.g. latestdisclosures for latestdisclosures_paginate"""
+        return self.pagination_id[:-len("_paginate")] if self.pagination_id.endswith("_paginate") else self.pagination_id
+
+    def accepts(self, href: Optional[str]) -> bool:
+        """Whether a link found in this section's table should be downloaded"""
+        if not href or not href.endswith('.pdf'):
+            return False
+        return self.href_filter is None or self.href_filter in href
+
+
+CORPORATE_DISCLOSURES = DisclosureSection(
+    name="corporate_disclosures",
+    tab_label="Corporate Disclosures",
+    row_selector="div#latestdisclosures table tbody tr",
+    fallback_selector="tbody#corpDisclose a[href*='.pdf']",
+    pagination_id="latestdisclosures_paginate",
+)
+
+DIRECTOR_DEALINGS = DisclosureSection(
+    name="director_dealings",
+    tab_label="Director Dealings",
+    row_selector="div#latestdiclosuresDir_wrapper table tbody tr",
+    fallback_selector="tbody#ngx_dirDealings a[href*='.pdf']",
+    pagination_id="latestdiclosuresDir_paginate",
+)
+
+FINANCIAL_STATEMENTS = DisclosureSection(
+    name="financial_statements",
+    tab_label="Financials Statements",
+    row_selector="div#financialstatement_wrapper table tbody tr",
+    fallback_selector="tbody#ngx_finStatement a[href*='.pdf']",
+    pagination_id="financialstatement_paginate",
+    href_filter="FINANCIAL_STATEMENT",
+    top_pages=int(os.getenv("FINANCIAL_STATEMENT_TOP_PAGES") or 8),
+)
+
+SECTIONS = {
+    section.name: section
+    for section in (CORPORATE_DISCLOSURES, DIRECTOR_DEALINGS, FINANCIAL_STATEMENTS)
+}
+
+DOWNLOAD_DIR = Path(__file__).resolve().parent.parent / "downloads"
+
+# Latency budgets for the waits on the profile page
+PAGE_LOAD_BUDGET_MS = 30000
+SECTION_LOAD_BUDGET_MS = 15000
+
+# "datatables" harvests whole tables through the DataTables API, "paginate" clicks through pages
+DEFAULT_TABLE_MODE = os.getenv("NGX_TABLE_MODE") or "datatables"
+
+
+def profile_url(ticker: str) -> str:
+    """Return the NGX company profile URL for a ticker"""
+    return f"https://ngxgroup.com/exchange/data/company-profile/?symbol={ticker}&directory=companydirectory"
+
+
+def wait_for_section_rows(page, section: DisclosureSection) -> bool:
+    """Wait until the rows of a section's table are visible after opening its tab"""
+    return wait_for_selector(page, section.row_selector, f"{section.name}:tab", budget_ms=SECTION_LOAD_BUDGET_MS)
+
+
+def open_section_tab(page, section: DisclosureSection) -> bool:
+    """
+    Click the tab holding a section's table.
+
+    Args:
+        page: Playwright page already showing the company profile
+        section (DisclosureSection): Section whose tab should be opened
+
+    Returns:
+        bool: True if the tab was clicked
+    """
+    try:
+        # Look for the tab label within the specified structure
+        tab_selector = f"li label span:has-text('{section.tab_label}')"
+        page.wait_for_selector(tab_selector, timeout=60000)
+        page.click(tab_selector)
+        print(f"Successfully clicked on {section.tab_label}")
+        wait_for_section_rows(page, section)
+        return True
+    except Exception as e:
+        print(f"Could not find {section.tab_label} element: {e}")
+
+    # Try alternative selectors
+    alternative_selectors = [
+        f"span:has-text('{section.tab_label}')",
+        f"label:has-text('{section.tab_label}')",
+        f"li:has-text('{section.tab_label}')"
+    ]
+    for selector in alternative_selectors:
+        try:
+            if page.locator(selector).count() > 0:
+                page.click(selector)
+                print(f"Clicked using alternative selector: {selector}")
+                wait_for_section_rows(page, section)
+                return True
+        except Exception:
+            continue
+
+    print(f"Could not find {section.tab_label} element with any selector")
+    return False
+
+
+def collect_section_links(page, section: DisclosureSection) -> List[Tuple[str, str]]:
+    """
+    Collect the PDF links of a section's table on the current pagination page.
+
+    Returns:
+        List[Tuple[str, str]]: (absolute PDF url, index label) tuples
+    """
+    page_links = []
+
+    # Process rows to collect links
+    try:
+        rows = page.locator(section.row_selector)
+        rows_count = rows.count()
+        print(f"Found {rows_count} rows in {section.tab_label}")
+
+        for i in range(rows_count):
+            row = rows.nth(i)
+            pdf_links = row.locator("td a[href*='.pdf']")
+            link_count = pdf_links.count()
+
+            for j in range(link_count):
+                href = pdf_links.nth(j).get_attribute("href")
+                if section.accepts(href):
+                    page_links.append((urljoin(page.url, href), f"{i}_{j}"))
+
+    except Exception as e:
+        print(f"Error collecting links from rows: {e}")
+
+    # Alternative approach: look for all PDF links in the table
+    if not page_links:
+        print("Trying alternative approach to find PDF links")
+        try:
+            all_pdf_links = page.locator(section.fallback_selector)
+            link_count = all_pdf_links.count()
+            print(f"Found {link_count} PDF links using alternative selector")
+
+            for i in range(link_count):
+                href = all_pdf_links.nth(i).get_attribute("href")
+                if section.accepts(href):
+                    page_links.append((urljoin(page.url, href), f"alt_{i}"))
+
+        except Exception as e:
+            print(f"Error with alternative approach: {e}")
+
+    return page_links
+
+
+def goto_next_section_page(page, section: DisclosureSection) -> bool:
+    """
+    Click the pagination button after the current one in a section's table.
+
+    Returns:
+        bool: True if a next page was opened, False on the last page or without pagination
+    """
+    # Find the current page button
+    current_page = page.locator(f"#{section.pagination_id} span a.paginate_button.current")
+    if current_page.count() == 0:
+        print("No pagination found or already on first page")
+        return False
+
+    # Find all pagination buttons
+    pagination_buttons = page.locator(f"#{section.pagination_id} span a")
+    button_count = pagination_buttons.count()
+
+    if button_count <= 1:
+        print("Only one page or no pagination buttons found")
+        return False
+
+    # Find the next page button (the one after current)
+    current_index = -1
+    for i in range(button_count):
+        classes = pagination_buttons.nth(i).get_attribute("class") or ""
+        if "current" in classes:
+            current_index = i
+            break
+
+    if current_index == -1:
+        print("Could not find current page button")
+        return False
+
+    # Check if there's a next page
+    if current_index >= button_count - 1:
+        print("Already on the last page")
+        return False
+
+    # Click on the next page button and wait for the table to redraw
+    signature = table_signature(page, section.row_selector)
+    pagination_buttons.nth(current_index + 1).click()
+    print(f"Clicked on next page button (index {current_index + 1})")
+
+    wait_for_rows_change(page, section.row_selector, signature, f"{section.name}:paginate")
+
+    return True
+
+
+def paginate_section_links(page, section: DisclosureSection,
+                           known: Optional[set] = None) -> Tuple[List[Tuple[str, str]], bool]:
+    """
+    Walk the pagination pages of a section's table, collecting PDF links as it goes.
+
+    Args:
+        page: Playwright page with the section's tab already open
+        section (DisclosureSection): Section to harvest
+        known (set): Urls of a complete watermark. Rows are listed newest first, so
+                     the walk stops at the first page holding one of them.
+
+    Returns:
+        Tuple[List[Tuple[str, str]], bool]: (absolute PDF url, index label) tuples, and
+        whether the walk reached the last page or known rows (False if it broke off)
+    """
+    pdf_links = collect_section_links(page, section)
+    if known and any(href in known for href, _ in pdf_links):
+        print(f"First page of {section.tab_label} reaches known disclosures, not paginating")
+        return pdf_links, True
+
+    # Handle pagination - navigate through all pages
+    print("Starting pagination handling...")
+    page_number = 1
+
+    while True:
+        print(f"Processing page {page_number}")
+
+        try:
+            if not goto_next_section_page(page, section):
+                break
+
+            # Collect links from new page
+            page_links = collect_section_links(page, section)
+            if page_links:
+                # Update indices for pagination
+                pdf_links.extend((href, f"page{page_number + 1}_{idx}") for href, idx in page_links)
+
+            page_number += 1
+
+            if known and any(href in known for href, _ in page_links):
+                print(f"Reached known disclosures on page {page_number}, stopping pagination")
+                break
+
+        except Exception as e:
+            print(f"Error handling pagination on page {page_number}: {e}")
+            return pdf_links, False
+
+    return pdf_links, True
+
+
+# Reads every row of a DataTable through its API, including rows that are not on
+# the current pagination page. Rows without a rendered node (deferRender) are
+# scanned for PDF urls in their raw data instead.
+DATATABLE_LINKS_JS = r"""(tableId) => {
+    const $ = window.jQuery;
+    if (!$ || !$.fn || !$.fn.dataTable || !$.fn.dataTable.isDataTable('#' + tableId)) {
+        return null;
+    }
+    const api = $('#' + tableId).DataTable();
+    const settings = api.settings()[0];
+    const serverSide = !!(settings && settings.oFeatures && settings.oFeatures.bServerSide);
+    const pdfPattern = /[^"'\\\s<>]+\.pdf/gi;
+    const hrefs = [];
+    api.rows().every(function () {
+        const node = this.node();
+        if (node) {
+            node.querySelectorAll("a[href*='.pdf']").forEach(a => hrefs.push(a.getAttribute('href')));
+        } else {
+            const matches = JSON.stringify(this.data()).match(pdfPattern);
+            if (matches) {
+                hrefs.push(...matches);
+            }
+        }
+    });
+    const info = api.page.info();
+    return {
+        serverSide: serverSide,
+        rows: api.rows().count(),
+        recordsTotal: info ? info.recordsTotal : null,
+        hrefs: hrefs,
+    };
+}"""
+
+SHOW_ALL_ROWS_JS = "(tableId) => { window.jQuery('#' + tableId).DataTable().page.len(-1).draw(); }"
+
+
+def find_pdf_urls(payload) -> List[str]:
+    """Recursively collect every string ending in .pdf (or holding an href to one) in a JSON payload"""
+    found = []
+    if isinstance(payload, dict):
+        for value in payload.values():
+            found.extend(find_pdf_urls(value))
+    elif isinstance(payload, list):
+        for value in payload:
+            found.extend(find_pdf_urls(value))
+    elif isinstance(payload, str) and '.pdf' in payload.lower():
+        found.extend(re.findall(r"""[^"'\\\s<>]+\.pdf""", payload, flags=re.IGNORECASE))
+    return found
+
+
+def response_row_count(payload) -> int:
+    """Number of rows in a DataTables server-side response ({"data": [...]} or legacy "aaData")"""
+    if isinstance(payload, dict):
+        rows = payload.get("data", payload.get("aaData"))
+        if isinstance(rows, list):
+            return len(rows)
+    return len(payload) if isinstance(payload, list) else 0
+
+
+def read_datatable_links(page, section: DisclosureSection,
+                         known: Optional[set] = None) -> Optional[List[Tuple[str, str]]]:
+    """
+    Harvest every PDF link of a section's table in one round trip.
+
+    Client-side tables already hold all rows in memory, so they are read directly
+    through the DataTables API. Server-side tables are redrawn with the page length
+    set to "All" and the JSON response backing the redraw is parsed as well, unless
+    the first page already reaches `known` urls (see paginate_section_links). If the
+    redraw is rejected or times out, fewer rows than the table's recordsTotal are
+    loaded and the harvest is given up rather than returned truncated.
+
+    Returns:
+        List[Tuple[str, str]]: (absolute PDF url, index label) tuples, or None when
+        the table is not a DataTable or not every row could be loaded, and
+        pagination has to be walked instead
+    """
+    table = page.evaluate(DATATABLE_LINKS_JS, section.table_id)
+    if table is None:
+        print(f"No DataTables API for #{section.table_id}")
+        return None
+
+    hrefs = list(table["hrefs"])
+    reaches_known = bool(known) and any(urljoin(page.url, href) in known for href in hrefs)
+    if table["serverSide"] and reaches_known:
+        print(f"First page of #{section.table_id} reaches known disclosures, not loading all rows")
+
+    if table["serverSide"] and not reaches_known:
+        response = wait_for_response(
+            page,
+            lambda response: response.request.resource_type in ("xhr", "fetch"),
+            lambda: page.evaluate(SHOW_ALL_ROWS_JS, section.table_id),
+            f"{section.name}:show_all",
+        )
+        response_rows = 0
+        if response is not None:
+            try:
+                payload = response.json()
+                hrefs.extend(find_pdf_urls(payload))
+                response_rows = response_row_count(payload)
+            except Exception as e:
+                print(f"Could not parse DataTables response for #{section.table_id}: {e}")
+
+        table = page.evaluate(DATATABLE_LINKS_JS, section.table_id) or table
+        hrefs.extend(table["hrefs"])
+
+        loaded = max(table["rows"], response_rows)
+        if table.get("recordsTotal") is None or loaded < table["recordsTotal"]:
+            print(f"Loaded {loaded} of {table.get('recordsTotal')} rows of #{section.table_id}, "
+                  f"walking its pagination instead")
+            return None
+
+    links = [
+        (urljoin(page.url, href), f"dt_{i}")
+        for i, href in enumerate(hrefs)
+        if section.accepts(href)
+    ]
+    print(f"Read {table['rows']} rows and {len(links)} PDF links from #{section.table_id} via DataTables")
+    return links
+
+
+def collect_section_pdf_jobs(page, section: DisclosureSection, table_mode: str = DEFAULT_TABLE_MODE,
+                             watermark: Optional[SectionWatermark] = None) -> List[Tuple[str, str]]:
+    """
+    Collect every PDF link of a section's table and plan where each PDF goes.
+
+    With a complete watermark only the rows above the known ones are scraped, the
+    known documents are taken from the watermark, and the watermark is advanced.
+
+    Args:
+        page: Playwright page with the section's tab already open
+        section (DisclosureSection): Section to harvest
+        table_mode (str): "datatables" reads all rows at once through the DataTables
+                          API and falls back to pagination if that yields nothing
+                          or cannot load every row;
+                          "paginate" always clicks through the pagination buttons
+        watermark (SectionWatermark): Watermark of the ticker's section, updated in place
+
+    Returns:
+        List[Tuple[str, str]]: (PDF url, local download path) pairs, deduplicated by url
+    """
+    known = watermark.known_urls() if watermark is not None else None
+
+    # Collect all PDF links first, the download stage runs outside the browser
+    pdf_links = None
+    complete = True
+    if table_mode == "datatables":
+        try:
+            pdf_links = read_datatable_links(page, section, known)
+        except Exception as e:
+            print(f"Error reading #{section.table_id} through DataTables: {e}")
+
+    if not pdf_links:
+        pdf_links, complete = paginate_section_links(page, section, known)
+
+    if watermark is not None:
+        new = watermark.advance([href for href, _ in pdf_links], complete, full_walk=known is None)
+        print(f"{len(new)} new {section.tab_label} documents since the last sync")
+        if known:
+            # Rows below the known ones were not scraped, they are the watermark's older documents
+            scraped = {href for href, _ in pdf_links}
+            pdf_links = pdf_links + [
+                (href, f"known_{i}") for i, href in enumerate(watermark.urls) if href not in scraped
+            ]
+
+    jobs = []
+    seen = set()
+    for href, _ in pdf_links:
+        if href in seen:
+            continue
+        seen.add(href)
+
+        # Get the filename from the href
+        filename = unquote(urlparse(href).path.split('/')[-1])
+        if not filename.endswith('.pdf'):
+            filename += '.pdf'
+
+        # Tickers downloaded at once (batch runs) share DOWNLOAD_DIR, the url hash keeps their files apart
+        url_hash = hashlib.sha256(href.encode("utf-8")).hexdigest()[:16]
+        jobs.append((href, os.path.join(DOWNLOAD_DIR, f"{section.name}_{url_hash}_{filename}")))
+
+    print(f"Total PDF links collected for {section.tab_label}: {len(jobs)}")
+    return jobs
+
+
+def fetch_profile_sections(ticker: str, sections: Sequence[DisclosureSection],
+                           table_mode: str = DEFAULT_TABLE_MODE) -> Dict[str, List[str]]:
+    """
+    Download the PDFs of several profile sections of a ticker in a single page load.
+
+    PDFs already in the persistent cache are not downloaded again and the returned
+    paths point into the cache, so callers must not delete them.
+
+    Args:
+        ticker (str): NGX ticker symbol (e.g. "DANGCEM")
+        sections (Sequence[DisclosureSection]): Sections to harvest, in order
+        table_mode (str): "datatables" or "paginate", see collect_section_pdf_jobs
+
+    Returns:
+        Dict[str, List[str]]: Cached PDF paths keyed by section name. Sections
+        that could not be opened map to an empty list.
+    """
+    url = profile_url(ticker)
+    watermarks = {section.name: disclosure_watermarks.get(ticker, section.name) for section in sections}
+
+    def scrape_sections(page):
+        jobs = {section.name: [] for section in sections}
+
+        # Navigate to the URL and wait for the profile tabs to render
+        print(f"Navigating to: {url}")
+        page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        wait_for_selector(page, "li label span", "profile:tabs", budget_ms=PAGE_LOAD_BUDGET_MS)
+
+        page.context.set_default_timeout(30000)
+
+        for section in sections:
+            if not open_section_tab(page, section):
+                continue
+            try:
+                jobs[section.name] = collect_section_pdf_jobs(page, section, table_mode, watermarks[section.name])
+            except Exception as e:
+                print(f"Error harvesting {section.tab_label}: {e}")
+
+        # Hand the session over to the HTTP downloader so it is not bounced
+        cookies = {cookie["name"]: cookie["value"] for cookie in page.context.cookies()}
+        headers = {"User-Agent": page.evaluate("navigator.userAgent"), "Referer": url}
+
+        return jobs, headers, cookies
+
+    try:
+        jobs, headers, cookies = browser_pool.run(scrape_sections)
+    except Exception as e:
+        print(f"Error in web automation: {e}")
+        return {section.name: [] for section in sections}
+
+    for name, section_jobs in jobs.items():
+        if section_jobs:
+            disclosure_watermarks.save(watermarks[name])
+
+    # Only fetch PDFs that are not cached yet, every section in one concurrent batch
+    # once the browser is released
+    cached = {}
+    missing_jobs = []
+    for section_jobs in jobs.values():
+        for href, download_path in section_jobs:
+            cached_path = pdf_cache.get(href)
+            if cached_path:
+                cached[href] = cached_path
+            else:
+                missing_jobs.append((href, download_path))
+
+    print(f"{len(cached)} PDFs already cached, {len(missing_jobs)} to download")
+    downloaded = set(pdf_downloader.download_many(missing_jobs, headers=headers, cookies=cookies))
+
+    results = {}
+    for name, section_jobs in jobs.items():
+        results[name] = []
+        for href, download_path in section_jobs:
+            if href in cached:
+                results[name].append(cached[href])
+            elif download_path in downloaded:
+                results[name].append(pdf_cache.put(href, download_path, ticker=ticker, section=name))
+        print(f"{len(results[name])} PDFs available for {name}")
+
+    return results
+
+
+def get_section_pdfs(ticker: str, section: DisclosureSection, table_mode: str = DEFAULT_TABLE_MODE) -> List[str]:
+    """
+    Download every PDF of one profile section of a ticker.
+
+    Args:
+        ticker (str): NGX ticker symbol
+        section (DisclosureSection): Section to harvest
+        table_mode (str): "datatables" or "paginate", see collect_section_pdf_jobs
+
+    Returns:
+        List[str]: Paths of the cached PDF files
+    """
+    return fetch_profile_sections(ticker, [section], table_mode)[section.name]
+
+
+SECTION_TEXT_TTL = float(os.getenv("SECTION_TEXT_TTL") or 6 * 3600)
+SECTION_TEXT_MAXSIZE = int(os.getenv("SECTION_TEXT_MAXSIZE") or 32)
+
+
+@memoize(
+    ttl=SECTION_TEXT_TTL,
+    maxsize=SECTION_TEXT_MAXSIZE,
+    key=lambda ticker, section, stock_exchange="NGX", attempts=3, pdf_paths=None: (
+        ticker.strip().upper(), stock_exchange, section.name),
+    cache_if=bool,
+)
+def get_section_text(ticker: str, section: DisclosureSection, stock_exchange: str = "NGX",
+                     attempts: int = 3, pdf_paths: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Download a profile section of a ticker and return the text of its PDF pages.
+
+    Sections with top_pages only return the most financially relevant pages of each PDF.
+
+    Results are memoized per (ticker, exchange, section) for SECTION_TEXT_TTL seconds,
+    and concurrent calls for the same key share a single scrape. Empty results are
+    retried up to `attempts` times and never cached.
+
+    Args:
+        ticker (str): NGX ticker symbol
+        section (DisclosureSection): Section to read
+        stock_exchange (str): Exchange the ticker is listed on, part of the cache key
+        attempts (int): Number of scrapes tried before giving up on an empty section
+        pdf_paths (List[str]): PDFs of the section already downloaded by fetch_profile_sections,
+                               used for the first attempt instead of scraping the section again.
+                               Defaults to the PDFs of a recent crawl, if any (see tools.crawl_store).
+
+    Returns:
+        List[Dict[str, Any]]: One text result per PDF page (shared, do not mutate)
+    """
+    ticker = ticker.strip().upper()
+    text_content = []
+    if pdf_paths is None:
+        # A fresh crawl of the section (stock_crawler) is read from disk instead of scraping the profile
+        pdf_paths = corpus_pdfs(ticker, section.name)
+
+    for attempt in range(attempts):
+        if attempt == 0 and pdf_paths is not None:
+            downloaded_pdfs = pdf_paths
+        else:
+            downloaded_pdfs = get_section_pdfs(ticker, section)
+        text_content = extract_pdf_text(downloaded_pdfs, top_pages=section.top_pages)
+        if text_content:
+            break
+        if attempt < attempts - 1:
+            print(f"No information extracted from {section.tab_label} PDFs of {ticker}. Will rerun once more")
+
+    return text_content
@@ -0,0 +1,91 @@
+"""
+Persistent store of per-page OCR results.
+
+Results are keyed by (pdf content hash, page number, dpi, OCR variant) and tagged
+with ImageAnalyzer.VERSION, so bumping the version whenever preprocessing or OCR
+settings change invalidates old results without having to clear the cache.
+Each PDF gets its own small JSON file holding all of its pages, updated under
+a lock shared with the other processes using the cache (see tools.file_store).
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from tools.file_store import file_lock, write_json
+from tools.image_analyzer import ImageAnalyzer
+from tools.pdf_cache import CACHE_DIR
+
+
+class OcrCache:
+    def __init__(self, root: Optional[Path] = None, version: str = ImageAnalyzer.VERSION):
+        """
+        Args:
+            root (Path): Cache directory, defaults to <cache dir>/ocr
+            version (str): OCR pipeline version results are stored under
+        """
+        self.root = Path(root) if root else CACHE_DIR / "ocr"
+        self.version = version
+        self._lock = threading.Lock()
+
+    def _path(self, pdf_sha256: str) -> Path:
+        return self.root / pdf_sha256[:2] / f"{pdf_sha256}.json"
+
+    def _key(self, page: int, dpi: Union[int, str], variant: str) -> str:
+        return f"{page}:{dpi}:{variant}"
+
+    def _read(self, pdf_sha256: str) -> Dict[str, Any]:
+        try:
+            with open(self._path(pdf_sha256), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {"version": self.version, "pages": {}}
+        except Exception as e:
+            print(f"OCR cache entry for {pdf_sha256[:12]} unreadable, ignoring it: {e}")
+            return {"version": self.version, "pages": {}}
+
+        # Results produced by another pipeline version are stale
+        if data.get("version") != self.version:
+            return {"version": self.version, "pages": {}}
+        return data
+
+    def get_pages(self, pdf_sha256: str, dpi: Union[int, str], variant: str) -> Dict[int, Dict[str, Any]]:
+        """
+        Return every cached page result of a PDF for one dpi/variant.
+
+        Returns:
+            Dict[int, Dict[str, Any]]: OCR results keyed by 1-based page number
+        """
+        with self._lock:
+            pages = self._read(pdf_sha256)["pages"]
+
+        suffix = f":{dpi}:{variant}"
+        return {
+            int(key.split(":", 1)[0]): result
+            for key, result in pages.items()
+            if key.endswith(suffix)
+        }
+
+    def put_pages(self, pdf_sha256: str, dpi: Union[int, str], variant: str, results: Dict[int, Dict[str, Any]]):
+        """
+        Store OCR results for several pages of a PDF.
+
+        Args:
+            pdf_sha256 (str): Content hash of the PDF
+            dpi (int | str): Resolution the pages were rendered at, or "auto" when picked per page
+            variant (str): OCR variant that produced the results
+            results (Dict[int, Dict[str, Any]]): Results keyed by 1-based page number
+        """
+        if not results:
+            return
+
+        path = self._path(pdf_sha256)
+        with self._lock, file_lock(path):
+            data = self._read(pdf_sha256)
+            for page, result in results.items():
+                data["pages"][self._key(page, dpi, variant)] = result
+            write_json(path, data)
+
+
+ocr_cache = OcrCache()
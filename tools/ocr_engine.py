@@ -0,0 +1,193 @@
+"""
+Process-pool OCR engine.
+
+Tesseract is CPU bound, so pages are OCR'd in a pool of worker processes sized
+to the machine instead of threads of the calling process. Each worker builds
+its ImageAnalyzer once, and pages travel to it as compact 8-bit grayscale
+buffers rather than pickled RGB images. Results come back in submission order
+while later pages are still being worked on.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from tools.image_analyzer import OCR_MODES, ImageAnalyzer
+
+# A grayscale page: (width, height, raw 8-bit pixels)
+PageBuffer = Tuple[int, int, bytes]
+
+DEFAULT_MODE = os.getenv("OCR_MODE") or "adaptive"
+
+_analyzer: Optional[ImageAnalyzer] = None
+
+
+def _init_worker():
+    """Set up an OCR worker process once, before it receives pages"""
+    global _analyzer
+    # One Tesseract thread per process, the pool already uses every core
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    _analyzer = ImageAnalyzer()
+
+
+def _ocr_page(page: PageBuffer, mode: str) -> Dict[str, Any]:
+    """OCR one page inside a worker process"""
+    width, height, pixels = page
+    # View the received bytes as the grayscale page without copying them
+    image = np.frombuffer(pixels, dtype=np.uint8).reshape(height, width)
+
+    return _analyzer.extract_text(image, mode=mode)
+
+
+def encode_page(image: Image.Image) -> PageBuffer:
+    """
+    Convert a PIL image to the grayscale buffer sent to OCR workers.
+
+    Args:
+        image (Image.Image): Rendered page
+
+    Returns:
+        PageBuffer: Width, height and 8-bit pixels, a third of the RGB size
+    """
+    gray = image if image.mode == "L" else image.convert("L")
+    return gray.width, gray.height, gray.tobytes()
+
+
+def error_result(error: Exception, mode: str = DEFAULT_MODE) -> Dict[str, Any]:
+    """Result standing in for a page that could not be OCR'd, see is_error"""
+    if mode == "dual":
+        return {
+            "text_ocr": f"Error: {str(error)}",
+            "text_advanced": f"Error: {str(error)}",
+            "error": str(error),
+        }
+    return {"text": f"Error: {str(error)}", "source": "ocr", "confidence": 0.0, "error": str(error)}
+
+
+def is_error(result: Dict[str, Any]) -> bool:
+    return "error" in result
+
+
+class OcrEngine:
+    def __init__(self, workers: Optional[int] = None, max_in_flight: Optional[int] = None,
+                 mode: str = DEFAULT_MODE):
+        """
+        Args:
+            workers (int): Worker processes. Defaults to the OCR_WORKERS environment
+                           variable or the number of cores.
+            max_in_flight (int): Pages submitted but not yet returned, defaults to
+                                 twice the number of workers
+            mode (str): OCR mode, one of OCR_MODES. Defaults to the OCR_MODE
+                        environment variable or "adaptive".
+        """
+        if mode not in OCR_MODES:
+            raise ValueError(f"Unknown OCR mode {mode!r}, expected one of {OCR_MODES}")
+        self.workers = workers or int(os.getenv("OCR_WORKERS") or os.cpu_count() or 1)
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.mode = mode
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn rather than fork: the calling process runs browser and
+                # downloader threads that must not be duplicated mid-operation
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+                print(f"Started OCR engine with {self.workers} worker processes")
+            return self._executor
+
+    def _reset_executor(self, executor: ProcessPoolExecutor):
+        """Drop a pool whose worker died so the next call starts a fresh one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, executor: ProcessPoolExecutor, image: Image.Image, mode: str) -> Future:
+        try:
+            return executor.submit(_ocr_page, encode_page(image), mode)
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+            return future
+
+    def imap(self, images: Iterable[Image.Image], mode: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        OCR images in the worker pool, yielding results in input order.
+
+        Images are pulled from the iterable only while fewer than max_in_flight
+        pages are pending, so a lazy producer is never drained ahead of OCR.
+
+        Args:
+            images (Iterable[Image.Image]): Pages to OCR
+            mode (str): OCR mode for these pages, defaults to the engine's mode
+
+        Yields:
+            Dict[str, Any]: ImageAnalyzer.extract_text result per image, or an
+            error_result for pages that failed
+        """
+        mode = mode or self.mode
+        executor = self._get_executor()
+        pending = deque()
+        iterator = iter(images)
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < self.max_in_flight:
+                    try:
+                        image = next(iterator)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.append(self._submit(executor, image, mode))
+                    del image
+
+                if not pending:
+                    return
+
+                try:
+                    yield pending.popleft().result()
+                except BrokenProcessPool as e:
+                    print(f"OCR worker crashed: {e}")
+                    self._reset_executor(executor)
+                    yield error_result(e, mode)
+                    # Everything still queued on the dead pool failed too
+                    while pending:
+                        pending.popleft()
+                        yield error_result(e, mode)
+                    executor = self._get_executor()
+                except Exception as e:
+                    print(f"Error processing image: {e}")
+                    yield error_result(e, mode)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def map(self, images: List[Image.Image], mode: Optional[str] = None) -> List[Dict[str, Any]]:
+        """OCR a list of images, see imap"""
+        return list(self.imap(images, mode))
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+ocr_engine = OcrEngine()
+
+atexit.register(ocr_engine.shutdown)
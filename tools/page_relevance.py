@@ -0,0 +1,121 @@
+"""
+Page relevance scoring for financial statement PDFs.
+
+Annual reports are mostly notes, auditor letters, governance reports and
+signature pages. Pages are scored from their text (the text layer, or a quick
+OCR of a low-resolution thumbnail for scans) by statement keywords and by how
+table-like they are, so only the pages holding the primary statements get the
+full OCR pass and reach the agents.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Statement kinds and the phrases identifying them. The first phrase of each
+# kind is its title and weighs more than the line items after it.
+STATEMENT_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "financial_position": (
+        r"statement of financial position|balance sheet",
+        r"total assets", r"total liabilities", r"total equity", r"current assets",
+        r"current liabilities", r"share capital", r"retained earnings", r"borrowings",
+    ),
+    "profit_or_loss": (
+        r"statement of (?:profit or loss|comprehensive income)|income statement",
+        r"revenue|turnover", r"gross profit", r"operating profit", r"profit (?:before|after|for the)",
+        r"income tax", r"finance costs?",
+    ),
+    "cash_flow": (
+        r"statement of cash ?flows?|cash ?flow statement",
+        r"operating activities", r"investing activities", r"financing activities",
+        r"cash and cash equivalents", r"dividends? paid",
+    ),
+    "per_share": (
+        r"earnings per share",
+        r"basic", r"diluted", r"dividend per share", r"shares in issue|number of (?:ordinary )?shares",
+    ),
+}
+
+# Pages that mention statements but never hold the figures
+NEGATIVE_KEYWORDS: Tuple[str, ...] = (
+    r"independent auditor", r"auditor'?s'? report", r"report of the directors", r"directors'? report",
+    r"corporate governance", r"table of contents|contents page", r"notice of (?:the )?annual general meeting",
+    r"signed on behalf", r"proxy form", r"e-dividend",
+)
+
+TITLE_WEIGHT = 6.0
+KEYWORD_WEIGHT = 1.0
+NEGATIVE_WEIGHT = 8.0
+# Repeated mentions of a phrase stop counting after this many
+MAX_HITS_PER_PHRASE = 3
+# Statements are tables: bonus for pages where many tokens are figures
+NUMERIC_WEIGHT = 8.0
+
+_NUMBER = re.compile(r"^\(?-?[\d,]+(?:\.\d+)?\)?%?$")
+_COMPILED = {
+    kind: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+    for kind, patterns in STATEMENT_KEYWORDS.items()
+}
+_NEGATIVE = [re.compile(pattern, re.IGNORECASE) for pattern in NEGATIVE_KEYWORDS]
+
+
+def numeric_density(text: str) -> float:
+    """Share of the whitespace-separated tokens of a page that are figures"""
+    tokens = text.split()
+    if not tokens:
+        return 0.0
+    return sum(1 for token in tokens if _NUMBER.match(token)) / len(tokens)
+
+
+def score_page(text: Optional[str]) -> Tuple[float, List[str]]:
+    """
+    Score how likely a page is to hold a primary financial statement.
+
+    Args:
+        text (str): Page text, possibly rough thumbnail OCR
+
+    Returns:
+        Tuple[float, List[str]]: Score (higher is more relevant, 0 or less is
+        irrelevant) and the statement kinds the page appears to contain
+    """
+    if not text:
+        return 0.0, []
+
+    score = 0.0
+    kinds = []
+    for kind, patterns in _COMPILED.items():
+        title, items = patterns[0], patterns[1:]
+        has_title = bool(title.search(text))
+        item_hits = sum(min(len(pattern.findall(text)), MAX_HITS_PER_PHRASE) for pattern in items)
+
+        score += TITLE_WEIGHT * has_title + KEYWORD_WEIGHT * item_hits
+        if has_title or item_hits >= 3:
+            kinds.append(kind)
+
+    score -= NEGATIVE_WEIGHT * sum(1 for pattern in _NEGATIVE if pattern.search(text))
+
+    # Figures only count on pages that talk about statements at all
+    if kinds:
+        score += NUMERIC_WEIGHT * numeric_density(text)
+
+    return score, kinds
+
+
+def rank_pages(texts: Dict[int, str], top_n: int) -> Dict[int, List[str]]:
+    """
+    Pick the most relevant pages of a document.
+
+    Args:
+        texts (Dict[int, str]): Page text keyed by page number
+        top_n (int): Maximum number of pages to keep
+
+    Returns:
+        Dict[int, List[str]]: Statement kinds of the kept pages keyed by page number,
+        empty when no page looks like a statement
+    """
+    scores = {page: score_page(text) for page, text in texts.items()}
+    ranked = sorted(
+        (page for page, (score, _) in scores.items() if score > 0),
+        key=lambda page: scores[page][0],
+        reverse=True,
+    )
+    return {page: scores[page][1] for page in sorted(ranked[:top_n])}
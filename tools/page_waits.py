@@ -0,0 +1,208 @@
+"""
+Event-driven waits for the Playwright scrapers.
+
+Every wait targets something concrete (a selector, a change in a table's rows,
+text appearing in an element, a network response), is bounded by a per-step
+latency budget and is timed into a process-wide WaitMetrics so slow steps show
+up in the logs instead of hiding behind fixed sleeps.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Union
+
+DEFAULT_BUDGET_MS = 15000
+
+
+class WaitMetrics:
+    def __init__(self, max_records: int = 1000):
+        """
+        Args:
+            max_records (int): Number of most recent waits kept for summaries
+        """
+        self.max_records = max_records
+        self._records: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def record(self, step: str, seconds: float, budget_ms: int, outcome: str):
+        with self._lock:
+            self._records.append({
+                "step": step,
+                "seconds": seconds,
+                "budget_ms": budget_ms,
+                "outcome": outcome,
+            })
+            if len(self._records) > self.max_records:
+                del self._records[:len(self._records) - self.max_records]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregate the recorded waits per step.
+
+        Returns:
+            Dict[str, Dict[str, float]]: count, total, mean and max seconds plus the
+            number of waits that ran out of budget, keyed by step name
+        """
+        with self._lock:
+            records = list(self._records)
+
+        steps: Dict[str, Dict[str, float]] = {}
+        for record in records:
+            entry = steps.setdefault(record["step"], {"count": 0, "total": 0.0, "max": 0.0, "over_budget": 0})
+            entry["count"] += 1
+            entry["total"] += record["seconds"]
+            entry["max"] = max(entry["max"], record["seconds"])
+            if record["outcome"] != "ok":
+                entry["over_budget"] += 1
+
+        for entry in steps.values():
+            entry["mean"] = entry["total"] / entry["count"]
+
+        return steps
+
+    def reset(self):
+        with self._lock:
+            self._records.clear()
+
+
+wait_metrics = WaitMetrics()
+
+
+@contextmanager
+def timed_wait(step: str, budget_ms: int):
+    """
+    Time a wait and record it under `step`.
+
+    Yields a dict whose "outcome" the caller sets to "timeout" when the budget ran out.
+    """
+    state = {"outcome": "ok"}
+    start = time.monotonic()
+    try:
+        yield state
+    finally:
+        elapsed = time.monotonic() - start
+        wait_metrics.record(step, elapsed, budget_ms, state["outcome"])
+        print(f"[wait] {step}: {elapsed:.2f}s ({state['outcome']}, budget {budget_ms / 1000:.0f}s)")
+
+
+def wait_for_selector(page, selector: str, step: str, budget_ms: int = DEFAULT_BUDGET_MS,
+                      state: str = "visible") -> bool:
+    """
+    Wait until an element matching `selector` reaches `state`.
+
+    Returns:
+        bool: True if the element appeared within the budget
+    """
+    with timed_wait(step, budget_ms) as wait:
+        try:
+            page.wait_for_selector(selector, state=state, timeout=budget_ms)
+            return True
+        except Exception as e:
+            wait["outcome"] = "timeout"
+            print(f"Timed out waiting for {selector}: {e}")
+            return False
+
+
+def wait_for_text(page, selector: str, step: str, budget_ms: int = DEFAULT_BUDGET_MS) -> bool:
+    """
+    Wait until the first element matching `selector` has non-empty text.
+
+    Useful for quote widgets that render their container first and fill it from an XHR.
+
+    Returns:
+        bool: True if text appeared within the budget
+    """
+    with timed_wait(step, budget_ms) as wait:
+        try:
+            page.wait_for_function(
+                """(selector) => {
+                    const el = document.querySelector(selector);
+                    return !!el && el.textContent.trim().length > 0;
+                }""",
+                arg=selector,
+                timeout=budget_ms,
+            )
+            return True
+        except Exception as e:
+            wait["outcome"] = "timeout"
+            print(f"Timed out waiting for text in {selector}: {e}")
+            return False
+
+
+def table_signature(page, row_selector: str) -> str:
+    """
+    Return a cheap fingerprint of a table's current rows (row count and first row text).
+    """
+    try:
+        return page.evaluate(
+            """(selector) => {
+                const rows = document.querySelectorAll(selector);
+                const first = rows.length ? rows[0].textContent.trim() : "";
+                return rows.length + "|" + first;
+            }""",
+            row_selector,
+        )
+    except Exception:
+        return ""
+
+
+def wait_for_rows_change(page, row_selector: str, previous_signature: str, step: str,
+                         budget_ms: int = DEFAULT_BUDGET_MS) -> bool:
+    """
+    Wait until a table's rows differ from `previous_signature` (see table_signature).
+
+    Used after pagination clicks: DataTables redraws the tbody in place, so the
+    row count or the first row changes as soon as the new page is rendered.
+
+    Returns:
+        bool: True if the rows changed within the budget
+    """
+    with timed_wait(step, budget_ms) as wait:
+        try:
+            page.wait_for_function(
+                """([selector, previous]) => {
+                    const rows = document.querySelectorAll(selector);
+                    const first = rows.length ? rows[0].textContent.trim() : "";
+                    return rows.length > 0 && (rows.length + "|" + first) !== previous;
+                }""",
+                arg=[row_selector, previous_signature],
+                timeout=budget_ms,
+            )
+            return True
+        except Exception as e:
+            wait["outcome"] = "timeout"
+            print(f"Timed out waiting for rows of {row_selector} to change: {e}")
+            return False
+
+
+def wait_for_response(page, url_match: Union[str, Callable], action: Callable, step: str,
+                      budget_ms: int = DEFAULT_BUDGET_MS) -> Optional[object]:
+    """
+    Run `action` and wait for the network response it triggers.
+
+    Args:
+        page: Playwright page
+        url_match (str | Callable): Substring of the response url, or a predicate on the response
+        action (Callable): Function that triggers the request (e.g. a click)
+        step (str): Name under which the wait is recorded
+        budget_ms (int): Latency budget in milliseconds
+
+    Returns:
+        The Playwright Response, or None if it did not arrive within the budget
+    """
+    if isinstance(url_match, str):
+        pattern = url_match
+        predicate = lambda response: pattern in response.url
+    else:
+        predicate = url_match
+
+    with timed_wait(step, budget_ms) as wait:
+        try:
+            with page.expect_response(predicate, timeout=budget_ms) as response_info:
+                action()
+            return response_info.value
+        except Exception as e:
+            wait["outcome"] = "timeout"
+            print(f"Timed out waiting for response during {step}: {e}")
+            return None
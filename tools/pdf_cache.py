@@ -0,0 +1,246 @@
+"""
+Persistent content-addressed cache for downloaded NGX PDFs.
+
+Disclosures are immutable once published, so every PDF is stored once under the
+SHA-256 of its content and indexed by the url it was downloaded from together
+with the ticker, section and the date it was first seen. The cache is bounded
+in size and evicts the least recently used files first.
+
+The index is a SQLite database shared by every process using the cache (the
+agents, batch runs and the Scrapy crawl): each lookup reads the committed
+index, so PDFs registered by another process are seen right away, and
+registration and eviction run in write transactions so neither can undo the
+other's work.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional
+
+CACHE_DIR = Path(os.getenv("STOCKAGENT_CACHE_DIR") or Path(__file__).resolve().parent.parent / "cache")
+# Blobs used or registered this recently are never evicted, another process may be about to read them
+EVICTION_GRACE = 600
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the hex SHA-256 of a file, reading it in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PdfCache:
+    def __init__(self, root: Optional[Path] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            root (Path): Cache directory, defaults to <cache dir>/pdfs
+            max_bytes (int): Size budget for stored PDFs. Defaults to the PDF_CACHE_MAX_MB
+                             environment variable or 2048 MB.
+        """
+        self.root = Path(root) if root else CACHE_DIR / "pdfs"
+        self.max_bytes = max_bytes or int(os.getenv("PDF_CACHE_MAX_MB") or 2048) * 1024 * 1024
+        self.index_path = self.root / "index.sqlite"
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: transactions are opened explicitly with BEGIN IMMEDIATE
+        if not self._ready:
+            self.root.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+        if not self._ready:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS urls (url PRIMARY KEY, sha256, ticker, section, filename, first_seen)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS urls_sha256 ON urls (sha256)")
+            connection.execute("CREATE TABLE IF NOT EXISTS blobs (sha256 PRIMARY KEY, size, last_access)")
+            self._import_json_index(connection)
+            self._ready = True
+        return connection
+
+    def _import_json_index(self, connection: sqlite3.Connection):
+        """Carry over the index of caches written before it moved to SQLite"""
+        json_path = self.root / "index.json"
+        if not json_path.exists():
+            return
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(
+                "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?)",
+                [(sha256, blob["size"], blob.get("last_access", 0)) for sha256, blob in index["blobs"].items()],
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO urls VALUES (?, ?, ?, ?, ?, ?)",
+                [(url, entry["sha256"], entry.get("ticker", ""), entry.get("section", ""),
+                  entry.get("filename", ""), entry.get("first_seen")) for url, entry in index["urls"].items()],
+            )
+            connection.execute("COMMIT")
+            os.replace(json_path, json_path.with_suffix(".json.imported"))
+        except Exception as e:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            print(f"PDF cache index.json not imported: {e}")
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.root / "blobs" / sha256[:2] / f"{sha256}.pdf"
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        Look up a PDF by the url it was downloaded from.
+
+        Returns:
+            str: Path of the cached PDF, or None on a miss
+        """
+        with self._lock:
+            connection = self._connect()
+            try:
+                # A plain read, lookups never wait for another process's write lock
+                row = connection.execute(
+                    "SELECT urls.sha256, blobs.last_access FROM urls LEFT JOIN blobs ON blobs.sha256 = urls.sha256 "
+                    "WHERE urls.url = ?", (url,)
+                ).fetchone()
+                if row is None:
+                    return None
+
+                sha256, last_access = row
+                path = self.blob_path(sha256)
+                now = time.time()
+                if last_access is None or now - last_access > EVICTION_GRACE / 2:
+                    # Touched before the existence check below: an eviction committed after
+                    # this sees the blob as recently used and leaves it alone
+                    connection.execute("UPDATE blobs SET last_access = ? WHERE sha256 = ?", (now, sha256))
+                if path.exists():
+                    return str(path)
+
+                # The file was removed behind our back, forget it unless it was just put back
+                connection.execute("BEGIN IMMEDIATE")
+                if path.exists():
+                    connection.execute("COMMIT")
+                    return str(path)
+                connection.execute("DELETE FROM urls WHERE sha256 = ?", (sha256,))
+                connection.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+                connection.execute("COMMIT")
+                return None
+            finally:
+                connection.close()
+
+    def put(self, url: str, file_path: str, ticker: str = "", section: str = "") -> str:
+        """
+        Move a freshly downloaded PDF into the cache.
+
+        Args:
+            url (str): Url the file was downloaded from
+            file_path (str): Path of the downloaded file, it is moved (or removed if the
+                             content is already cached under another url)
+            ticker (str): Ticker the PDF belongs to
+            section (str): Profile section the PDF was listed in
+
+        Returns:
+            str: Path of the cached PDF
+        """
+        sha256 = file_sha256(file_path)
+        path = self.blob_path(sha256)
+
+        with self._lock:
+            connection = self._connect()
+            try:
+                # The write lock is held from the existence check to the commit, so an
+                # eviction in another process cannot remove the blob in between
+                connection.execute("BEGIN IMMEDIATE")
+                if path.exists():
+                    os.remove(file_path)
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.move(file_path, path)
+
+                connection.execute(
+                    "INSERT INTO blobs VALUES (?, ?, ?) ON CONFLICT (sha256) DO UPDATE SET last_access = excluded.last_access",
+                    (sha256, path.stat().st_size, time.time()),
+                )
+                previous = connection.execute(
+                    "SELECT ticker, section, first_seen FROM urls WHERE url = ?", (url,)
+                ).fetchone() or ("", "", None)
+                connection.execute(
+                    "INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, sha256, ticker or previous[0], section or previous[1], os.path.basename(file_path),
+                     previous[2] or date.today().isoformat()),
+                )
+                self._evict(connection, keep=sha256)
+                connection.execute("COMMIT")
+            except Exception:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+            finally:
+                connection.close()
+
+        return str(path)
+
+    def entries(self, ticker: Optional[str] = None, section: Optional[str] = None) -> Dict[str, Dict]:
+        """Return the index entries keyed by url, optionally filtered by ticker and section"""
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT url, sha256, ticker, section, filename, first_seen FROM urls "
+                "WHERE (? IS NULL OR ticker = ?) AND (? IS NULL OR section = ?)",
+                (ticker, ticker, section, section),
+            ).fetchall()
+        finally:
+            connection.close()
+        return {
+            url: {"sha256": sha256, "ticker": row_ticker, "section": row_section, "filename": filename,
+                  "first_seen": first_seen}
+            for url, sha256, row_ticker, row_section, filename, first_seen in rows
+        }
+
+    def total_bytes(self) -> int:
+        connection = self._connect()
+        try:
+            return connection.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        finally:
+            connection.close()
+
+    def _evict(self, connection: sqlite3.Connection, keep: Optional[str] = None):
+        """
+        Drop least recently used blobs until the cache fits its size budget.
+        Runs inside the caller's write transaction.
+        """
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        recent = time.time() - EVICTION_GRACE
+        by_age = connection.execute(
+            "SELECT sha256, size FROM blobs WHERE last_access < ? ORDER BY last_access", (recent,)
+        ).fetchall()
+        for sha256, size in by_age:
+            if total <= self.max_bytes:
+                break
+            if sha256 == keep:
+                continue
+
+            try:
+                self.blob_path(sha256).unlink(missing_ok=True)
+            except Exception as e:
+                print(f"Error evicting cached PDF {sha256}: {e}")
+                continue
+
+            total -= size
+            connection.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+            connection.execute("DELETE FROM urls WHERE sha256 = ?", (sha256,))
+            print(f"Evicted cached PDF {sha256[:12]} ({size} bytes)")
+
+
+pdf_cache = PdfCache()
@@ -0,0 +1,157 @@
+"""
+Concurrent HTTP downloader for disclosure PDFs.
+
+Links harvested from the NGX profile page are fetched directly over a pooled
+requests session instead of clicking each anchor in the browser. Downloads run
+in a thread pool, are limited per host, retried with backoff and streamed to
+disk so large annual reports never sit in memory.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# The PDF header may follow a few bytes of junk, readers look for it in the first KB
+PDF_MAGIC = b"%PDF-"
+PDF_HEADER_WINDOW = 1024
+
+
+def is_pdf_file(path: str) -> bool:
+    """Whether a file starts with a PDF header (error and bot-check pages are HTML)"""
+    try:
+        with open(path, "rb") as f:
+            return PDF_MAGIC in f.read(PDF_HEADER_WINDOW)
+    except OSError:
+        return False
+
+
+class PdfDownloader:
+    def __init__(self, max_workers: int = 8, max_per_host: int = 4, retries: int = 3,
+                 backoff: float = 1.0, timeout: float = 60, chunk_size: int = 64 * 1024):
+        """
+        Args:
+            max_workers (int): Number of downloads in flight across all hosts
+            max_per_host (int): Number of downloads in flight against a single host
+            retries (int): Attempts per file after the first failure
+            backoff (float): Base delay in seconds, doubled after every failed attempt
+            timeout (float): Connect/read timeout in seconds per request
+            chunk_size (int): Bytes written to disk per streamed chunk
+        """
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"User-Agent": DEFAULT_USER_AGENT, "Accept": "application/pdf,*/*"})
+
+        self._host_limits: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def _host_limit(self, url: str) -> threading.Semaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.Semaphore(self.max_per_host)
+            return self._host_limits[host]
+
+    def download(self, url: str, dest_path: str, headers: Optional[Dict[str, str]] = None,
+                 cookies: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """
+        Stream a single file to dest_path, retrying transient failures.
+
+        The body is written to a ".part" file that is only renamed into place once
+        complete, so an interrupted download never leaves a truncated PDF behind.
+        A response that is not a PDF (an HTML error or bot-check page served with
+        200) counts as a failed attempt.
+
+        Returns:
+            str: dest_path on success, None if every attempt failed
+        """
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        part_path = f"{dest_path}.part"
+
+        for attempt in range(self.retries + 1):
+            try:
+                with self._host_limit(url):
+                    with self.session.get(url, headers=headers, cookies=cookies,
+                                          stream=True, timeout=self.timeout) as response:
+                        if response.status_code in RETRYABLE_STATUS:
+                            raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                        response.raise_for_status()
+                        content_type = response.headers.get("Content-Type", "").lower()
+                        if "html" in content_type:
+                            raise ValueError(f"Expected a PDF, got {content_type}")
+
+                        with open(part_path, "wb") as f:
+                            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                                if chunk:
+                                    f.write(chunk)
+
+                if not is_pdf_file(part_path):
+                    raise ValueError("Response body is not a PDF")
+                os.replace(part_path, dest_path)
+                print(f"Downloaded PDF: {dest_path}")
+                return dest_path
+
+            except Exception as e:
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                if status is not None and status not in RETRYABLE_STATUS:
+                    print(f"Error downloading {url}: {e}")
+                    break
+                if attempt < self.retries:
+                    delay = self.backoff * (2 ** attempt)
+                    print(f"Retrying {url} in {delay:.1f}s after error: {e}")
+                    time.sleep(delay)
+                else:
+                    print(f"Error downloading {url}: {e}")
+
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return None
+
+    def download_many(self, jobs: Sequence[Tuple[str, str]], headers: Optional[Dict[str, str]] = None,
+                      cookies: Optional[Dict[str, str]] = None) -> List[str]:
+        """
+        Download many files concurrently.
+
+        Args:
+            jobs (Sequence[Tuple[str, str]]): (url, dest_path) pairs
+            headers (dict): Extra request headers (e.g. the browser's User-Agent)
+            cookies (dict): Cookies to send, usually copied from the browser context
+
+        Returns:
+            List[str]: Paths of the files that downloaded successfully, in job order
+        """
+        if not jobs:
+            return []
+
+        print(f"Downloading {len(jobs)} PDFs ({self.max_workers} workers, {self.max_per_host} per host)")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(lambda job: self.download(job[0], job[1], headers, cookies), jobs)
+            downloaded = [path for path in results if path]
+
+        print(f"Successfully downloaded {len(downloaded)} of {len(jobs)} PDFs")
+        return downloaded
+
+
+pdf_downloader = PdfDownloader()
@@ -0,0 +1,550 @@
+"""
+PDF to text pipeline shared by the disclosure and financial statement tools.
+
+Most NGX PDFs are born-digital, so the embedded text layer is read first and only
+pages without a usable one (scans) are rendered and OCR'd, streaming through a
+bounded render -> OCR pipeline. Every OCR result is stored in the OCR cache so a
+page is never rasterized or OCR'd twice.
+"""
+
+import itertools
+import os
+import queue
+import re
+import threading
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pdf2image import convert_from_path
+from PIL import Image
+
+from tools.ocr_cache import ocr_cache
+from tools.ocr_engine import is_error, ocr_engine
+from tools.page_relevance import rank_pages
+from tools.pdf_cache import file_sha256
+
+# Pages are rendered at a resolution picked per page unless a fixed DPI is given
+AUTO_DPI = "auto"
+DEFAULT_DPI = os.getenv("PDF_RENDER_DPI") or AUTO_DPI
+if DEFAULT_DPI != AUTO_DPI:
+    DEFAULT_DPI = int(DEFAULT_DPI)
+
+# Adaptive DPI bounds and targets: body text rendered about 32px tall, or the page's
+# long edge as long as an A4 page at 200 DPI when the text size is unknown
+MIN_DPI = 150
+MAX_DPI = 300
+FALLBACK_DPI = 200
+TARGET_FONT_PX = 32
+TARGET_LONG_EDGE_PX = 2339
+
+# Pages pdftoppm renders at once, one thread each
+RENDER_THREADS = int(os.getenv("PDF_RENDER_THREADS") or 4)
+
+# Resolution of the quick OCR used to judge the relevance of scanned pages
+THUMBNAIL_DPI = 100
+
+# OCR results are cached per OCR mode, switching modes never mixes result shapes
+OCR_VARIANT = ocr_engine.mode
+
+# A text layer counts as usable when it has at least this many word characters and
+# they make up most of the non-blank text (scans often carry a few stray glyphs)
+MIN_TEXT_LAYER_CHARS = 80
+MIN_TEXT_LAYER_WORD_RATIO = 0.6
+
+# Rendered pages allowed to wait for the OCR engine
+MAX_BUFFERED_PAGES = int(os.getenv("OCR_BUFFERED_PAGES") or 4)
+
+
+def get_pdf_page_count(pdf_path):
+    """
+    Get the total number of pages in a PDF file.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+
+    Returns:
+        int: Total number of pages in the PDF, or None if unable to determine
+    """
+    try:
+        # Try using PyPDF2 if available
+        try:
+            from PyPDF2 import PdfReader
+            reader = PdfReader(pdf_path)
+            return len(reader.pages)
+        except ImportError:
+            # If PyPDF2 is not available, try alternative method
+            try:
+                import fitz  # PyMuPDF
+                doc = fitz.open(pdf_path)
+                page_count = len(doc)
+                doc.close()
+                return page_count
+            except ImportError:
+                # Fallback: estimate by trying to process pages incrementally
+                return None
+    except Exception as e:
+        print(f"Warning: Could not determine page count for {pdf_path}: {e}")
+        return None
+
+
+def has_usable_text(text: Optional[str]) -> bool:
+    """
+    Decide whether a page's embedded text layer can replace OCR.
+
+    Args:
+        text (str): Text extracted from the page's text layer
+
+    Returns:
+        bool: True if the text is long enough and mostly made of real characters
+    """
+    if not text:
+        return False
+
+    # Unmapped glyphs come out as "(cid:123)" and carry no information
+    text = re.sub(r"\(cid:\d+\)", "", text)
+    visible = re.sub(r"\s+", "", text)
+    word_chars = len(re.findall(r"\w", visible))
+
+    return word_chars >= MIN_TEXT_LAYER_CHARS and word_chars / max(len(visible), 1) >= MIN_TEXT_LAYER_WORD_RATIO
+
+
+def extract_text_layer(pdf_path: str) -> Dict[int, str]:
+    """
+    Read the embedded text layer of every page of a PDF.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+
+    Returns:
+        Dict[int, str]: Text of the pages that have a usable text layer, keyed by
+        1-based page number. Pages that need OCR are left out.
+    """
+    pages = {}
+    try:
+        try:
+            from PyPDF2 import PdfReader
+            reader = PdfReader(pdf_path)
+            for number, page in enumerate(reader.pages, start=1):
+                try:
+                    pages[number] = page.extract_text() or ""
+                except Exception as e:
+                    print(f"Could not read text layer of page {number} of {pdf_path}: {e}")
+        except ImportError:
+            import fitz  # PyMuPDF
+            doc = fitz.open(pdf_path)
+            for number, page in enumerate(doc, start=1):
+                pages[number] = page.get_text() or ""
+            doc.close()
+    except ImportError:
+        return {}
+    except Exception as e:
+        print(f"Warning: Could not read text layer of {pdf_path}: {e}")
+        return {}
+
+    return {number: text.strip() for number, text in pages.items() if has_usable_text(text)}
+
+
+def plan_pdf(pdf_path: str, dpi) -> Optional[Dict[str, Any]]:
+    """
+    Work out which pages of a PDF still need OCR.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+        dpi (int | str): Resolution cached OCR results must have been rendered at
+
+    Returns:
+        Dict[str, Any]: path, sha256, results (page -> result for text layer and cached
+        OCR pages) and missing (pages to OCR, or None when the page count is unknown
+        and the whole document has to be walked), or None if the file is unreadable
+    """
+    try:
+        pdf_sha256 = file_sha256(pdf_path)
+    except Exception as e:
+        print(f"Error reading PDF {pdf_path}: {e}")
+        return None
+
+    total_pages = get_pdf_page_count(pdf_path)
+    text_layer = extract_text_layer(pdf_path)
+    cached = ocr_cache.get_pages(pdf_sha256, dpi, OCR_VARIANT)
+
+    results = {page: {"text": text, "source": "text_layer"} for page, text in text_layer.items()}
+    for page, result in cached.items():
+        results.setdefault(page, result)
+
+    if total_pages is None:
+        # Without a page count we cannot tell which pages are missing, so the
+        # whole document is walked unless a previous run stored its pages
+        missing = None if not cached else []
+    else:
+        missing = [page for page in range(1, total_pages + 1) if page not in results]
+        print(f"{pdf_path}: {len(text_layer)} text layer pages, "
+              f"{total_pages - len(text_layer) - len(missing)} cached OCR pages, {len(missing)} pages to OCR")
+
+    return {"path": pdf_path, "sha256": pdf_sha256, "results": results, "missing": missing}
+
+
+def choose_dpi(width_pt: float, height_pt: float, font_size_pt: Optional[float] = None) -> int:
+    """
+    Pick the rendering resolution of a page.
+
+    Pages with known text size are rendered so body text comes out around
+    TARGET_FONT_PX tall, the rest so their long edge matches an A4 page at 200 DPI.
+
+    Args:
+        width_pt (float): Page width in points
+        height_pt (float): Page height in points
+        font_size_pt (float): Median font size on the page, if known
+
+    Returns:
+        int: DPI between MIN_DPI and MAX_DPI
+    """
+    if font_size_pt:
+        dpi = TARGET_FONT_PX * 72 / font_size_pt
+    else:
+        dpi = TARGET_LONG_EDGE_PX * 72 / max(width_pt, height_pt, 1)
+    return int(min(max(dpi, MIN_DPI), MAX_DPI))
+
+
+def load_pymupdf():
+    """Return the PyMuPDF module if it is installed, None otherwise"""
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        return None
+    # The unrelated "fitz" package on PyPI shadows PyMuPDF's import name
+    return fitz if hasattr(fitz, "open") and hasattr(fitz, "csGRAY") else None
+
+
+def median_font_size(page) -> Optional[float]:
+    """Median font size of the text spans of a PyMuPDF page, None for pure scans"""
+    try:
+        sizes = sorted(
+            span["size"]
+            for block in page.get_text("dict")["blocks"]
+            for line in block.get("lines", [])
+            for span in line["spans"]
+            if span["text"].strip()
+        )
+    except Exception:
+        return None
+    return sizes[len(sizes) // 2] if sizes else None
+
+
+def page_sizes(pdf_path: str) -> Dict[int, Tuple[float, float]]:
+    """Width and height in points of every page, keyed by 1-based page number"""
+    try:
+        from PyPDF2 import PdfReader
+        reader = PdfReader(pdf_path)
+        return {
+            number: (float(page.mediabox.width), float(page.mediabox.height))
+            for number, page in enumerate(reader.pages, start=1)
+        }
+    except Exception as e:
+        print(f"Warning: Could not read page sizes of {pdf_path}: {e}")
+        return {}
+
+
+def render_pages_pymupdf(fitz, pdf_path: str, pages: List[int], dpi) -> Iterator[Tuple[int, Image.Image]]:
+    """Render pages in process with PyMuPDF straight into 8-bit grayscale"""
+    doc = fitz.open(pdf_path)
+    try:
+        for page in pages:
+            try:
+                pdf_page = doc[page - 1]
+                page_dpi = dpi if dpi != AUTO_DPI else choose_dpi(
+                    pdf_page.rect.width, pdf_page.rect.height, median_font_size(pdf_page))
+                pixmap = pdf_page.get_pixmap(dpi=page_dpi, colorspace=fitz.csGRAY, alpha=False)
+                image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+                del pixmap
+            except Exception as e:
+                print(f"Error rendering page {page} of {pdf_path}: {e}")
+                continue
+            yield page, image
+    finally:
+        doc.close()
+
+
+def render_pages_pdftoppm(pdf_path: str, pages: List[int], dpi) -> Iterator[Tuple[int, Image.Image]]:
+    """
+    Render pages with pdftoppm in grayscale.
+
+    Consecutive pages sharing a DPI are rendered together, up to RENDER_THREADS
+    at a time with one pdftoppm thread each.
+    """
+    sizes = page_sizes(pdf_path) if dpi == AUTO_DPI else {}
+
+    def page_dpi(page):
+        if dpi != AUTO_DPI:
+            return dpi
+        return choose_dpi(*sizes[page]) if page in sizes else FALLBACK_DPI
+
+    runs: List[List[int]] = []
+    for page in pages:
+        previous = runs[-1] if runs else None
+        if (previous and page == previous[-1] + 1 and len(previous) < RENDER_THREADS
+                and page_dpi(page) == page_dpi(previous[0])):
+            previous.append(page)
+        else:
+            runs.append([page])
+
+    for run in runs:
+        try:
+            images = convert_from_path(pdf_path, dpi=page_dpi(run[0]), first_page=run[0], last_page=run[-1],
+                                       grayscale=True, thread_count=len(run))
+        except Exception as e:
+            print(f"Error rendering pages {run[0]}-{run[-1]} of {pdf_path}: {e}")
+            continue
+
+        for page, image in zip(run, images):
+            yield page, image
+        del images
+
+
+def iter_pdf_pages(pdf_path: str, pages: Optional[List[int]], dpi=DEFAULT_DPI) -> Iterator[Tuple[int, Image.Image]]:
+    """
+    Render PDF pages to grayscale images, a few at a time.
+
+    PyMuPDF renders in process when it is installed, pdftoppm is used otherwise.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+        pages (List[int]): 1-based pages to render, or None to render until the document ends
+        dpi (int | str): Rendering resolution, or AUTO_DPI to pick it per page
+
+    Yields:
+        Tuple[int, Image.Image]: Page number and its rendered grayscale image
+    """
+    if pages is not None:
+        fitz = load_pymupdf()
+        if fitz is not None:
+            yield from render_pages_pymupdf(fitz, pdf_path, pages, dpi)
+        else:
+            yield from render_pages_pdftoppm(pdf_path, pages, dpi)
+        return
+
+    # Unknown page count: walk the document until rendering fails
+    page_dpi = dpi if dpi != AUTO_DPI else FALLBACK_DPI
+    for page in itertools.count(1):
+        try:
+            images = convert_from_path(pdf_path, dpi=page_dpi, first_page=page, last_page=page, grayscale=True)
+        except Exception as e:
+            # Likely reached end of PDF
+            if page == 1:
+                print(f"Failed to render first page of {pdf_path}: {e}")
+            return
+
+        if not images:
+            return
+
+        yield page, images[0]
+
+
+def result_text(result: Dict[str, Any]) -> str:
+    """Best text of a page result, whatever the OCR mode that produced it"""
+    return result.get("text") or result.get("text_advanced") or result.get("text_ocr") or ""
+
+
+def thumbnail_texts(pdf_path: str, pdf_sha256: str, pages: List[int]) -> Dict[int, str]:
+    """
+    Quickly read scanned pages with a single OCR pass over low-resolution renders.
+    The texts are cached (variant "plain" at THUMBNAIL_DPI), so pages that are not
+    selected are not rendered and OCR'd again on the next analysis.
+
+    Returns:
+        Dict[int, str]: Rough page text keyed by page number
+    """
+    cached = ocr_cache.get_pages(pdf_sha256, THUMBNAIL_DPI, "plain")
+    texts = {page: cached[page]["text"] for page in pages if page in cached}
+    missing = [page for page in pages if page not in cached]
+    if not missing:
+        return texts
+
+    rendered = deque()
+
+    def thumbnails():
+        for page, image in iter_pdf_pages(pdf_path, missing, dpi=THUMBNAIL_DPI):
+            rendered.append(page)
+            yield image
+
+    fresh = {}
+    for result in ocr_engine.imap(thumbnails(), mode="plain"):
+        page = rendered.popleft()
+        if not is_error(result):
+            fresh[page] = {"text": result["text"]}
+    ocr_cache.put_pages(pdf_sha256, THUMBNAIL_DPI, "plain", fresh)
+
+    texts.update((page, result["text"]) for page, result in fresh.items())
+    return texts
+
+
+def select_relevant_pages(plan: Dict[str, Any], top_pages: int):
+    """
+    Narrow a plan down to its top_pages most financially relevant pages.
+
+    Pages with text (text layer or cached OCR) are scored on it, the scanned
+    pages still missing are scored on thumbnail OCR. Irrelevant pages are dropped
+    from both the results and the pages to OCR, and the statement kinds of the
+    kept pages are recorded under plan["relevance"].
+    """
+    if plan["missing"] is None:
+        print(f"{plan['path']}: page count unknown, not filtering pages by relevance")
+        return
+    if len(plan["results"]) + len(plan["missing"]) <= top_pages:
+        return
+
+    texts = {page: result_text(result) for page, result in plan["results"].items()}
+    if plan["missing"]:
+        texts.update(thumbnail_texts(plan["path"], plan["sha256"], plan["missing"]))
+
+    relevance = rank_pages(texts, top_pages)
+    if not relevance:
+        print(f"{plan['path']}: no page looks like a financial statement, keeping every page")
+        return
+
+    plan["results"] = {page: result for page, result in plan["results"].items() if page in relevance}
+    plan["missing"] = [page for page in plan["missing"] if page in relevance]
+    plan["relevance"] = relevance
+    print(f"{plan['path']}: kept {len(relevance)} of {len(texts)} pages by relevance ({sorted(relevance)})")
+
+
+_DONE = object()
+
+
+def stream_ocr(plans: List[Dict[str, Any]], dpi=DEFAULT_DPI,
+               max_buffered_pages: int = MAX_BUFFERED_PAGES) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+    """
+    Render and OCR the missing pages of several PDFs as a bounded two-stage pipeline.
+
+    A renderer thread feeds pages into a queue holding at most max_buffered_pages
+    images and blocks when it is full, so rendering never runs ahead of OCR. The
+    OCR engine pulls pages from the queue only while it has free capacity and each
+    image is dropped once it has been handed over, keeping peak memory to a
+    handful of pages regardless of document length.
+
+    Args:
+        plans (List[Dict[str, Any]]): Plans from plan_pdf
+        dpi (int | str): Rendering resolution, or AUTO_DPI to pick it per page
+        max_buffered_pages (int): Rendered pages allowed to wait for OCR
+
+    Yields:
+        Tuple[int, int, Dict[str, Any]]: Plan index, page number and OCR result, in
+        rendering order
+    """
+    pages_queue = queue.Queue(maxsize=max_buffered_pages)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Retry with a timeout so the renderer notices when the consumer went away
+        while not stop.is_set():
+            try:
+                pages_queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def render():
+        try:
+            for index, plan in enumerate(plans):
+                for page, image in iter_pdf_pages(plan["path"], plan["missing"], dpi):
+                    if not put((index, page, image)):
+                        return
+        except Exception as e:
+            print(f"Error in PDF renderer: {e}")
+        finally:
+            put(_DONE)
+
+    renderer = threading.Thread(target=render, name="pdf-renderer", daemon=True)
+    renderer.start()
+
+    # The engine returns results in order, so page numbers are matched up FIFO
+    submitted = deque()
+
+    def queued_images():
+        while True:
+            item = pages_queue.get()
+            if item is _DONE:
+                return
+            index, page, image = item
+            submitted.append((index, page))
+            yield image
+
+    try:
+        for result in ocr_engine.imap(queued_images()):
+            index, page = submitted.popleft()
+            yield index, page, result
+
+    finally:
+        stop.set()
+        while renderer.is_alive():
+            try:
+                pages_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        renderer.join()
+
+
+def extract_pdf_text(pdf_paths: List[str], dpi=DEFAULT_DPI, top_pages: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Extract the text of a list of PDFs page by page, OCR'ing only scanned pages.
+
+    Pages with a usable text layer come back as {"text": ..., "source": "text_layer"}.
+    The remaining pages stream through stream_ocr, reusing cached page results,
+    and come back as {"text": ..., "source": "ocr", "confidence": ...,
+    "low_confidence_words": ...} (or both Tesseract texts in the "dual" OCR mode).
+
+    Args:
+        pdf_paths (List[str]): Paths of the PDF files
+        dpi (int | str): Rendering resolution, or AUTO_DPI to pick it per page
+        top_pages (int): Keep only this many of the most financially relevant pages
+                         per PDF (see select_relevant_pages), None keeps every page
+
+    Returns:
+        List[Dict[str, Any]]: Page results of every PDF in order. With top_pages,
+        each result also lists the statement kinds found on it under "relevance".
+    """
+    plans = []
+    for pdf_path in pdf_paths:
+        print(f"Processing PDF: {pdf_path}")
+        plan = plan_pdf(pdf_path, dpi)
+        if plan is not None:
+            if top_pages:
+                select_relevant_pages(plan, top_pages)
+            plans.append(plan)
+
+    ocr_plans = [plan for plan in plans if plan["missing"] is None or plan["missing"]]
+    fresh: Dict[int, Dict[int, Dict[str, Any]]] = {}
+
+    def store(index):
+        ocr_cache.put_pages(ocr_plans[index]["sha256"], dpi, OCR_VARIANT, fresh.pop(index, {}))
+
+    current = None
+    for index, page, result in stream_ocr(ocr_plans, dpi):
+        # Pages arrive PDF by PDF, persist each PDF's results once it is finished
+        if current is not None and index != current:
+            store(current)
+        current = index
+
+        ocr_plans[index]["results"][page] = result
+        if not is_error(result):
+            fresh.setdefault(index, {})[page] = result
+
+    if current is not None:
+        store(current)
+
+    text_content = []
+    for plan in plans:
+        relevance = plan.get("relevance")
+        for page in sorted(plan["results"]):
+            result = plan["results"][page]
+            text_content.append(dict(result, relevance=relevance[page]) if relevance else result)
+
+    print(f"Extracted text from {len(text_content)} pages across {len(pdf_paths)} PDFs")
+    return text_content
+
+
+def read_pdf(pdf_path: str, dpi=DEFAULT_DPI) -> List[Dict[str, Any]]:
+    """
+    Extract the text of every page of a single PDF, see extract_pdf_text.
+    """
+    return extract_pdf_text([pdf_path], dpi=dpi)
@@ -2,8 +2,8 @@ from smolagents import tool
 import requests
 import re
 from typing import Optional, Dict, Any
-import time
-from playwright.sync_api import sync_playwright
+from tools.page_waits import wait_for_text
+from tools.browser_pool import browser_pool
 
 @tool
 def get_pe_ratio(ticker_symbol: str) -> Dict[str, Any]:
@@ -26,30 +26,26 @@ def get_pe_ratio(ticker_symbol: str) -> Dict[str, Any]:
     id_url = f"/pro/NGSE:{ticker_symbol}/explorer/pe_ltm"
     url = f"https://ng.investing.com/pro/NGSE:{ticker_symbol}/explorer/pe_ltm"
     
-    try:
-        with sync_playwright() as p:
-            # Launch browser
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context()
-            page = context.new_page()
+    def scrape_pe_ratio(page):
+        # Navigate to the URL
+        print(f"Navigating to: {url}")
+        page.goto(url, wait_until="domcontentloaded",timeout=60000)
 
-            # Navigate to the URL
-            print(f"Navigating to: {url}")
-            page.goto(url, wait_until="networkidle",timeout=60000)
+        # Wait for the P/E link to be rendered with its value
+        wait_for_text(page, f"a[href='{id_url}']", "pe_ratio:value", budget_ms=30000)
 
-            # Wait for page to load completely
-            page.wait_for_load_state("networkidle")
-            time.sleep(3)  # Additional wait to ensure dynamic content loads
+        print("Page loaded successfully.")
 
-            print("Page loaded successfully.")
+        pe_el = page.locator(f"a[href='{id_url}']")
 
-            pe_el = page.locator(f"a[href='{id_url}']")
+        # print("P/E ratio element found:", pe_el)
 
-            # print("P/E ratio element found:", pe_el)
+        return pe_el.text_content()
 
-            pe_ratio = pe_el.text_content()
+    try:
+        pe_ratio = browser_pool.run(scrape_pe_ratio)
 
-            return pe_ratio
+        return pe_ratio
 
     except Exception as e:
 
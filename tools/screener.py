@@ -0,0 +1,458 @@
+"""
+Screener over every company listed on NGX.
+
+The quantitative criteria (P/E, debt-to-equity, net cash per share against the
+price, EPS growth consistency, buyback and insider buying flags) are computed
+for the whole listing in a nightly refresh and stored in an indexed SQLite
+table. Queries such as "pe_ratio < 10 and net_cash_to_price > 0.3 and
+eps_growth_consistent = 1" then answer in milliseconds, and the agents only
+have to analyze the shortlisted names.
+
+Usage:
+    python -m tools.screener --refresh              # crawl the listing and update the table
+    python -m tools.screener "pe_ratio < 10 and debt_to_equity < 0.5"
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from smolagents import tool
+
+from tools.browser_pool import browser_pool
+from tools.director_disclosure import ticker_insider_transactions
+from tools.financial_ratios import compute_ratios
+from tools.financial_records import load_financial_table
+from tools.get_company_info import get_company_info
+from tools.insider_transactions import recent_net_volume
+from tools.ngx_profile import (CORPORATE_DISCLOSURES, DIRECTOR_DEALINGS, FINANCIAL_STATEMENTS, SECTIONS,
+                               fetch_profile_sections, get_section_text)
+from tools.page_waits import table_signature, wait_for_rows_change, wait_for_selector
+from tools.pdf_cache import CACHE_DIR
+
+SCREENER_DB = Path(os.getenv("SCREENER_DB") or CACHE_DIR / "screener.sqlite")
+# Rows younger than this are kept as they are by a refresh
+SCREENER_TTL = float(os.getenv("SCREENER_TTL") or 24 * 3600)
+# Tickers refreshed at once, each one leases a browser and runs OCR
+SCREENER_PARALLEL = int(os.getenv("SCREENER_PARALLEL") or 2)
+# EPS growth is consistent when it was positive in every one of at least this many years
+CONSISTENT_GROWTH_YEARS = 3
+
+LISTING_URL = "https://ngxgroup.com/exchange/data/equities-price-list/"
+LISTING_LINKS = "a[href*='company-profile/?symbol=']"
+SHOW_ALL_ROWS_JS = """() => {
+    if (window.jQuery && window.jQuery.fn.dataTable) {
+        window.jQuery('table.dataTable').DataTable().page.len(-1).draw();
+    }
+}"""
+
+# Column name -> SQLite type, the queryable fields of the screen
+COLUMNS: Dict[str, str] = {
+    "ticker": "TEXT PRIMARY KEY",
+    "sector": "TEXT",
+    "price": "REAL",
+    "market_cap": "REAL",
+    "latest_period": "TEXT",
+    "eps": "REAL",
+    "pe_ratio": "REAL",
+    "debt_to_equity": "REAL",
+    "current_ratio": "REAL",
+    "net_cash_per_share": "REAL",
+    "net_cash_to_price": "REAL",
+    "net_margin": "REAL",
+    "eps_growth_mean": "REAL",
+    "eps_growth_years": "INTEGER",
+    "eps_growth_positive_years": "INTEGER",
+    "eps_growth_consistent": "INTEGER",
+    "buyback": "INTEGER",
+    "insider_buying": "INTEGER",
+    "error": "TEXT",
+    "updated_at": "REAL",
+}
+INDEXED = ("pe_ratio", "debt_to_equity", "net_cash_to_price", "eps_growth_consistent", "buyback", "insider_buying")
+
+BUYBACK_RE = re.compile(r"buy[- ]?back|share repurchase|repurchase of (?:its )?(?:own )?shares", re.IGNORECASE)
+
+_CLAUSE_RE = re.compile(r"^\s*(\w+)\s*(<=|>=|!=|=|<|>)\s*(.+?)\s*$")
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """Parse NGX profile figures such as "₦6.25" or "62,500,000.00", None if not a number"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r"-?[\d,]*\.?\d+", str(value or ""))
+    if not match:
+        return None
+    try:
+        return float(match.group().replace(",", ""))
+    except ValueError:
+        return None
+
+
+def list_ngx_tickers() -> List[str]:
+    """
+    Return the symbol of every equity on the NGX price list.
+
+    Returns:
+        List[str]: Sorted ticker symbols, empty if the listing could not be read
+    """
+    def scrape_listing(page):
+        print(f"Navigating to: {LISTING_URL}")
+        page.goto(LISTING_URL, wait_until="domcontentloaded", timeout=60000)
+        wait_for_selector(page, LISTING_LINKS, "listing:rows", budget_ms=30000)
+
+        # Show every row of the price list instead of its first page
+        try:
+            signature = table_signature(page, LISTING_LINKS)
+            page.evaluate(SHOW_ALL_ROWS_JS)
+            wait_for_rows_change(page, LISTING_LINKS, signature, "listing:show_all", budget_ms=15000)
+        except Exception as e:
+            print(f"Could not expand the price list: {e}")
+
+        return page.eval_on_selector_all(LISTING_LINKS, "links => links.map(link => link.href)")
+
+    try:
+        hrefs = browser_pool.run(scrape_listing)
+    except Exception as e:
+        print(f"Error reading the NGX listing: {e}")
+        return []
+
+    tickers = set()
+    for href in hrefs:
+        match = re.search(r"[?&]symbol=([^&#]+)", href)
+        if match:
+            tickers.add(match.group(1).strip().upper())
+    print(f"Found {len(tickers)} NGX tickers")
+    return sorted(tickers)
+
+
+def latest(values: List[Optional[float]], mask: List[bool]) -> Optional[float]:
+    """Most recent non-null value among the periods selected by mask"""
+    for value, keep in zip(reversed(values), reversed(mask)):
+        if keep and value is not None:
+            return value
+    return None
+
+
+def pages_match(pages: List[Dict[str, Any]], pattern: re.Pattern) -> bool:
+    for page in pages:
+        text = page.get("text") or page.get("text_advanced") or page.get("text_ocr") or ""
+        if pattern.search(str(text)):
+            return True
+    return False
+
+
+def screen_row(ticker: str) -> Dict[str, Any]:
+    """
+    Compute the screen fields of one ticker from its profile, statements and disclosures.
+
+    Returns:
+        Dict[str, Any]: One value per COLUMNS entry, missing figures as None
+    """
+    row: Dict[str, Any] = {name: None for name in COLUMNS}
+    row.update(ticker=ticker, updated_at=time.time())
+
+    info = get_company_info(ticker) or {}
+    row["sector"] = info.get("sector")
+    row["price"] = parse_number(info.get("Share price"))
+    market_cap = parse_number(info.get("Market Cap (Mil.)"))
+    row["market_cap"] = market_cap * 1e6 if market_cap is not None else None
+    shares_outstanding = parse_number(info.get("Shares Outstanding (Mil.)"))
+
+    # Every section in one page load, the section texts start from these PDFs
+    pdfs = fetch_profile_sections(ticker, list(SECTIONS.values()))
+    statements = get_section_text(ticker, FINANCIAL_STATEMENTS, pdf_paths=pdfs.get(FINANCIAL_STATEMENTS.name))
+    disclosures = get_section_text(ticker, CORPORATE_DISCLOSURES, pdf_paths=pdfs.get(CORPORATE_DISCLOSURES.name))
+    transactions = ticker_insider_transactions(ticker, pdfs.get(DIRECTOR_DEALINGS.name))
+    row["buyback"] = int(pages_match(disclosures, BUYBACK_RE))
+    row["insider_buying"] = int(recent_net_volume(transactions) > 0)
+    print(f"[{ticker}] {len(statements)} statement pages for the screen")
+
+    table = load_financial_table(ticker)
+    if not table:
+        row["error"] = "No figures could be extracted from the financial statements"
+        return row
+
+    columns = dict(table["columns"])
+    # The profile's share count fills in periods where the statements did not give one
+    if shares_outstanding:
+        columns["shares_outstanding"] = [
+            value if value is not None else shares_outstanding * 1e6
+            for value in columns.get("shares_outstanding", [None] * len(columns["period"]))
+        ]
+
+    ratios = compute_ratios(columns, row["price"])
+    per_period = ratios["per_period"]
+    full_year = [period_type == "FY" for period_type in per_period["period_type"]]
+    if any(full_year):
+        row["latest_period"] = [period for period, keep in zip(per_period["period"], full_year) if keep][-1]
+
+    row["eps"] = latest(columns.get("basic_eps", []), full_year)
+    if row["price"] and row["eps"] and row["eps"] > 0:
+        row["pe_ratio"] = round(row["price"] / row["eps"], 4)
+    for name in ("debt_to_equity", "current_ratio", "net_cash_per_share", "net_cash_to_price", "net_margin"):
+        row[name] = latest(per_period.get(name, []), full_year)
+
+    growth = ratios["growth"]["basic_eps_growth"]
+    row["eps_growth_mean"] = growth["mean"]
+    row["eps_growth_years"] = growth["periods"]
+    row["eps_growth_positive_years"] = growth["positive_periods"]
+    row["eps_growth_consistent"] = int(
+        growth["periods"] >= CONSISTENT_GROWTH_YEARS and growth["positive_periods"] == growth["periods"]
+    )
+    return row
+
+
+class Screener:
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path (Path): SQLite database file, defaults to SCREENER_DB
+        """
+        self.path = Path(path) if path else SCREENER_DB
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        if not self._ready:
+            connection.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(f"{name} {kind}" for name, kind in COLUMNS.items())
+            connection.execute(f"CREATE TABLE IF NOT EXISTS screen ({columns})")
+            for name in INDEXED:
+                connection.execute(f"CREATE INDEX IF NOT EXISTS screen_{name} ON screen ({name})")
+            # Latest failed refresh per ticker, kept apart so a failure never hides the last good row
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS screen_errors (ticker TEXT PRIMARY KEY, error TEXT, failed_at REAL)"
+            )
+            connection.commit()
+            self._ready = True
+        return connection
+
+    def upsert(self, row: Dict[str, Any]):
+        names = list(COLUMNS)
+        with self._lock:
+            connection = self._connect()
+            try:
+                connection.execute(
+                    f"INSERT OR REPLACE INTO screen ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})",
+                    [row.get(name) for name in names],
+                )
+                if row.get("error") is None:
+                    connection.execute("DELETE FROM screen_errors WHERE ticker = ?", (row["ticker"],))
+                connection.commit()
+            finally:
+                connection.close()
+
+    def record_failure(self, ticker: str, error: str):
+        """
+        Record a failed refresh without touching the ticker's last good row, which
+        stays in the screen until a refresh succeeds. A ticker never screened
+        successfully gets an error-only row.
+        """
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO screen_errors (ticker, error, failed_at) VALUES (?, ?, ?)",
+                    (ticker, error, now),
+                )
+                connection.execute(
+                    "INSERT INTO screen (ticker, error, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (ticker) DO UPDATE SET error = excluded.error, updated_at = excluded.updated_at "
+                    "WHERE screen.error IS NOT NULL",
+                    (ticker, error, now),
+                )
+                connection.commit()
+            finally:
+                connection.close()
+
+    def failures(self) -> Dict[str, Dict[str, Any]]:
+        """Error and time of the latest failed refresh of every ticker that has not refreshed since"""
+        connection = self._connect()
+        try:
+            return {
+                row["ticker"]: {"error": row["error"], "failed_at": row["failed_at"]}
+                for row in connection.execute("SELECT ticker, error, failed_at FROM screen_errors")
+            }
+        finally:
+            connection.close()
+
+    def updated_at(self) -> Dict[str, float]:
+        """Last successful refresh of every ticker in the table"""
+        connection = self._connect()
+        try:
+            return {
+                row["ticker"]: row["updated_at"]
+                for row in connection.execute("SELECT ticker, updated_at FROM screen WHERE error IS NULL")
+            }
+        finally:
+            connection.close()
+
+    def refresh(self, tickers: Optional[List[str]] = None, max_parallel: int = SCREENER_PARALLEL,
+                ttl: float = SCREENER_TTL) -> Dict[str, str]:
+        """
+        Recompute the screen rows of a list of tickers, the whole NGX listing by default.
+
+        Rows refreshed within `ttl` seconds are skipped, so an interrupted refresh
+        picks up where it stopped. A failed refresh keeps the ticker's previous row
+        (see record_failure) and is retried on the next refresh.
+
+        Returns:
+            Dict[str, str]: "ok", "skipped" or the error per ticker
+        """
+        tickers = [ticker.strip().upper() for ticker in (tickers or list_ngx_tickers())]
+        updated_at = self.updated_at()
+        now = time.time()
+        statuses = {ticker: "skipped" for ticker in tickers if now - updated_at.get(ticker, 0) < ttl}
+        pending = [ticker for ticker in tickers if ticker not in statuses]
+        print(f"Screener refresh: {len(pending)} tickers to compute, {len(statuses)} up to date")
+
+        def refresh_one(ticker: str) -> str:
+            try:
+                row = screen_row(ticker)
+            except Exception as e:
+                print(f"[{ticker}] screen failed: {e}")
+                row = {"ticker": ticker, "error": str(e)}
+            if row.get("error"):
+                self.record_failure(ticker, row["error"])
+                return row["error"]
+            self.upsert(row)
+            return "ok"
+
+        with ThreadPoolExecutor(max_workers=max(1, max_parallel), thread_name_prefix="screener") as pool:
+            futures = {pool.submit(refresh_one, ticker): ticker for ticker in pending}
+            for done, future in enumerate(as_completed(futures), start=1):
+                statuses[futures[future]] = future.result()
+                print(f"Screener refresh: {futures[future]} {statuses[futures[future]]} ({done}/{len(pending)})")
+
+        return statuses
+
+    def query(self, where: str = "", order_by: str = "pe_ratio", limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Return the rows matching a filter.
+
+        Args:
+            where (str): Conditions joined by "and", each "<column> <op> <value>" with op one of
+                         < <= > >= = != (e.g. "pe_ratio < 10 and eps_growth_consistent = 1").
+                         Rows with a missing value never match a condition on it.
+            order_by (str): Column to sort by, prefix with "-" for descending
+            limit (int): Maximum number of rows
+
+        Returns:
+            List[Dict[str, Any]]: Matching rows
+        """
+        conditions, params = parse_where(where)
+        descending = order_by.startswith("-")
+        order_column = order_by.lstrip("-")
+        if order_column not in COLUMNS:
+            raise ValueError(f"Unknown column {order_column}, expected one of {list(COLUMNS)}")
+
+        sql = "SELECT * FROM screen WHERE error IS NULL"
+        if conditions:
+            sql += " AND " + " AND ".join(conditions)
+        sql += f" ORDER BY {order_column} IS NULL, {order_column} {'DESC' if descending else 'ASC'} LIMIT ?"
+
+        connection = self._connect()
+        try:
+            return [dict(row) for row in connection.execute(sql, params + [int(limit)])]
+        finally:
+            connection.close()
+
+
+def parse_where(where: str) -> Tuple[List[str], List[Any]]:
+    """
+    Turn "pe_ratio < 10 and buyback = 1" into parameterized SQL conditions.
+
+    Raises:
+        ValueError: On an unknown column, a malformed condition or a non-numeric value
+                    for a numeric column
+    """
+    conditions, params = [], []
+    for clause in re.split(r"\s+and\s+", where.strip(), flags=re.IGNORECASE) if where.strip() else []:
+        match = _CLAUSE_RE.match(clause)
+        if not match:
+            raise ValueError(f"Cannot parse condition '{clause}', expected '<column> <op> <value>'")
+        column, op, value = match.groups()
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown column {column}, expected one of {list(COLUMNS)}")
+
+        value = value.strip("'\"")
+        number = parse_number(value) if re.fullmatch(r"-?[\d,]*\.?\d+", value) else None
+        if number is None and not COLUMNS[column].startswith("TEXT"):
+            # SQLite sorts text after every number, "pe_ratio < 10 or ..." would match every row
+            raise ValueError(f"Column {column} expects a number, got '{value}'")
+        conditions.append(f"{column} {op} ?")
+        params.append(number if number is not None else value)
+    return conditions, params
+
+
+screener = Screener()
+
+
+@tool
+def screen_stocks(where:str,order_by:str="pe_ratio",limit:int=20,stock_exchange:str="NGX") -> Any:
+    """
+    Screen every NGX (Nigerian Stock Exchange) listed company on precomputed quantitative
+    criteria and return the shortlist. Use it to find candidate stocks before analyzing them.
+
+    Columns: ticker, sector, price, market_cap, latest_period, eps, pe_ratio, debt_to_equity,
+    current_ratio, net_cash_per_share, net_cash_to_price (0.3 means net cash is 30% of the price),
+    net_margin, eps_growth_mean, eps_growth_years, eps_growth_positive_years,
+    eps_growth_consistent (1 if EPS grew every year for at least 3 years), buyback (1 if a
+    disclosure mentions a share buyback), insider_buying (1 if insiders were net buyers over the
+    last 12 months), updated_at.
+
+    Args:
+        where (str): Conditions joined by "and", e.g.
+                     "pe_ratio < 10 and net_cash_to_price > 0.3 and eps_growth_consistent = 1"
+        order_by (str): Column to sort by, prefix with "-" for descending (e.g. "-net_cash_to_price")
+        limit (int): Maximum number of companies returned
+        stock_exchange (str): The stock exchange, currently only supports "NGX"
+
+    Returns:
+        list: One dict of screen columns per matching company
+    """
+
+    if not stock_exchange == "NGX":
+
+        return "The function can only work for ngx listed stocks"
+
+    try:
+        return screener.query(where, order_by=order_by, limit=limit)
+    except Exception as e:
+        print(f"Error screening stocks: {e}")
+        return f"Error: {str(e)}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen NGX listed companies on quantitative criteria")
+    parser.add_argument("where", nargs="?", default="", help='Filter, e.g. "pe_ratio < 10 and buyback = 1"')
+    parser.add_argument("--refresh", action="store_true", help="Recompute the table before querying")
+    parser.add_argument("--tickers", nargs="*", help="Refresh only these tickers")
+    parser.add_argument("--order-by", default="pe_ratio")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.refresh:
+        screener.refresh(args.tickers)
+
+    started = time.perf_counter()
+    rows = screener.query(args.where, order_by=args.order_by, limit=args.limit)
+    print(json.dumps(rows, indent=2))
+    print(f"{len(rows)} companies in {round((time.perf_counter() - started) * 1000, 1)}ms")
+
+
+if __name__ == "__main__":
+    main()
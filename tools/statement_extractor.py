@@ -0,0 +1,287 @@
+"""
+Structured extraction of financial statement figures from page text.
+
+Statement pages (text layer or OCR) are read line by line: a line whose label
+matches a known line item contributes its figures, mapped onto the year columns
+found in the page header and scaled by the page's unit (N'000, millions, ...).
+Figures from every page and PDF are merged into one StatementRecord per period.
+"""
+
+import re
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class StatementRecord:
+    period: str
+    period_type: str = "FY"
+    revenue: Optional[float] = None
+    net_income: Optional[float] = None
+    basic_eps: Optional[float] = None
+    total_debt: Optional[float] = None
+    total_equity: Optional[float] = None
+    cash: Optional[float] = None
+    current_assets: Optional[float] = None
+    current_liabilities: Optional[float] = None
+    inventories: Optional[float] = None
+    shares_outstanding: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# Figure fields in storage order
+FIGURE_FIELDS: Tuple[str, ...] = tuple(
+    field.name for field in fields(StatementRecord) if field.name not in ("period", "period_type")
+)
+
+# Line labels per field, matched case-insensitively at the start of a line
+FIELD_PATTERNS: Dict[str, Tuple[str, ...]] = {
+    # Not "Revenue reserve(s)", an equity line of Nigerian balance sheets
+    "revenue": (r"(?:total )?revenue\b(?!\s+reserves?\b)", r"turnover\b", r"gross earnings\b"),
+    "net_income": (
+        r"(?:\(loss\)/|loss/)?profit(?:/\(loss\)|/loss)? (?:for the (?:year|period)|after tax(?:ation)?)\b",
+    ),
+    "basic_eps": (r"basic (?:and diluted )?(?:earnings|\(loss\)/earnings|loss) per share\b", r"basic\b"),
+    "total_equity": (r"total equity\b", r"total shareholders'? (?:equity|funds)\b"),
+    "cash": (r"cash and (?:cash equivalents|bank balances?)\b",),
+    "current_assets": (r"total current assets\b",),
+    "current_liabilities": (r"total current liabilities\b",),
+    "inventories": (r"inventor(?:y|ies)\b",),
+    "shares_outstanding": (
+        r"(?:weighted average )?number of (?:ordinary )?shares\b", r"(?:ordinary )?shares in issue\b",
+    ),
+}
+
+# Labels of a field's lines that hold another figure: the opening cash of a cash flow statement
+FIELD_EXCLUDE_PATTERNS: Dict[str, str] = {
+    "cash": r"\bat (?:the )?(?:beginning|start)\b|\bopening\b",
+}
+
+# Interest-bearing debt lines, summed unless the page has a total. Only liability
+# labels: bare "loans" also opens asset and cash flow lines (loans to related
+# parties, loans receivable, loans repaid).
+DEBT_PATTERNS: Tuple[str, ...] = (
+    r"(?:interest[- ]bearing )?(?:loans and )?borrowings\b", r"interest[- ]bearing loans\b",
+    r"(?:bank|term) loans?\b", r"loans? payable\b",
+    r"bank overdrafts?\b", r"debt securities\b", r"lease liabilit(?:y|ies)\b", r"commercial papers?\b",
+)
+TOTAL_DEBT_PATTERN = r"total (?:borrowings|debt)\b"
+# Debt labels describing assets or cash movements rather than the debt outstanding
+DEBT_EXCLUDE_PATTERN = r"\b(?:receivables?|advances|to|due from|repaid|repayments?|proceeds|received|raised)\b"
+# Debt is only read from statements of financial position
+FINANCIAL_POSITION_PATTERN = r"statement of financial position|balance sheet|\btotal (?:assets|liabilities)\b"
+
+# Per-share figures are not scaled by the page unit
+PER_SHARE_FIELDS = ("basic_eps",)
+# Share counts are usually reported in thousands or millions of their own
+SHARE_COUNT_FIELDS = ("shares_outstanding",)
+
+_FIELD_RES = {
+    name: [re.compile(rf"^\s*{pattern}", re.IGNORECASE) for pattern in patterns]
+    for name, patterns in FIELD_PATTERNS.items()
+}
+_FIELD_EXCLUDE_RES = {name: re.compile(pattern, re.IGNORECASE) for name, pattern in FIELD_EXCLUDE_PATTERNS.items()}
+_DEBT_RES = [re.compile(rf"^\s*(?:non-current |current )?{pattern}", re.IGNORECASE) for pattern in DEBT_PATTERNS]
+_TOTAL_DEBT_RE = re.compile(rf"^\s*{TOTAL_DEBT_PATTERN}", re.IGNORECASE)
+_DEBT_EXCLUDE_RE = re.compile(DEBT_EXCLUDE_PATTERN, re.IGNORECASE)
+_FINANCIAL_POSITION_RE = re.compile(FINANCIAL_POSITION_PATTERN, re.IGNORECASE)
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+_FIGURE_RE = re.compile(r"\(?-?\d[\d,]*(?:\.\d+)?\)?|(?<!\w)[-–—](?!\w)")
+_INTERIM_RE = re.compile(r"\b(?:three|six|nine|3|6|9) months\b|\bquarter\b|\bhalf[- ]year\b|\bQ[1-4]\b", re.IGNORECASE)
+
+# Unit headers of a statement ("N'000", "In thousands of Naira", "₦'million"); a unit word
+# in narrative text ("up by N5 million") is not one
+_UNITS = (
+    (re.compile(r"\bin billions\b|\bbillions of\b|[N₦]'b(?:n|illions?)?\b|'bn\b", re.IGNORECASE), 1e9),
+    (re.compile(r"\bin millions\b|\bmillions of\b|[N₦]'m(?:n|illions?)?\b|'m\b|'000,000", re.IGNORECASE), 1e6),
+    (re.compile(r"'000\b|\bin thousands\b|\bthousands of\b", re.IGNORECASE), 1e3),
+)
+# Share count lines state their own scale, e.g. "Number of shares (million)"
+_LINE_UNITS = (
+    (re.compile(r"billion|'bn\b|N'b\b|₦'b\b", re.IGNORECASE), 1e9),
+    (re.compile(r"million|'m\b|N'mn?\b|₦'mn?\b|'000,000", re.IGNORECASE), 1e6),
+    (re.compile(r"'000\b|thousands?", re.IGNORECASE), 1e3),
+)
+# The unit header is looked for above the year header and this many lines below it
+UNIT_LINES_BELOW_HEADER = 2
+# Lines searched for the unit header of a page without a year header
+UNIT_HEADER_LINES = 8
+
+
+def parse_figure(token: str) -> Optional[float]:
+    """Parse a statement figure: 1,234 -> 1234.0, (1,234) -> -1234.0, a dash -> 0.0"""
+    token = token.strip()
+    if token in ("-", "–", "—"):
+        return 0.0
+    negative = token.startswith("(") and token.endswith(")") or token.startswith("-")
+    digits = token.strip("()-").replace(",", "")
+    try:
+        value = float(digits)
+    except ValueError:
+        return None
+    return -value if negative else value
+
+
+def find_unit(text: str, units=_UNITS) -> float:
+    for pattern, multiplier in units:
+        if pattern.search(text):
+            return multiplier
+    return 1.0
+
+
+def page_unit(text: str) -> float:
+    """
+    Multiplier of the monetary figures of a page, read from the unit header at the
+    top of the statement (down to just below the year header). 1 when none is stated.
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    index = header_index(lines)
+    top = lines[:index + 1 + UNIT_LINES_BELOW_HEADER] if index is not None else lines[:UNIT_HEADER_LINES]
+    return find_unit("\n".join(top))
+
+
+def header_index(lines: List[str]) -> Optional[int]:
+    """Index of the first line listing at least two years, None if there is none"""
+    for index, line in enumerate(lines):
+        if len(_YEAR_RE.findall(line)) >= 2:
+            return index
+    return None
+
+
+def header_years(lines: List[str]) -> List[str]:
+    """
+    Years of the figure columns, read from the first line listing at least two years.
+    Repeated years (group and company columns) are kept so positions line up.
+    """
+    index = header_index(lines)
+    return _YEAR_RE.findall(lines[index]) if index is not None else []
+
+
+def line_figures(line: str, label_end: int, columns: int) -> List[Optional[float]]:
+    """Figures following a line label, the rightmost `columns` of them (note references come first)"""
+    tokens = _FIGURE_RE.findall(line[label_end:])
+    values = [parse_figure(token) for token in tokens]
+    values = [value for value in values if value is not None]
+    return values[-columns:] if len(values) >= columns else []
+
+
+def match_label(line: str, patterns) -> Optional[int]:
+    """End offset of the first matching label pattern, or None"""
+    for pattern in patterns:
+        match = pattern.match(line)
+        if match:
+            return match.end()
+    return None
+
+
+def match_debt_label(line: str) -> Optional[int]:
+    """End offset of a debt line label, None for other lines and asset or cash flow debt lines"""
+    end = match_label(line, _DEBT_RES)
+    if end is None:
+        return None
+    label = _FIGURE_RE.split(line, 1)[0]
+    return None if _DEBT_EXCLUDE_RE.search(label) else end
+
+
+def extract_page_figures(text: str) -> Dict[str, Dict[str, float]]:
+    """
+    Read the known line items of one statement page. Debt is only read from
+    statement of financial position pages.
+
+    Returns:
+        Dict[str, Dict[str, float]]: field -> {year: value}, first column per year wins
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    years = header_years(lines)
+    if not years:
+        return {}
+
+    unit = page_unit(text)
+    financial_position = bool(_FINANCIAL_POSITION_RE.search(text))
+    eps_unit = 0.01 if re.search(r"\bkobo\b", text, re.IGNORECASE) else 1.0
+    figures: Dict[str, Dict[str, float]] = {}
+    debt: Dict[str, float] = {}
+    total_debt: Dict[str, float] = {}
+
+    def assign(target: Dict[str, float], values: List[Optional[float]], scale: float):
+        for year, value in zip(years, values):
+            target.setdefault(year, value * scale)
+
+    for line in lines:
+        end = match_label(line, [_TOTAL_DEBT_RE]) if financial_position else None
+        if end is not None:
+            assign(total_debt, line_figures(line, end, len(years)), unit)
+            continue
+
+        end = match_debt_label(line) if financial_position else None
+        if end is not None:
+            # Each debt line counts once per year even when it repeats across columns
+            values = line_figures(line, end, len(years))
+            seen = set()
+            for year, value in zip(years, values):
+                if year not in seen:
+                    debt[year] = debt.get(year, 0.0) + value * unit
+                    seen.add(year)
+            continue
+
+        for name, patterns in _FIELD_RES.items():
+            end = match_label(line, patterns)
+            if end is None:
+                continue
+            if name in _FIELD_EXCLUDE_RES and _FIELD_EXCLUDE_RES[name].search(_FIGURE_RE.split(line, 1)[0]):
+                break
+            if name in PER_SHARE_FIELDS:
+                scale = eps_unit
+            elif name in SHARE_COUNT_FIELDS:
+                scale = find_unit(line, _LINE_UNITS)
+            else:
+                scale = unit
+            assign(figures.setdefault(name, {}), line_figures(line, end, len(years)), scale)
+            break
+
+    if total_debt or debt:
+        figures["total_debt"] = {year: abs(value) for year, value in (total_debt or debt).items()}
+
+    return {name: values for name, values in figures.items() if values}
+
+
+def page_period_type(text: str) -> str:
+    """"interim" for quarterly and half-year statements, "FY" otherwise"""
+    return "interim" if _INTERIM_RE.search(text) else "FY"
+
+
+def extract_statement_records(pages: Iterable[Dict[str, Any]]) -> List[StatementRecord]:
+    """
+    Turn financial statement pages into one record per period.
+
+    Args:
+        pages (Iterable[Dict[str, Any]]): Page results from get_section_text
+                                          (any OCR mode, text layer or OCR)
+
+    Returns:
+        List[StatementRecord]: Records sorted by period, oldest first. The first
+        value found for a field wins, so list the most recent reports first.
+    """
+    records: Dict[Tuple[str, str], StatementRecord] = {}
+
+    for page in pages:
+        text = page.get("text") or page.get("text_advanced") or page.get("text_ocr") or ""
+        if not text or str(text).startswith("Error:"):
+            continue
+
+        period_type = page_period_type(text)
+        for name, by_year in extract_page_figures(text).items():
+            for year, value in by_year.items():
+                record = records.setdefault((year, period_type), StatementRecord(period=year, period_type=period_type))
+                if getattr(record, name) is None:
+                    setattr(record, name, value)
+
+    # Keep periods that produced more than a stray figure
+    kept = [
+        record for record in records.values()
+        if sum(getattr(record, name) is not None for name in FIGURE_FIELDS) >= 2
+    ]
+    return sorted(kept, key=lambda record: (record.period, record.period_type))
+
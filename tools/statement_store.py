@@ -0,0 +1,100 @@
+"""
+Compact local store of extracted financial statement records.
+
+Each ticker gets one small JSON file laid out by column (one list per field,
+all aligned on the period list), so an agent reads a few hundred bytes of
+figures instead of the OCR text they were extracted from. Saves merge into the
+file under a lock shared with the other processes using the store (see
+tools.file_store).
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tools.file_store import file_lock, write_json
+from tools.pdf_cache import CACHE_DIR
+from tools.statement_extractor import FIGURE_FIELDS, StatementRecord
+
+COLUMNS = ("period", "period_type") + FIGURE_FIELDS
+
+
+class StatementStore:
+    def __init__(self, root: Optional[Path] = None):
+        """
+        Args:
+            root (Path): Store directory, defaults to <cache dir>/statements
+        """
+        self.root = Path(root) if root else CACHE_DIR / "statements"
+        self._lock = threading.Lock()
+
+    def _path(self, ticker: str) -> Path:
+        return self.root / f"{ticker.strip().upper()}.json"
+
+    def read_columns(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the stored table of a ticker.
+
+        Returns:
+            Dict[str, Any]: {"ticker", "updated_at", "columns": {field: [values per period]}},
+            or None if nothing is stored
+        """
+        try:
+            with open(self._path(ticker), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Statement store entry for {ticker} unreadable, ignoring it: {e}")
+            return None
+
+    def load(self, ticker: str) -> List[StatementRecord]:
+        """Return the stored records of a ticker, oldest period first"""
+        table = self.read_columns(ticker)
+        if not table:
+            return []
+
+        columns = table["columns"]
+        return [
+            StatementRecord(**{name: columns.get(name, [None] * len(columns["period"]))[row] for name in COLUMNS})
+            for row in range(len(columns["period"]))
+        ]
+
+    def age(self, ticker: str) -> Optional[float]:
+        """Seconds since the ticker's records were last saved, None if never"""
+        table = self.read_columns(ticker)
+        return time.time() - table["updated_at"] if table else None
+
+    def save(self, ticker: str, records: List[StatementRecord]):
+        """
+        Merge records into the ticker's table.
+
+        New values replace stored ones for the same period, stored periods and
+        fields missing from the new records are kept.
+        """
+        path = self._path(ticker)
+        with self._lock, file_lock(path):
+            merged = {(record.period, record.period_type): record for record in self.load(ticker)}
+            for record in records:
+                key = (record.period, record.period_type)
+                stored = merged.get(key)
+                if stored is None:
+                    merged[key] = record
+                    continue
+                for name in FIGURE_FIELDS:
+                    value = getattr(record, name)
+                    if value is not None:
+                        setattr(stored, name, value)
+
+            rows = [merged[key] for key in sorted(merged)]
+            table = {
+                "ticker": ticker.strip().upper(),
+                "updated_at": time.time(),
+                "columns": {name: [getattr(record, name) for record in rows] for name in COLUMNS},
+            }
+            write_json(path, table, separators=(",", ":"))
+
+
+statement_store = StatementStore()